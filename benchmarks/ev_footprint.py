@@ -0,0 +1,82 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Micro-benchmark of the per-EV memory footprint and the `GoAlgorithm` inner loop.
+
+For each fleet size, reports the memory allocated per `EV` and per
+`GoAlgorithm.EVPower` instance (measured with `tracemalloc`), and the number of
+`EVPower.power` calls per second. For reference, `B/lists` is the memory of the
+two horizon-length lists (limits and allocation) that each `EVPower` used to
+hold, which it now shares (limits) or reads from the fleet power matrix (allocation).
+
+Usage::
+
+    python benchmarks/ev_footprint.py [--evs 100 1000 10000] [--calls 200000]
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, UTC
+
+from optivgi.scm.constants import AlgorithmConstants
+from optivgi.scm.ev import EV
+from optivgi.scm.go_algorithm import GoAlgorithm
+
+
+def make_evs(count: int, now: datetime) -> list[EV]:
+    """Generates a fleet of identical EVs."""
+    return [
+        EV(ev_id=i, active=True, station_id=i, connector_id=1, min_power=1.4, max_power=7.2,
+           arrival_time=now, departure_time=now + timedelta(hours=4), energy=20.)
+        for i in range(count)
+    ]
+
+
+def measure_memory(factory) -> tuple[int, object]:
+    """Returns the bytes allocated by `factory()` and its result."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = factory()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    """Runs the benchmark for each fleet size and prints a table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--evs', type=int, nargs='+', default=[100, 1000, 10000], help='Fleet sizes to benchmark')
+    parser.add_argument('--calls', type=int, default=200000, help='EVPower.power calls per measurement')
+    args = parser.parse_args()
+
+    now = datetime(2025, 1, 1, 8, tzinfo=UTC)
+    timesteps = AlgorithmConstants.TIMESTEPS
+    print(f'{"EVs":>7} {"B/EV":>8} {"B/EVPower":>10} {"B/lists":>8} {"power() calls/s":>16}')
+    for count in args.evs:
+        ev_bytes, evs = measure_memory(lambda: make_evs(count, now))  # pylint: disable=cell-var-from-loop
+        algorithm = GoAlgorithm(evs, [0.] * timesteps, now)
+        limits: dict = {}
+        ev_power_bytes, ev_powers = measure_memory(
+            lambda: [GoAlgorithm.EVPower(ev=ev, max_power=algorithm.max_power_limits(ev, timesteps, limits), min_power=ev.min_power)  # pylint: disable=cell-var-from-loop
+                     for ev in algorithm.evs])  # pylint: disable=cell-var-from-loop
+        list_bytes, _ = measure_memory(
+            lambda: [([ev.max_power] * timesteps, ev.power.tolist()) for ev in algorithm.evs])  # pylint: disable=cell-var-from-loop
+        ev_power = ev_powers[0]
+        seconds = timeit.timeit(lambda: ev_power.power(10, 5.), number=args.calls)  # pylint: disable=cell-var-from-loop
+        print(f'{count:>7} {ev_bytes / count:>8.0f} {ev_power_bytes / count:>10.0f} {list_bytes / count:>8.0f} '
+              f'{args.calls / seconds:>16,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the priority-weighted sharing path of `GoAlgorithm`.
+
+Runs `GoAlgorithm.calculate` on the same randomly generated fleet once with all
+priorities equal to 1 (proportional sharing) and once with mixed priorities
+(weighted water-filling), and reports the wall time of both paths.
+
+Usage::
+
+    python benchmarks/go_algorithm_priority.py [--evs 50 200 500] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, UTC
+
+from optivgi.scm.constants import AlgorithmConstants
+from optivgi.scm.ev import EV
+from optivgi.scm.go_algorithm import GoAlgorithm
+
+
+def make_evs(count: int, now: datetime, weighted: bool, seed: int = 0) -> list[EV]:
+    """Generates a reproducible fleet of EVs, optionally with mixed priorities."""
+    rng = random.Random(seed)
+    return [
+        EV(ev_id=i, active=True, station_id=i, connector_id=1,
+           min_power=1.4, max_power=rng.choice([7.2, 11., 19.2]),
+           arrival_time=now - timedelta(minutes=rng.randint(0, 60)),
+           departure_time=now + timedelta(minutes=rng.randint(60, 480)),
+           energy=rng.uniform(5., 60.),
+           priority=rng.choice([1., 2., 4.]) if weighted else 1.)
+        for i in range(count)
+    ]
+
+
+def run(count: int, now: datetime, weighted: bool, repeat: int) -> float:
+    """Returns the best wall time (seconds) of `GoAlgorithm.calculate` over `repeat` runs."""
+    peak_power_demand = [count * 3.] * AlgorithmConstants.TIMESTEPS
+    best = float('inf')
+    for _ in range(repeat):
+        algorithm = GoAlgorithm(make_evs(count, now, weighted), peak_power_demand, now)
+        start = time.perf_counter()
+        algorithm.calculate()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Runs the benchmark for each fleet size and prints a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--evs', type=int, nargs='+', default=[50, 200, 500], help='Fleet sizes to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    now = datetime(2025, 1, 1, 8, tzinfo=UTC)
+    print(f'{"EVs":>6} {"unweighted (s)":>15} {"weighted (s)":>13} {"ratio":>7}')
+    for count in args.evs:
+        unweighted = run(count, now, False, args.repeat)
+        weighted = run(count, now, True, args.repeat)
+        print(f'{count:>6} {unweighted:>15.3f} {weighted:>13.3f} {weighted / unweighted:>7.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,11 +16,11 @@
 import time
 import threading
 import logging
-from queue import Queue
 
 from dotenv import load_dotenv
 
 from optivgi.threads import timer_thread_worker, scm_worker
+from optivgi.triggers import TriggerQueue
 from optivgi.scm.go_algorithm import GoAlgorithm
 
 from translation.citrineos import CitrineOSTranslation
@@ -73,28 +73,28 @@ class LoggingTranslation(CitrineOSTranslation):
 
         return evs, voltage
 
-    def send_power_to_evs(self, powers, unit=None):
+    def send_payloads(self, payloads):
         """Log only when curtailment state changes."""
-        aggregate = sum(ev.power[0] for ev in powers)
-        requested_total = sum(ev.max_power for ev in powers)
+        aggregate = sum(ev.power[0] for ev in payloads)
+        requested_total = sum(ev.max_power for ev in payloads)
         is_curtailed = requested_total > self.site_power_limit
 
         if is_curtailed and not self._was_curtailed:
             logger.info(
                 "CURTAILMENT ON — %d EVs requesting %.1f kW, site limit %.1f kW, "
                 "allocated %.1f kW",
-                len(powers), requested_total, self.site_power_limit, aggregate,
+                len(payloads), requested_total, self.site_power_limit, aggregate,
             )
-            for ev in powers:
+            for ev in payloads:
                 logger.info("  EV %d: %.2f kW / %.2f kW max", ev.ev_id, ev.power[0], ev.max_power)
         elif not is_curtailed and self._was_curtailed:
             logger.info(
                 "CURTAILMENT OFF — %d EVs using %.1f kW (limit %.1f kW)",
-                len(powers), aggregate, self.site_power_limit,
+                len(payloads), aggregate, self.site_power_limit,
             )
         self._was_curtailed = is_curtailed
 
-        super().send_power_to_evs(powers, unit)
+        super().send_payloads(payloads)
 
 
 def main():
@@ -103,8 +103,8 @@ def main():
     Starts Opti-VGI threads (timer, SCM worker) and the RabbitMQ listener
     for CitrineOS OCPP event integration.
     """
-    # Event queue for worker threads
-    event_queue = Queue()
+    # Event queue for worker threads, taking arrivals and departures before routine events
+    event_queue = TriggerQueue()
 
     event_queue.put('Start')
 
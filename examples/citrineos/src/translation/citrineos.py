@@ -29,7 +29,11 @@ import requests
 
 from optivgi.translation import Translation
 from optivgi.scm.ev import EV, ChargingRateUnit
-from optivgi.scm.constants import AlgorithmConstants
+from optivgi.scm.change_tracker import ProfileChangeTracker
+from optivgi.scm.deadline import deadline_timeout
+from optivgi.scm.payload import ProfileTemplate
+from optivgi.scm.serializer import RawJSON, dumps
+from optivgi.scm.profile import ProfileCompression
 
 from .graphql_queries import ACTIVE_TRANSACTIONS_QUERY, CONNECTOR_STATUS_QUERY
 
@@ -44,6 +48,12 @@ class CitrineOSTranslation(Translation):
     instances for the SCM algorithm.
     """
 
+    #: Round period limits to whole Amps to avoid ajv multipleOf:0.1
+    #: floating-point precision failures (5.8 * 10 % 1 != 0 in JS).
+    #: 1A = 0.24 kW resolution at 240V — sufficient for Level 2. The whole
+    #: quantum makes the limits integers, as the previous round() did.
+    PROFILE_COMPRESSION = ProfileCompression(quantum=1.)
+
     def __init__(self):
         """Initialize CitrineOSTranslation from environment variables.
 
@@ -66,6 +76,23 @@ class CitrineOSTranslation(Translation):
         # Maps ev_id -> transaction metadata for send_power_to_evs
         self.transaction_map = {}
 
+        # Current-period-only profiles in whole Amperes. SCM recalculates
+        # every cycle, so only the immediate allocation matters — avoids
+        # stale multi-period schedules.
+        self.profile_template = ProfileTemplate(
+            unit=ChargingRateUnit.A,
+            compression=self.PROFILE_COMPRESSION,
+            current_only=True,
+            envelope=self._set_charging_profile_payload,
+            serialize=True,
+        )
+
+        # Skip SetChargingProfile for connectors whose limit did not change
+        self.change_tracker = ProfileChangeTracker(
+            deadband=float(os.getenv("PROFILE_DEADBAND_A", "0")),
+            refresh_interval=timedelta(minutes=float(os.getenv("PROFILE_REFRESH_MINUTES", "15"))),
+        )
+
         logger.info(
             "CitrineOSTranslation initialized: hasura=%s, voltage=%.0f, "
             "site_power_limit=%.1f kW, connectors=%d",
@@ -140,7 +167,7 @@ class CitrineOSTranslation(Translation):
         resp = requests.post(
             f"{self.hasura_url}/v1/graphql",
             json=payload,
-            timeout=10,
+            timeout=deadline_timeout(10),
         )
         resp.raise_for_status()
         result = resp.json()
@@ -342,69 +369,88 @@ class CitrineOSTranslation(Translation):
             _voltage: Optional voltage (unused).
 
         Returns:
-            A list of SITE_POWER_LIMIT_KW repeated for AlgorithmConstants.TIMESTEPS.
+            A list of SITE_POWER_LIMIT_KW repeated for each time step of the group's time grid.
         """
         logger.debug(
             "Site power limit for group '%s': %.1f kW",
             group_name, self.site_power_limit,
         )
-        return [self.site_power_limit] * AlgorithmConstants.TIMESTEPS
+        return [self.site_power_limit] * self.get_time_grid(group_name).timesteps
+
+    def _set_charging_profile_payload(self, ev: EV, profile: RawJSON) -> Optional[dict]:
+        """Wrap a charging profile into an OCPP 1.6 SetChargingProfile body.
+
+        Used as the envelope of ``profile_template``.
+
+        Args:
+            ev: The EV the profile is for.
+            profile: The pre-encoded current-period charging profile in Amperes.
+
+        Returns:
+            The request body, or None if the EV has no known transaction.
+        """
+        txn_data = self.transaction_map.get(ev.ev_id)
+        if txn_data is None:
+            logger.warning(
+                "EV %d not in transaction_map (may have disconnected), skipping",
+                ev.ev_id,
+            )
+            return None
+
+        return {
+            "connectorId": ev.connector_id,
+            "csChargingProfiles": profile.with_fields(transactionId=int(txn_data["transactionId"])),
+        }
 
     def send_power_to_evs(
         self, powers: dict[EV, dict], _unit: Optional[ChargingRateUnit] = None
     ):
         """Send SetChargingProfile to each EV via CitrineOS REST API.
 
-        Iterates over the computed power allocations, builds OCPP 1.6
-        SetChargingProfile payloads with TxProfile purpose in Amperes,
-        and POSTs them to the CitrineOS REST API.
+        Regenerates the current-period payloads of the EVs (the SCM runner
+        uses ``profile_template`` and calls ``send_payloads`` directly).
 
         Args:
             powers: Dict mapping EV instances to their charging profile dicts.
             _unit: Optional charging rate unit for the profiles.
         """
-        logger.debug("send_power_to_evs called with %d profiles", len(powers))
+        now = datetime.now(timezone.utc)
+        payloads = {}
+        for ev in powers:
+            payload = self._set_charging_profile_payload(ev, RawJSON(dumps(ev.current_charging_profile(
+                now, unit=self.profile_template.unit,
+                compression=self.profile_template.compression,
+            ))))
+            if payload is not None:
+                payloads[ev] = dumps(payload)
+        self.send_payloads(payloads)
+
+    def send_payloads(self, payloads: dict[EV, bytes]):
+        """POST pre-encoded SetChargingProfile bodies to the CitrineOS REST API.
+
+        Payloads whose profile did not change since the last successful
+        send are skipped (see ProfileChangeTracker).
 
-        for ev, _profile in powers.items():
+        Args:
+            payloads: Dict mapping EV instances to encoded SetChargingProfile bodies.
+        """
+        logger.debug("send_payloads called with %d payloads", len(payloads))
+
+        now = datetime.now(timezone.utc)
+        for ev, payload in payloads.items():
             try:
-                txn_data = self.transaction_map.get(ev.ev_id)
-                if txn_data is None:
-                    logger.warning(
-                        "EV %d not in transaction_map (may have disconnected), skipping",
-                        ev.ev_id,
-                    )
+                if not self.change_tracker.is_changed(ev, payload, now):
+                    logger.debug("Profile unchanged for EV %d, skipping", ev.ev_id)
                     continue
 
-                station_id_str = txn_data["stationId"]
-                transaction_id = txn_data["transactionId"]
-
-                # Generate current-period-only profile in Amperes.
-                # SCM recalculates every cycle, so only the immediate
-                # allocation matters — avoids stale multi-period schedules.
-                profile_data = ev.current_charging_profile(
-                    datetime.now(timezone.utc), unit=ChargingRateUnit.A
-                )
-                profile_data["transactionId"] = int(transaction_id)
-
-                # Round period limits to whole Amps to avoid ajv multipleOf:0.1
-                # floating-point precision failures (5.8 * 10 % 1 != 0 in JS).
-                # 1A = 0.24 kW resolution at 240V — sufficient for Level 2.
-                schedule = profile_data.get("chargingSchedule", {})
-                for period in schedule.get("chargingSchedulePeriod", []):
-                    period["limit"] = round(period["limit"])
-                    period["startPeriod"] = int(period["startPeriod"])
-
-                payload = {
-                    "connectorId": ev.connector_id,
-                    "csChargingProfiles": profile_data,
-                }
-
+                station_id_str = self.transaction_map[ev.ev_id]["stationId"]
                 url = f"{self.citrineos_url}/ocpp/1.6/smartcharging/setChargingProfile"
                 resp = requests.post(
                     url,
-                    json=payload,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
                     params={"identifier": station_id_str, "tenantId": "1"},
-                    timeout=10,
+                    timeout=deadline_timeout(10),
                 )
                 if resp.status_code >= 400:
                     logger.error(
@@ -412,6 +458,7 @@ class CitrineOSTranslation(Translation):
                         ev.ev_id, station_id_str, resp.status_code, resp.text[:300],
                     )
                 resp.raise_for_status()
+                self.change_tracker.mark_sent(ev, payload, now)
                 logger.debug(
                     "SetChargingProfile sent for EV %d (station=%s): HTTP %d",
                     ev.ev_id, station_id_str, resp.status_code,
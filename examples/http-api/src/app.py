@@ -16,11 +16,11 @@
 import time
 import threading
 import logging
-from queue import Queue
 
 from dotenv import load_dotenv
 
 from optivgi.threads import timer_thread_worker, scm_worker
+from optivgi.triggers import TriggerQueue
 # from optivgi.scm.pulp_numerical_algorithm import PulpNumericalAlgorithm
 from optivgi.scm.go_algorithm import GoAlgorithm
 
@@ -41,8 +41,8 @@ def main():
     Main function to start the threads and run the application.
     This function will start the OptiVGI threads, and any other listener threads.
     """
-    # Event queue for worker threads
-    event_queue = Queue()
+    # Event queue for worker threads, taking arrivals and departures before routine events
+    event_queue = TriggerQueue()
 
     event_queue.put('Start')
 
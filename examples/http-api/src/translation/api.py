@@ -16,13 +16,27 @@
 import os
 import logging
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
 import requests
 
 from optivgi.translation import Translation
+from optivgi.scm.change_tracker import ProfileChangeTracker
+from optivgi.scm.deadline import deadline_timeout
 from optivgi.scm.ev import EV, ChargingRateUnit
-from optivgi.scm.constants import AlgorithmConstants, EVConstants
+from optivgi.scm.constants import EVConstants
+from optivgi.scm.payload import ProfileTemplate
+from optivgi.scm.serializer import RawJSON, dumps
+
+def parse_max_power_curve(curve: Optional[list]) -> Optional[list[tuple[datetime, float]]]:
+    """
+    Converts optional ``[[timestamp, max_power], ...]`` breakpoints from the server
+    into the compact piecewise form accepted by `EV.max_power_curve`.
+    """
+    if not curve:
+        return None
+    return [(datetime.fromisoformat(time), float(max_power)) for time, max_power in curve]
+
 
 class TranslationAPI(Translation):
     """
@@ -34,6 +48,10 @@ class TranslationAPI(Translation):
         assert port, "API_PORT environment variable must be set"
         assert port.isdigit(), "API_PORT must be a valid port number"
         self.base_url = f"http://localhost:{port}"
+        # Full-horizon profiles in each EV's unit, generated directly from the schedule
+        self.profile_template = ProfileTemplate(serialize=True)
+        # Only POST profiles that changed since the last successful send
+        self.change_tracker = ProfileChangeTracker(deadband=float(os.getenv("PROFILE_DEADBAND", "0")))
 
     def __enter__(self):
         """Perform any entry setup needed in the translation layer."""
@@ -58,7 +76,7 @@ class TranslationAPI(Translation):
                 "timestamp": now.isoformat(),
                 "voltage": voltage
             }
-            resp = requests.get(f"{self.base_url}/peak_power_demand", params=params, timeout=10)
+            resp = requests.get(f"{self.base_url}/peak_power_demand", params=params, timeout=deadline_timeout(10))
             resp.raise_for_status()
             data = resp.json()
 
@@ -66,7 +84,7 @@ class TranslationAPI(Translation):
             assert times[-1] <= now, "Data is missing for the current time"
 
             peak_power_demand = []
-            for _ in range(AlgorithmConstants.TIMESTEPS):
+            for _ in range(self.get_time_grid(group_name).timesteps):
                 if len(times) > 1 and times[-2] <= now:
                     times.pop()
                 peak_power_demand.append(data[times[-1].isoformat()])
@@ -91,7 +109,8 @@ class TranslationAPI(Translation):
                   "max_power": 7.2,
                   "arrival_time": "2025-03-23T06:00:00.000000+00:00",
                   "departure_time": "2025-03-23T10:00:00.000000+00:00",
-                  "energy_needed": 20.0
+                  "energy_needed": 20.0,
+                  "max_power_curve": [["2025-03-23T09:00:00.000000+00:00", 3.3]]  # optional taper breakpoints
                 },
                 ...
               ],
@@ -102,7 +121,7 @@ class TranslationAPI(Translation):
         voltage = None
         try:
             # Get Active EVs
-            resp = requests.get(f"{self.base_url}/evs", params={ "group_name": group_name }, timeout=10)
+            resp = requests.get(f"{self.base_url}/evs", params={ "group_name": group_name }, timeout=deadline_timeout(10))
             resp.raise_for_status()
             data = resp.json()
             voltage = data.get("voltage")  # optional
@@ -119,12 +138,13 @@ class TranslationAPI(Translation):
                     departure_time=datetime.fromisoformat(ev_info.get("departure_time")),
                     energy=ev_info["energy_needed"],
                     unit=ChargingRateUnit.W,  # or A, if your data says so
-                    voltage=voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE
+                    voltage=voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE,
+                    max_power_curve=parse_max_power_curve(ev_info.get("max_power_curve"))
                 )
                 evs.append(ev_obj)
 
             # Get Future EVs
-            resp = requests.get(f"{self.base_url}/future_evs", params={ "group_name": group_name }, timeout=10)
+            resp = requests.get(f"{self.base_url}/future_evs", params={ "group_name": group_name }, timeout=deadline_timeout(10))
             resp.raise_for_status()
             data = resp.json()
             assert data.get("voltage") == voltage, "Voltage mismatch between active and future EVs"
@@ -141,7 +161,8 @@ class TranslationAPI(Translation):
                     departure_time=datetime.fromisoformat(ev_info.get("departure_time")),
                     energy=ev_info["energy_needed"],
                     unit=ChargingRateUnit.W,  # or A, if your data says so
-                    voltage=voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE
+                    voltage=voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE,
+                    max_power_curve=parse_max_power_curve(ev_info.get("max_power_curve"))
                 )
                 evs.append(ev_obj)
 
@@ -164,8 +185,15 @@ class TranslationAPI(Translation):
             }
 
         Then POST it to /powers or your chosen endpoint.
+        Profiles that did not change since the last successful POST are left out.
         """
         try:
+            now = datetime.now(timezone.utc)
+            powers = self.change_tracker.changed_profiles(powers, now)
+            if not powers:
+                logging.info("No charging profile changes to send.")
+                return
+
             payload = {}
             for ev, profile in powers.items():
                 # Convert EV-based key to string ID
@@ -177,8 +205,20 @@ class TranslationAPI(Translation):
                 "unit": unit.value if unit else None
             }
 
-            resp = requests.post(f"{self.base_url}/powers", json=body, timeout=10)
+            resp = requests.post(f"{self.base_url}/powers", data=dumps(body),
+                                 headers={"Content-Type": "application/json"}, timeout=deadline_timeout(10))
             resp.raise_for_status()
-            logging.info("Successfully sent power allocation to EVs.")
+            for ev, profile in powers.items():
+                self.change_tracker.mark_sent(ev, profile, now)
+            logging.info("Successfully sent power allocation to %d EVs.", len(powers))
         except Exception as e:
             logging.error("Error sending power to EVs: %s", repr(e))
+
+    def send_payloads(self, payloads: dict[EV, bytes]):
+        """
+        Receives the pre-encoded profiles generated with `profile_template` (without an
+        envelope, the profiles are the payloads) and POSTs them like `send_power_to_evs`,
+        embedding them in the request body without encoding them again.
+        """
+        self.send_power_to_evs({ev: RawJSON(profile) for ev, profile in payloads.items()},
+                               self.profile_template.unit)
@@ -14,6 +14,7 @@
 #
 # pylint: disable=missing-module-docstring
 import os
+import json
 import asyncio
 import logging
 from queue import Queue
@@ -21,12 +22,34 @@ from datetime import datetime
 
 import websockets
 
+from optivgi.triggers import Trigger, TriggerType, station_group_map, station_trigger
+
+
+def reservation_trigger(msg, stations: dict[str, str]) -> Trigger:
+    """
+    Returns the trigger of a reservation message, scoped to the group of its station.
+    The group is taken from `group_name` in the message data, or else looked up
+    by its `station_id`; messages of unknown stations trigger all groups.
+    """
+    reason = "Reservation Event on Listener"
+    try:
+        message = json.loads(msg)
+    except (TypeError, ValueError):
+        return Trigger(TriggerType.RESERVATION, reason=reason)
+    data = message.get('data') if isinstance(message, dict) else None
+    if not isinstance(data, dict):
+        return Trigger(TriggerType.RESERVATION, reason=reason)
+    if data.get('group_name'):
+        return Trigger(TriggerType.RESERVATION, groups=frozenset({data['group_name']}), reason=reason)
+    return station_trigger(TriggerType.RESERVATION, data.get('station_id'), stations, reason=reason)
+
 
 async def listen_websocket(event_queue: Queue):
     """Start a WebSocket client and listen for messages"""
     port = os.getenv('WEBSOCKET_PORT')
     assert port, f'WEBSOCKET_PORT({port}) environment variable must be set'
     endpoint = f'ws://localhost:{port}'
+    stations = station_group_map()
 
     logging.info("Trying to connect to the WebSocket server(%s) at %s", endpoint, datetime.now())
     async with websockets.connect(endpoint) as websocket:
@@ -36,7 +59,7 @@ async def listen_websocket(event_queue: Queue):
             msg = await websocket.recv()
 
             logging.info("Message received (%s) at %s", str(msg), datetime.now())
-            event_queue.put("Reservation Event on Listener")
+            event_queue.put(reservation_trigger(msg, stations))
 
 
 def reservation_listener_thread(event_queue: Queue):
@@ -87,8 +87,11 @@ async def start_websocket_server(stop_event: Optional[threading.Event] = None):
         while not stop_event or not stop_event.is_set():
             await asyncio.sleep(15)
             if random.random() < 0.25:
+                ev_id = random.randint(1, 100)
                 await broadcast_reservation({
-                    "ev_id": random.randint(1, 100),
+                    "ev_id": ev_id,
+                    "station_id": ev_id,
+                    "group_name": next(filter(bool, map(str.strip, os.getenv('STATION_GROUPS', '').split(',')))),
                 })
 
 
@@ -0,0 +1,92 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides the time budget of an SCM cycle.
+
+A cycle should finish before the next one is triggered, i.e. within
+`AlgorithmConstants.RESOLUTION` by default. `CycleBudget` sets this budget and
+the `OverrunPolicy` applied to groups that exceed their share of it. The runner
+derives a `optivgi.scm.deadline.Deadline` for each group from it. Budgets are
+opt-in: without one, the runner sets no deadlines.
+"""
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from enum import Enum
+from typing import Optional, Type
+
+from .scm.algorithm import Algorithm
+from .scm.constants import AlgorithmConstants
+from .scm.go_algorithm import GoAlgorithm
+
+
+class OverrunPolicy(Enum):
+    """
+    Action taken for a group whose deadline passed before its schedule was calculated.
+    """
+    #: Calculate the schedule anyway, only recording the overrun.
+    NONE = 'none'
+    #: Skip the calculation and do not send anything for the group.
+    SKIP = 'skip'
+    #: Calculate the schedule with `CycleBudget.fallback_algorithm` instead.
+    DEGRADE = 'degrade'
+    #: Send the last schedule of the group (from the `ScheduleCache`), shifted to the current time.
+    REUSE = 'reuse'
+
+
+@dataclass(frozen=True)
+class CycleBudget:
+    """
+    Time budget of an SCM cycle and the policy for groups that exceed their share of it.
+
+    Each group gets a share of the budget, ``budget * concurrency / groups`` (at
+    most the whole budget), where `concurrency` is the number of groups processed
+    at the same time. The deadline of a group is the end of its share, or the end
+    of the cycle if that is earlier.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: budget: The maximum duration of a cycle.
+    budget: timedelta = AlgorithmConstants.RESOLUTION
+    #: policy: The action taken for groups whose deadline passed before their calculation.
+    policy: OverrunPolicy = OverrunPolicy.NONE
+    #: fallback_algorithm: The cheaper algorithm used by `OverrunPolicy.DEGRADE`.
+    fallback_algorithm: Type[Algorithm] = GoAlgorithm
+
+    @classmethod
+    def from_env(cls) -> Optional['CycleBudget']:
+        """
+        Creates a budget from the `SCM_CYCLE_BUDGET_SECONDS` and `SCM_OVERRUN_POLICY` environment variables.
+
+        `SCM_OVERRUN_POLICY` (none, skip, degrade or reuse) defaults to none.
+
+        Returns:
+            A new `CycleBudget`, or None (no deadlines) if `SCM_CYCLE_BUDGET_SECONDS` is not set.
+        """
+        seconds = os.getenv('SCM_CYCLE_BUDGET_SECONDS')
+        if not seconds:
+            return None
+        return cls(budget=timedelta(seconds=float(seconds)),
+                   policy=OverrunPolicy(os.getenv('SCM_OVERRUN_POLICY', OverrunPolicy.NONE.value).lower()))
+
+    def group_share(self, groups: int, concurrency: int = 1) -> float:
+        """
+        Returns the share of the budget (seconds) of each group.
+
+        Args:
+            groups: The number of groups in the cycle.
+            concurrency: The number of groups processed at the same time.
+        """
+        seconds = self.budget.total_seconds()
+        return seconds if groups <= concurrency else seconds * concurrency / groups
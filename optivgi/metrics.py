@@ -0,0 +1,332 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides counters, gauges and histograms of the SCM cycles, exported in the Prometheus text format.
+
+The metrics are kept in memory by the `REGISTRY` and updated once per group and
+per cycle from the `optivgi.scm_runner.GroupResult` timings, so recording them
+costs a few dictionary updates per group. They can be exported:
+
+- over HTTP by a `MetricsServer` (`SCM_METRICS_PORT`), for Prometheus to scrape, and
+- to a file rewritten after each cycle (`SCM_METRICS_FILE`), e.g. for the node
+  exporter's textfile collector.
+
+The registry is local to the process: solves running in a process pool are
+measured by the parent process, as the `solve` phase of the group, and the
+duration of `Algorithm.calculate` is returned by `optivgi.scm_runner.solve_group`
+to be recorded with the algorithm and group as labels.
+"""
+import os
+import math
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import AbstractContextManager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+#: DEFAULT_BUCKETS: Upper bounds (seconds) of the histogram buckets, from 5 ms to 2 minutes.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60., 120.)
+
+
+def _format_value(value: float) -> str:
+    """Formats a sample value as in the Prometheus text format."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Formats a label set as ``{name="value",...}`` (empty without labels)."""
+    if not names:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+class Metric(ABC):
+    """
+    Abstract base class of the metrics, holding one series per combination of label values.
+
+    Attributes:
+        name (str): The name of the metric.
+        documentation (str): The help text of the metric.
+        labelnames (tuple[str, ...]): The names of the labels, whose values are passed positionally.
+    """
+    #: The Prometheus type of the metric.
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple[str, ...]) -> tuple[str, ...]:
+        assert len(labels) == len(self.labelnames), f'{self.name} expects labels {self.labelnames}'
+        return tuple(map(str, labels))
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Returns the sample lines of the metric in the Prometheus text format."""
+
+    def render(self) -> str:
+        """Returns the metric in the Prometheus text format, with its HELP and TYPE lines."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}', *self.samples()]
+        return '\n'.join(lines) + '\n'
+
+
+class Counter(Metric):
+    """A value that only increases, e.g. the number of errors."""
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        # A metric without labels has a single series, exported from the start
+        self._values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.}
+
+    def inc(self, *labels: str, amount: float = 1.):
+        """Increases the series of `labels` by `amount`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.) + amount
+
+    def value(self, *labels: str) -> float:
+        """Returns the current value of the series of `labels`."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in values]
+
+
+class Gauge(Counter):
+    """A value that can go up and down, e.g. the depth of a queue."""
+    type = 'gauge'
+
+    def set(self, value: float, *labels: str):
+        """Sets the series of `labels` to `value`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values, e.g. latencies, counted in cumulative buckets.
+
+    Attributes:
+        buckets (tuple[float, ...]): The sorted upper bounds of the buckets (``+Inf`` is implied).
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: the count of each bucket (not cumulative, the last one is +Inf), the sum and the count
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str):
+        """Records `value` in the series of `labels`."""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0., 0.])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def count(self, *labels: str) -> int:
+        """Returns the number of observations of the series of `labels`."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return 0 if series is None else int(series[1][1])
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, (total, _)) in self._series.items()]
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, 'le'), (*key, _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    """
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds a metric to the registry, or returns the already registered metric of the same name."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return ''.join(metric.render() for metric in metrics)
+
+    def write_file(self, path: str):
+        """
+        Writes all metrics to `path` in the Prometheus text format.
+
+        The file is replaced atomically, so a reader never sees a partial export.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.metrics-', delete=False) as file:
+            file.write(self.render())
+        os.replace(file.name, path)
+
+
+#: REGISTRY: The registry of the SCM metrics below.
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    """Returns a `Counter` registered in `REGISTRY`."""
+    metric = REGISTRY.register(Counter(name, documentation, labelnames))
+    assert isinstance(metric, Counter)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    """Returns a `Gauge` registered in `REGISTRY`."""
+    metric = REGISTRY.register(Gauge(name, documentation, labelnames))
+    assert isinstance(metric, Gauge)
+    return metric
+
+
+def histogram(name: str, documentation: str, labelnames: tuple[str, ...] = (),
+              buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Returns a `Histogram` registered in `REGISTRY`."""
+    metric = REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+    assert isinstance(metric, Histogram)
+    return metric
+
+
+#: PHASE_DURATION: Duration of each phase (fetch, solve, profiles, send) of a group.
+PHASE_DURATION = histogram('optivgi_phase_duration_seconds', 'Duration of a phase of the SCM cycle of a group.',
+                           ('group', 'phase'))
+#: CALCULATE_DURATION: Duration of `Algorithm.calculate` per algorithm and group.
+CALCULATE_DURATION = histogram('optivgi_algorithm_calculate_seconds', 'Duration of the calculation of a group by an algorithm.',
+                               ('algorithm', 'group'))
+#: CALCULATIONS: Number of schedules calculated per algorithm and group.
+CALCULATIONS = counter('optivgi_algorithm_calculations_total', 'Schedules of a group calculated by an algorithm.',
+                       ('algorithm', 'group'))
+#: CYCLE_DURATION: Duration of the SCM cycles.
+CYCLE_DURATION = histogram('optivgi_cycle_duration_seconds', 'Duration of an SCM cycle over all groups.')
+#: GROUP_EVS: Number of EVs of each group in the last cycle.
+GROUP_EVS = gauge('optivgi_group_evs', 'Number of EVs of a group in the last SCM cycle.', ('group',))
+#: PROFILES_SENT: Number of charging profiles (or payloads) sent per group.
+PROFILES_SENT = counter('optivgi_profiles_sent_total', 'Charging profiles or payloads sent for a group.', ('group',))
+#: SCHEDULES_REUSED: Number of cycles in which a group reused its previous schedule.
+SCHEDULES_REUSED = counter('optivgi_schedules_reused_total', 'SCM cycles of a group that reused the previous schedule.',
+                           ('group',))
+#: GROUP_ERRORS: Number of cycles aborted by an error per group.
+GROUP_ERRORS = counter('optivgi_group_errors_total', 'SCM cycles of a group aborted by an error.', ('group',))
+#: OVERRUNS: Number of phases of a group that ended after its deadline.
+OVERRUNS = counter('optivgi_overruns_total', 'Phases of a group that ended after its deadline.', ('group', 'phase'))
+#: OVERRUN_ACTIONS: Number of times an overrun policy was applied to a group.
+OVERRUN_ACTIONS = counter('optivgi_overrun_actions_total', 'Overrun policies applied to a group.', ('group', 'action'))
+#: EVENTS: Number of events processed by the SCM worker.
+EVENTS = counter('optivgi_events_total', 'Events processed by the SCM worker.')
+#: EVENTS_COALESCED: Number of events merged into the cycle of another event.
+EVENTS_COALESCED = counter('optivgi_events_coalesced_total', 'Events merged into the SCM cycle of another event.')
+#: EVENT_ERRORS: Number of events whose SCM cycle raised an error.
+EVENT_ERRORS = counter('optivgi_event_errors_total', 'Events whose SCM cycle raised an error.')
+#: QUEUE_DEPTH: Number of events waiting in the queue of the SCM worker.
+QUEUE_DEPTH = gauge('optivgi_event_queue_depth', 'Events waiting in the queue of the SCM worker.')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the metrics of the server's registry at ``/metrics``."""
+    def do_GET(self): # pylint: disable=invalid-name
+        """Responds with the metrics, or 404 for other paths."""
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode() # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        """Does not log the scrapes."""
+
+
+class MetricsServer(AbstractContextManager):
+    """
+    Local HTTP endpoint serving a registry in the Prometheus text format, in a daemon thread.
+
+    Attributes:
+        port (int): The port the server listens on (the assigned one if 0 was requested).
+    """
+    def __init__(self, port: int, host: str = '127.0.0.1', registry: MetricsRegistry = REGISTRY):
+        """
+        Starts the server.
+
+        Args:
+            port: The port to listen on (0 for any free port).
+            host: The address to listen on, local only by default.
+            registry: The registry to serve.
+        """
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.registry = registry # type: ignore[attr-defined]
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logging.info('Serving metrics on http://%s:%s/metrics', host, self.port)
+
+    @classmethod
+    def from_env(cls) -> Optional['MetricsServer']:
+        """
+        Starts a server from the `SCM_METRICS_PORT` and `SCM_METRICS_HOST` (default 127.0.0.1) environment variables.
+
+        Returns:
+            A new `MetricsServer`, or None if `SCM_METRICS_PORT` is not set.
+        """
+        port = os.getenv('SCM_METRICS_PORT')
+        if not port:
+            return None
+        return cls(int(port), os.getenv('SCM_METRICS_HOST', '127.0.0.1'))
+
+    def close(self):
+        """Stops the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stops the server."""
+        self.close()
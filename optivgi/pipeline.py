@@ -0,0 +1,173 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides a staged pipeline for running the SCM cycle of many station groups.
+
+`GroupExecutor` runs each group as a fetch → solve → send chain. `GroupPipeline`
+instead runs the three phases as separate stages with their own workers,
+connected by bounded queues: while one group is being solved, other groups are
+fetched and sent. The cycle time then approaches the time of the slowest stage
+rather than the sum of all stages.
+"""
+import os
+import time
+import logging
+from collections.abc import Callable
+from concurrent.futures import wait
+from queue import Queue
+from typing import Any, Optional
+
+from .scm.deadline import Deadline
+from .scm_runner import (GroupExecutor, GroupResult, SCMCycle, build_group_profiles, fetch_group_inputs,
+                         send_group_profiles, solve_or_reuse)
+
+
+class GroupPipeline(GroupExecutor):
+    """
+    Executor that processes groups in pipelined fetch, solve and send stages.
+
+    The fetch stage (`fetch_workers` threads) retrieves the inputs of each group
+    and puts them in a bounded queue for the solve stage. The solve stage
+    (`solve_workers` threads, each submitting to a process pool of the same size,
+    or a single thread solving in-process if `solve_workers` is 0) calculates the
+    schedules and puts them in a bounded queue for the send stage (`send_workers`
+    threads). When a queue is full, the previous stage waits, so at most
+    `queue_size` groups are buffered between two stages.
+
+    The stage workers run in the thread pool of the `GroupExecutor`, sized for one
+    cycle at a time. The Translation Layer must be safe to call from several threads.
+
+    Attributes:
+        fetch_workers (int): Number of threads fetching group inputs.
+        solve_threads (int): Number of threads solving groups.
+        send_workers (int): Number of threads sending group results.
+        queue_size (int): Capacity of the queues between the stages.
+    """
+    def __init__(self, fetch_workers: int = 4, send_workers: int = 4, solve_workers: int = 0, queue_size: int = 8):
+        """
+        Creates the pools.
+
+        Args:
+            fetch_workers: Number of threads fetching group inputs.
+            send_workers: Number of threads sending group results.
+            solve_workers: Size of the process pool for solves (0 to solve in a single thread).
+            queue_size: Capacity of the queues between the stages.
+        """
+        assert fetch_workers > 0 and send_workers > 0, 'At least one fetch and one send worker are required'
+        assert queue_size > 0, 'Pipeline queues must be bounded'
+        self.fetch_workers = fetch_workers
+        self.solve_threads = max(solve_workers, 1)
+        self.send_workers = send_workers
+        self.queue_size = queue_size
+        super().__init__(fetch_workers + self.solve_threads + send_workers, solve_workers)
+
+    @classmethod
+    def from_env(cls) -> Optional['GroupPipeline']:
+        """
+        Creates a pipeline from the `SCM_FETCH_WORKERS`, `SCM_SEND_WORKERS`, `SCM_SOLVE_WORKERS`
+        and `SCM_QUEUE_SIZE` environment variables.
+
+        Returns:
+            A new `GroupPipeline`, or None if neither `SCM_FETCH_WORKERS` nor
+            `SCM_SEND_WORKERS` is set to a positive value.
+        """
+        fetch_workers = int(os.getenv('SCM_FETCH_WORKERS', '0'))
+        send_workers = int(os.getenv('SCM_SEND_WORKERS', '0'))
+        if fetch_workers <= 0 and send_workers <= 0:
+            return None
+        return cls(max(fetch_workers, 1), max(send_workers, 1),
+                   max(int(os.getenv('SCM_SOLVE_WORKERS', '0')), 0), int(os.getenv('SCM_QUEUE_SIZE', '8')))
+
+    @property
+    def concurrency(self) -> int:
+        """
+        The number of groups progressing at the same time, i.e. the width of the narrowest stage.
+
+        The thread pool is the sum of all stages, but a group is only in one stage at a
+        time, so the budget of a group is based on the bounding stage (usually the solve).
+        """
+        return min(self.fetch_workers, self.solve_threads, self.send_workers)
+
+    def run_groups(self, cycle: SCMCycle, groups: list[str]) -> list[GroupResult]:
+        """
+        Runs one SCM cycle for each group through the fetch, solve and send stages.
+
+        The deadline of a group starts when it is fetched, so the time it waits in
+        the queues counts towards it.
+
+        Args:
+            cycle: The context of the cycle.
+            groups: The identifiers of the station groups.
+
+        Returns:
+            The `GroupResult` of each group, in the order of `groups`.
+        """
+        results = [GroupResult(group) for group in groups]
+        started = [0.] * len(groups)
+        deadlines: list[Optional[Deadline]] = [None] * len(groups)
+
+        def fetch(index: int, _) -> Any:
+            started[index] = time.perf_counter()
+            deadlines[index] = cycle.group_deadline()
+            with results[index].phase('fetch', deadlines[index]):
+                inputs = fetch_group_inputs(cycle.translation, groups[index], cycle.current_time, deadlines[index])
+            results[index].ev_count = len(inputs.evs)
+            return inputs
+
+        def solve(index: int, inputs) -> Any:
+            with results[index].phase('solve', deadlines[index]):
+                return solve_or_reuse(cycle, inputs, results[index])
+
+        def send(index: int, algorithm) -> None:
+            if algorithm is not None:
+                with results[index].phase('profiles', deadlines[index]):
+                    profiles = build_group_profiles(cycle.translation, algorithm)
+                with results[index].phase('send', deadlines[index]):
+                    results[index].sent_count = send_group_profiles(cycle.translation, profiles)
+
+        def worker(function: Callable[[int, Any], Any], inbox: Queue, outbox: Optional[Queue]):
+            while (item := inbox.get()) is not None:
+                index, value = item
+                try:
+                    value = function(index, value)
+                except Exception as e: # pylint: disable=broad-except
+                    logging.exception('Error running SCM for group %s: %s', groups[index], repr(e))
+                    results[index].error = e
+                    results[index].duration = time.perf_counter() - started[index]
+                    continue
+                if outbox is not None:
+                    outbox.put((index, value))
+                else:
+                    results[index].duration = time.perf_counter() - started[index]
+
+        fetch_queue: Queue = Queue()
+        solve_queue: Queue = Queue(self.queue_size)
+        send_queue: Queue = Queue(self.queue_size)
+        for index in range(len(groups)):
+            fetch_queue.put((index, None))
+
+        stages = ((fetch, fetch_queue, solve_queue, self.fetch_workers),
+                  (solve, solve_queue, send_queue, self.solve_threads),
+                  (send, send_queue, None, self.send_workers))
+        futures = [[self.io_pool.submit(worker, function, inbox, outbox) for _ in range(workers)]
+                   for function, inbox, outbox, workers in stages]
+
+        # Stop each stage once all of its input was queued by the previous stage
+        for (_, inbox, _, workers), stage_futures in zip(stages, futures):
+            for _ in range(workers):
+                inbox.put(None)
+            wait(stage_futures)
+            for future in stage_futures:
+                future.result()
+        return results
@@ -0,0 +1,463 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Records the I/O of a Translation Layer and replays it offline.
+
+`RecordingTranslation` wraps a translation and appends every `get_time_grid`,
+`get_evs`, `get_peak_power_demand` and `send_power_to_evs` (or `send_payloads`)
+call to a recording file. `load_cycles` reads the recorded cycles of each group
+back, and `ReplayTranslation` serves them to the SCM runner, so any period can be
+re-run against any `Algorithm` at full speed, without the external system::
+
+    python -m optivgi.replay recording.ovgr --algorithm optivgi.scm.pulp_numerical_algorithm.PulpNumericalAlgorithm
+
+The recording file starts with `MAGIC` and is a sequence of frames, each written
+with a single append so that concurrent groups and crashes never interleave or
+corrupt earlier frames. A frame is a JSON header followed by the zlib-compressed
+columns it describes, e.g. one NumPy column per EV attribute for `get_evs`. A
+truncated last frame (e.g. after a crash) is ignored when reading.
+"""
+import sys
+import json
+import time
+import zlib
+import struct
+import logging
+import argparse
+import importlib
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from typing import Any, Optional, Type
+
+import numpy as np
+
+from .translation import Translation, current_group
+from .scm.algorithm import Algorithm
+from .scm.ev import EV, ChargingRateUnit
+from .scm.fleet import to_microseconds
+from .scm.payload import ProfileTemplate
+from .scm.serializer import dumps
+from .scm.time_grid import DEFAULT_TIME_GRID, TimeGrid
+from .scm_runner import SCMCycle, run_group
+
+#: MAGIC: The first bytes of a recording file, including the format version.
+MAGIC = b'OVGR\x01\n'
+
+_FRAME_HEADER = struct.Struct('<II')
+_UNITS = list(ChargingRateUnit)
+_CURVE_NONE, _CURVE_ARRAY, _CURVE_BREAKPOINTS = 0, 1, 2
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def _from_microseconds(us: int, aware: bool) -> datetime:
+    """Converts microseconds since the epoch back to a UTC (or naive UTC) datetime."""
+    dt = _EPOCH_UTC + timedelta(microseconds=us)
+    return dt if aware else dt.replace(tzinfo=None)
+
+
+@dataclass
+class Frame:
+    """
+    One recorded call of the Translation Layer.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: kind: The recorded call (time_grid, evs, peak_power_demand or send).
+    kind: str
+    #: group: The identifier of the station group, or None if unknown.
+    group: Optional[str]
+    #: recorded_at: Wall time of the call, in microseconds since the epoch.
+    recorded_at: int
+    #: meta: The scalar values of the call.
+    meta: dict[str, Any] = field(default_factory=dict)
+    #: columns: The array values of the call.
+    columns: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def encode(self) -> bytes:
+        """Encodes the frame, with its length prefix."""
+        arrays = {name: np.ascontiguousarray(column) for name, column in self.columns.items()}
+        header = json.dumps({
+            'kind': self.kind, 'group': self.group, 'recorded_at': self.recorded_at, 'meta': self.meta,
+            'columns': [[name, array.dtype.str, len(array)] for name, array in arrays.items()],
+        }, separators=(',', ':')).encode()
+        body = zlib.compress(b''.join(array.tobytes() for array in arrays.values()))
+        return _FRAME_HEADER.pack(len(header), len(body)) + header + body
+
+    @classmethod
+    def decode(cls, header: bytes, body: bytes) -> 'Frame':
+        """Decodes a frame from its JSON header and compressed body."""
+        fields = json.loads(header)
+        data = zlib.decompress(body)
+        columns, offset = {}, 0
+        for name, dtype, length in fields['columns']:
+            column = np.frombuffer(data, dtype=np.dtype(dtype), count=length, offset=offset)
+            columns[name] = column
+            offset += column.nbytes
+        return cls(fields['kind'], fields['group'], fields['recorded_at'], fields['meta'], columns)
+
+
+def read_frames(path: str) -> Iterator[Frame]:
+    """
+    Reads the frames of a recording file in the order they were recorded.
+
+    Args:
+        path: The recording file.
+
+    Raises:
+        ValueError: If the file is not a recording file.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not an Opti-VGI recording')
+        while prefix := file.read(_FRAME_HEADER.size):
+            header_size, body_size = _FRAME_HEADER.unpack(prefix) if len(prefix) == _FRAME_HEADER.size else (0, 0)
+            header, body = file.read(header_size), file.read(body_size)
+            if not header_size or len(header) < header_size or len(body) < body_size:
+                logging.warning('Ignoring truncated frame at the end of %s', path)
+                return
+            yield Frame.decode(header, body)
+
+
+def encode_evs(evs: list[EV]) -> dict[str, np.ndarray]:
+    """
+    Encodes EVs as columns, one per attribute.
+
+    Variable-length `max_power_curve` values are flattened into `curve_values`
+    (and `curve_times` for breakpoints), with their length in `curve_lengths`.
+    Station identifiers are free-form, so `station_id` keeps the dtype numpy infers
+    (integers or strings) and is restored as Python values.
+    """
+    curves = [ev.max_power_curve for ev in evs]
+    kinds = [_CURVE_NONE if curve is None else _CURVE_ARRAY if isinstance(curve, np.ndarray) else _CURVE_BREAKPOINTS
+             for curve in curves]
+    curve_values: list[float] = []
+    curve_times: list[int] = []
+    for curve, kind in zip(curves, kinds):
+        if kind == _CURVE_ARRAY:
+            curve_values.extend(curve) # type: ignore[arg-type]
+            curve_times.extend([0] * len(curve)) # type: ignore[arg-type]
+        elif kind == _CURVE_BREAKPOINTS:
+            curve_values.extend(value for _, value in curve) # type: ignore[union-attr]
+            curve_times.extend(to_microseconds(time) for time, _ in curve) # type: ignore[union-attr]
+    return {
+        'ev_id': np.array([ev.ev_id for ev in evs], dtype=np.int64),
+        'active': np.array([ev.active for ev in evs], dtype=bool),
+        'station_id': np.array([ev.station_id for ev in evs]),
+        'connector_id': np.array([ev.connector_id for ev in evs], dtype=np.int64),
+        'min_power': np.array([ev.min_power for ev in evs], dtype=float),
+        'max_power': np.array([ev.max_power for ev in evs], dtype=float),
+        'arrival': np.array([to_microseconds(ev.arrival_time) for ev in evs], dtype=np.int64),
+        'departure': np.array([to_microseconds(ev.departure_time) for ev in evs], dtype=np.int64),
+        'aware': np.array([ev.departure_time.tzinfo is not None for ev in evs], dtype=bool),
+        'energy': np.array([ev.energy for ev in evs], dtype=float),
+        'unit': np.array([_UNITS.index(ev.unit) for ev in evs], dtype=np.uint8),
+        'voltage': np.array([ev.voltage for ev in evs], dtype=float),
+        'priority': np.array([ev.priority for ev in evs], dtype=float),
+        'curve_kind': np.array(kinds, dtype=np.uint8),
+        'curve_lengths': np.array([0 if curve is None else len(curve) for curve in curves], dtype=np.int64),
+        'curve_values': np.array(curve_values, dtype=float),
+        'curve_times': np.array(curve_times, dtype=np.int64),
+    }
+
+
+def decode_evs(columns: dict[str, np.ndarray]) -> list[EV]:
+    """Rebuilds new `EV` objects from the columns of `encode_evs`."""
+    offsets = np.concatenate(([0], np.cumsum(columns['curve_lengths'])))
+    evs = []
+    for i, aware in enumerate(columns['aware'].tolist()):
+        curve: Optional[np.ndarray | list[tuple[datetime, float]]] = None
+        values = columns['curve_values'][offsets[i]:offsets[i + 1]]
+        if columns['curve_kind'][i] == _CURVE_ARRAY:
+            curve = values.copy()
+        elif columns['curve_kind'][i] == _CURVE_BREAKPOINTS:
+            times = columns['curve_times'][offsets[i]:offsets[i + 1]].tolist()
+            curve = [(_from_microseconds(us, aware), value) for us, value in zip(times, values.tolist())]
+        evs.append(EV(
+            ev_id=int(columns['ev_id'][i]), active=bool(columns['active'][i]),
+            station_id=columns['station_id'][i].item(), connector_id=int(columns['connector_id'][i]),
+            min_power=float(columns['min_power'][i]), max_power=float(columns['max_power'][i]),
+            arrival_time=_from_microseconds(int(columns['arrival'][i]), aware),
+            departure_time=_from_microseconds(int(columns['departure'][i]), aware),
+            energy=float(columns['energy'][i]), unit=_UNITS[columns['unit'][i]],
+            voltage=float(columns['voltage'][i]), priority=float(columns['priority'][i]),
+            max_power_curve=curve,
+        ))
+    return evs
+
+
+def _encode_bodies(values: list[dict | bytes]) -> dict[str, np.ndarray]:
+    """Encodes profiles or payloads as JSON bodies concatenated in `body`, with their lengths in `body_lengths`."""
+    bodies = [value if isinstance(value, bytes) else dumps(value) for value in values]
+    return {'body_lengths': np.array([len(body) for body in bodies], dtype=np.int64),
+            'body': np.frombuffer(b''.join(bodies), dtype=np.uint8)}
+
+
+class RecordingTranslation(Translation):
+    """
+    Translation Layer wrapper that records the I/O of another translation to a file.
+
+    All calls are forwarded to the wrapped translation; their arguments and
+    results are appended to `path` as frames (see `Frame`). The send calls do not
+    identify the group, so it is taken from the SCM runner's `group_scope` (None
+    outside of it). Thread-safe if the wrapped translation is.
+
+    Attributes:
+        translation (Translation): The wrapped translation.
+        path (str): The recording file, created if needed and appended to.
+    """
+    def __init__(self, translation: Translation, path: str):
+        self.translation = translation
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def profile_template(self) -> Optional[ProfileTemplate]: # type: ignore[override]
+        """The `profile_template` of the wrapped translation."""
+        return self.translation.profile_template
+
+    def __enter__(self):
+        """Enters the wrapped translation and opens the recording file."""
+        self.translation.__enter__()
+        self._file = open(self.path, 'ab') # pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Closes the recording file and exits the wrapped translation."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.translation.__exit__(exc_type, exc_val, exc_tb)
+
+    def _record(self, frame: Frame):
+        """Appends a frame to the recording file."""
+        data = frame.encode()
+        with self._lock:
+            assert self._file is not None, 'RecordingTranslation must be used as a context manager'
+            self._file.write(data)
+            self._file.flush()
+
+    def get_time_grid(self, group_name: str) -> TimeGrid:
+        time_grid = self.translation.get_time_grid(group_name)
+        self._record(Frame('time_grid', group_name, to_microseconds(datetime.now(UTC)), {
+            'resolution': time_grid.resolution.total_seconds(), 'runtime': time_grid.runtime.total_seconds()}))
+        return time_grid
+
+    def get_evs(self, group_name: str) -> tuple[list[EV], Optional[float]]:
+        evs, voltage = self.translation.get_evs(group_name)
+        self._record(Frame('evs', group_name, to_microseconds(datetime.now(UTC)), {'voltage': voltage}, encode_evs(evs)))
+        return evs, voltage
+
+    def get_peak_power_demand(self, group_name: str, now: datetime, voltage: Optional[float] = None) -> list[float]:
+        peak_power_demand = self.translation.get_peak_power_demand(group_name, now, voltage)
+        self._record(Frame('peak_power_demand', group_name, to_microseconds(datetime.now(UTC)), {
+            'now': to_microseconds(now), 'aware': now.tzinfo is not None, 'voltage': voltage,
+        }, {'values': np.asarray(peak_power_demand, dtype=float)}))
+        return peak_power_demand
+
+    def _record_send(self, method: str, profiles: dict[EV, Any], unit: Optional[ChargingRateUnit] = None):
+        """Records the profiles or payloads passed to a send method."""
+        evs = list(profiles)
+        self._record(Frame('send', current_group(), to_microseconds(datetime.now(UTC)), {
+            'method': method, 'unit': unit.value if unit is not None else None,
+        }, {'ev_id': np.array([ev.ev_id for ev in evs], dtype=np.int64), **_encode_bodies(list(profiles.values()))}))
+
+    def send_power_to_evs(self, powers: dict[EV, dict], unit: Optional[ChargingRateUnit] = None):
+        self.translation.send_power_to_evs(powers, unit)
+        self._record_send('send_power_to_evs', powers, unit)
+
+    def send_payloads(self, payloads: dict[EV, dict | bytes]):
+        self.translation.send_payloads(payloads)
+        self._record_send('send_payloads', payloads)
+
+
+@dataclass
+class RecordedCycle:
+    """
+    The recorded inputs and output of one SCM cycle of a group.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: group: The identifier of the station group.
+    group: str
+    #: now: The start of the planning horizon of the cycle.
+    now: datetime
+    #: time_grid: The time grid of the group.
+    time_grid: TimeGrid
+    #: voltage: The voltage returned by `get_evs`.
+    voltage: Optional[float]
+    #: ev_columns: The columns of the EVs returned by `get_evs` (see `encode_evs`).
+    ev_columns: dict[str, np.ndarray] = field(repr=False)
+    #: peak_power_demand: The peak power demand forecast.
+    peak_power_demand: list[float] = field(repr=False)
+    #: sent_count: The number of profiles or payloads that were sent.
+    sent_count: int = 0
+
+    @property
+    def ev_count(self) -> int:
+        """The number of EVs of the cycle."""
+        return len(self.ev_columns['ev_id'])
+
+    def evs(self) -> list[EV]:
+        """Returns new `EV` objects for the recorded EVs, so the cycle can be replayed repeatedly."""
+        return decode_evs(self.ev_columns)
+
+
+def load_cycles(path: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                groups: Optional[list[str]] = None) -> list[RecordedCycle]:
+    """
+    Reads the recorded cycles of a file, in the order they were recorded.
+
+    A cycle is completed by the `get_peak_power_demand` frame of a group, after
+    its `get_evs` frame; a following send frame of the group sets its `sent_count`.
+
+    Args:
+        path: The recording file.
+        start: Optional earliest `now` of the cycles to return.
+        end: Optional latest `now` (excluded) of the cycles to return.
+        groups: Optional groups whose cycles are returned (all groups by default).
+
+    Returns:
+        The `RecordedCycle` objects.
+    """
+    start_us = None if start is None else to_microseconds(start)
+    end_us = None if end is None else to_microseconds(end)
+    cycles: list[RecordedCycle] = []
+    time_grids: dict[str, TimeGrid] = {}
+    pending: dict[str, Frame] = {}
+    last: dict[str, RecordedCycle] = {}
+    for frame in read_frames(path):
+        if frame.group is None or (groups is not None and frame.group not in groups):
+            continue
+        if frame.kind == 'time_grid':
+            time_grids[frame.group] = TimeGrid(timedelta(seconds=frame.meta['resolution']),
+                                               timedelta(seconds=frame.meta['runtime']))
+        elif frame.kind == 'evs':
+            pending[frame.group] = frame
+        elif frame.kind == 'peak_power_demand' and frame.group in pending:
+            evs_frame = pending.pop(frame.group)
+            now_us = frame.meta['now']
+            if (start_us is not None and now_us < start_us) or (end_us is not None and now_us >= end_us):
+                continue
+            last[frame.group] = cycle = RecordedCycle(
+                frame.group, _from_microseconds(now_us, frame.meta['aware']),
+                time_grids.get(frame.group, DEFAULT_TIME_GRID), evs_frame.meta['voltage'],
+                evs_frame.columns, frame.columns['values'].tolist())
+            cycles.append(cycle)
+        elif frame.kind == 'send' and frame.group in last:
+            last.pop(frame.group).sent_count = len(frame.columns['ev_id'])
+    return cycles
+
+
+class ReplayTranslation(Translation):
+    """
+    Translation Layer serving recorded cycles instead of an external system.
+
+    `select` sets the cycle served for its group; the send methods only count the
+    profiles, in `sent_count`.
+
+    Attributes:
+        profile_template (Optional[ProfileTemplate]): Optional template of the payloads to build.
+        sent_count (int): The number of profiles or payloads "sent" so far.
+    """
+    def __init__(self, profile_template: Optional[ProfileTemplate] = None):
+        self.profile_template = profile_template
+        self.sent_count = 0
+        self._cycles: dict[str, RecordedCycle] = {}
+
+    def select(self, cycle: RecordedCycle):
+        """Serves `cycle` for its group until another cycle of the group is selected."""
+        self._cycles[cycle.group] = cycle
+
+    def get_time_grid(self, group_name: str) -> TimeGrid:
+        return self._cycles[group_name].time_grid
+
+    def get_evs(self, group_name: str) -> tuple[list[EV], Optional[float]]:
+        cycle = self._cycles[group_name]
+        return cycle.evs(), cycle.voltage
+
+    def get_peak_power_demand(self, group_name: str, now: datetime, voltage: Optional[float] = None) -> list[float]:
+        return list(self._cycles[group_name].peak_power_demand)
+
+    def send_power_to_evs(self, powers: dict[EV, dict], unit: Optional[ChargingRateUnit] = None):
+        self.sent_count += len(powers)
+
+    def send_payloads(self, payloads: dict[EV, dict | bytes]):
+        self.sent_count += len(payloads)
+
+
+def _import_algorithm(name: str) -> Type[Algorithm]:
+    """Imports an `Algorithm` class from its dotted path."""
+    module, _, cls = name.rpartition('.')
+    algorithm_cls = getattr(importlib.import_module(module), cls)
+    if not (isinstance(algorithm_cls, type) and issubclass(algorithm_cls, Algorithm)):
+        raise argparse.ArgumentTypeError(f'{name} is not an Algorithm')
+    return algorithm_cls
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Replays the cycles of a recording file against an algorithm and prints their timings.
+
+    Args:
+        argv: The command line arguments (`sys.argv[1:]` by default).
+
+    Returns:
+        The exit status: 0 if all cycles were replayed without error, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(prog='python -m optivgi.replay', description=main.__doc__.split('\n')[1].strip())
+    parser.add_argument('path', help='the recording file')
+    parser.add_argument('--algorithm', type=_import_algorithm, default='optivgi.scm.go_algorithm.GoAlgorithm',
+                        help='dotted path of the Algorithm class (default: %(default)s)')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='replay cycles from this time (ISO 8601)')
+    parser.add_argument('--end', type=datetime.fromisoformat, help='replay cycles before this time (ISO 8601)')
+    parser.add_argument('--group', action='append', dest='groups', help='replay only this group (repeatable)')
+    parser.add_argument('--repeat', type=int, default=1, help='replay each cycle this many times (default: 1)')
+    parser.add_argument('--verbose', action='store_true', help='print each cycle and the runner logs')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    cycles = load_cycles(args.path, args.start, args.end, args.groups)
+    translation = ReplayTranslation()
+    durations: dict[str, list[float]] = {}
+    failed = 0
+    started = time.perf_counter()
+    for cycle in cycles:
+        translation.select(cycle)
+        for _ in range(args.repeat):
+            result = run_group(SCMCycle(translation, args.algorithm, cycle.now), cycle.group)
+            failed += not result.ok
+            for phase, duration in result.phase_durations.items():
+                durations.setdefault(phase, []).append(duration)
+            if args.verbose:
+                print(f'{cycle.group} {cycle.now.isoformat()} evs={cycle.ev_count} sent={result.sent_count}'
+                      f' (recorded {cycle.sent_count}) {result.duration * 1e3:.1f} ms')
+    elapsed = time.perf_counter() - started
+
+    print(f'{len(cycles)} cycles x {args.repeat} with {args.algorithm.__name__} in {elapsed:.2f}s'
+          f' ({sum(cycle.ev_count for cycle in cycles)} EVs, {failed} failed)')
+    for phase, values in durations.items():
+        array = np.array(values) * 1e3
+        print(f'  {phase:>8}: mean {array.mean():8.2f} ms  p50 {np.percentile(array, 50):8.2f} ms'
+              f'  p95 {np.percentile(array, 95):8.2f} ms  max {array.max():8.2f} ms')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
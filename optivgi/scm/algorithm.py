@@ -18,11 +18,33 @@ All specific charging optimization algorithms within Opti-VGI should inherit
 from the `Algorithm` class defined here and implement the `calculate` method.
 """
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
+
 from .ev import EV, ChargingRateUnit
-from .constants import AlgorithmConstants
+from .profile import ProfileCompression
+from .payload import ProfileTemplate
+from .fleet import EVFleet
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
+from .deadline import Deadline
+
+@dataclass
+class Quote:
+    """
+    Answer of an admission-control query for a hypothetical EV (see `Algorithm.quote`).
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: deliverable_energy: Energy (kWh or Ah) that can be delivered to the EV before its
+    #: departure using only the residual capacity, capped at the requested energy.
+    deliverable_energy: float
+    #: completion_time: Earliest time at which the requested energy is delivered, or None
+    #: if it cannot be fully delivered before departure.
+    completion_time: Optional[datetime]
+
 
 class Algorithm(ABC):
     """
@@ -32,30 +54,51 @@ class Algorithm(ABC):
 
     Attributes:
         evs (list[EV]): A list of electric vehicle objects to be scheduled.
+        fleet (EVFleet): The array-backed view of `evs`. The `power` of each EV is a
+            row of `fleet.power`.
         peak_power_demand (list[float]): A list representing the maximum allowed
             aggregate power for each time step over the planning horizon. The length
-            must match `AlgorithmConstants.TIMESTEPS`.
+            must match `time_grid.timesteps`.
         now (datetime): The reference start time for the scheduling calculation.
+        time_grid (TimeGrid): The resolution and horizon of the schedule (the fleet's time grid).
+        deadline (Optional[Deadline]): Optional time by which `calculate` should return. Set by
+            the SCM runner from the cycle's time budget; algorithms may shorten optional work
+            or bound their solvers when it is near.
     """
-    def __init__(self, evs: list[EV], peak_power_demand: list[float], now: datetime):
+
+    #: deadline: Optional time by which `calculate` should return (None for no deadline).
+    deadline: Optional[Deadline] = None
+
+    def __init__(self, evs: list[EV] | EVFleet, peak_power_demand: list[float], now: datetime,
+                 time_grid: Optional[TimeGrid] = None):
         """
         Initializes the Algorithm base class.
 
         Args:
-            evs: A list of EV objects representing the vehicles to be scheduled.
+            evs: The vehicles to be scheduled, either as a list of EV objects or as an
+                 `EVFleet`. A list is wrapped into a new `EVFleet`.
             peak_power_demand: The maximum aggregate power allowed for each time step.
-                               Must have length equal to `AlgorithmConstants.TIMESTEPS`.
+                               Must have length equal to `time_grid.timesteps`.
             now: The starting datetime for the scheduling horizon.
+            time_grid: The time grid of the schedule. Defaults to the time grid of `evs`
+                       if it is an `EVFleet`, otherwise to `DEFAULT_TIME_GRID`.
 
         Raises:
             AssertionError: If the length of `peak_power_demand` does not match
-                            `AlgorithmConstants.TIMESTEPS`.
+                            `time_grid.timesteps`, or if `time_grid` differs from
+                            the time grid of the given `EVFleet`.
         """
-        self.evs = evs
+        if isinstance(evs, EVFleet):
+            assert time_grid is None or time_grid == evs.time_grid, 'Time grid must match the time grid of the fleet'
+            self.fleet = evs
+        else:
+            self.fleet = EVFleet(evs, time_grid or DEFAULT_TIME_GRID)
+        self.evs = self.fleet.evs
+        self.time_grid = self.fleet.time_grid
         self.peak_power_demand = peak_power_demand
         self.now = now
 
-        assert len(self.peak_power_demand) == AlgorithmConstants.TIMESTEPS, f'Peak power demand must be the same length as the number of timesteps ({AlgorithmConstants.TIMESTEPS})'
+        assert len(self.peak_power_demand) == self.time_grid.timesteps, f'Peak power demand must be the same length as the number of timesteps ({self.time_grid.timesteps})'
 
     @abstractmethod
     def calculate(self) -> None:
@@ -63,12 +106,33 @@ class Algorithm(ABC):
         Executes the core logic of the charging algorithm.
 
         Implementations of this method should determine the power allocation for
-        each EV over the planning horizon (filling the `ev.power` list for each EV
-        in `self.evs`).
+        each EV over the planning horizon (filling the `ev.power` row for each EV
+        in `self.evs`, or the `self.fleet.power` matrix directly).
         """
         raise NotImplementedError
 
-    def get_current_power(self, unit: Optional[ChargingRateUnit] = None) -> dict[EV, dict]:
+    def effective_timesteps(self, margin: int = 0) -> int:
+        """
+        Returns the number of leading time steps an algorithm needs to calculate.
+
+        EVs only draw power before their departure index, so every step from the
+        largest departure index of the fleet onward is zero. Algorithms can limit
+        their calculation to the first `effective_timesteps()` steps and pad the
+        rest of the schedule with zeros.
+
+        Args:
+            margin: Number of additional steps to include after the latest departure
+                    (e.g. to constrain the ramp down to zero).
+
+        Returns:
+            The latest departure index plus `margin`, capped at `time_grid.timesteps`.
+        """
+        _, departure = self.fleet.window_indices(self.now)
+        latest = int(departure.max()) if departure.size else 0
+        return min(latest + margin, self.time_grid.timesteps)
+
+    def get_current_power(self, unit: Optional[ChargingRateUnit] = None,
+                          compression: Optional[ProfileCompression] = None) -> dict[EV, dict]:
         """
         Generates charging profiles containing only the power for the current time step.
 
@@ -78,40 +142,104 @@ class Algorithm(ABC):
         Args:
             unit: The desired charging rate unit (W or A) for the output profiles.
                   If None, the unit from the EV object is used.
+            compression: Optional compression options (quantization of the limit).
 
         Returns:
             A dictionary where keys are EV objects and values are their charging
             profiles formatted for the current time step.
         """
-        return {ev: ev.current_charging_profile(self.now, unit) for ev in self.evs}
+        return {ev: ev.current_charging_profile(self.now, unit, compression) for ev in self.evs}
 
-    def get_charging_profiles(self, unit: Optional[ChargingRateUnit] = None) -> dict[EV, dict]:
+    def get_charging_profiles(self, unit: Optional[ChargingRateUnit] = None,
+                              compression: Optional[ProfileCompression] = None) -> dict[EV, dict]:
         """
         Generates the full charging profiles for all EVs over the planning horizon.
 
         This method compiles the results of the `calculate` method into a format
         suitable for sending to the external system (e.g., via the Translation layer).
-        It calls `ev.charging_profile` for each EV.
+        The profiles of all EVs are encoded at once by `EVFleet.charging_profiles`.
 
         Args:
             unit: The desired charging rate unit (W or A) for the output profiles.
                   If None, the unit from the EV object is used.
+            compression: Optional options to quantize the limits and merge near-equal
+                         periods within an energy error bound (see `ProfileCompression`).
 
         Returns:
             A dictionary where keys are EV objects and values are their complete
             charging profiles over the planning horizon.
         """
-        return {ev: ev.charging_profile(self.now, unit) for ev in self.evs}
+        return self.fleet.charging_profiles(self.now, unit, compression)
+
+    def get_payloads(self, template: ProfileTemplate) -> dict[EV, dict | bytes]:
+        """
+        Generates the final request payloads for all EVs, as described by a Translation Layer's template.
+
+        Goes from the calculated power matrix straight to the payloads with
+        `EVFleet.payloads`, instead of building profiles with `get_charging_profiles`
+        that the Translation Layer transforms again.
+
+        Args:
+            template: The `ProfileTemplate` of the Translation Layer.
+
+        Returns:
+            A dictionary where keys are EV objects and values are their request payloads
+            (JSON bytes if `template.serialize` is set).
+        """
+        return self.fleet.payloads(self.now, template)
 
     def get_total_energy_charged(self) -> dict[EV, float]:
         """
         Calculates the total energy scheduled to be delivered to each EV.
 
-        Sums the energy delivered in each time step based on the calculated power profile.
-        It calls `ev.energy_charged()` for each EV.
+        Sums the energy delivered in each time step based on the calculated power profile,
+        for the whole fleet at once.
 
         Returns:
             A dictionary where keys are EV objects and values are the total calculated
             energy (in kWh or Ah, matching `ev.energy` unit) to be charged.
         """
-        return {ev: ev.energy_charged() for ev in self.evs}
+        return dict(zip(self.evs, self.fleet.energy_charged().tolist()))
+
+    def residual_capacity(self) -> np.ndarray:
+        """
+        Calculates the peak power capacity not used by the calculated schedule.
+
+        Returns:
+            An array with `peak_power_demand` minus the aggregate scheduled power for each time step.
+        """
+        return np.asarray(self.peak_power_demand, dtype=float) - self.fleet.aggregate_power()
+
+    def quote(self, ev: EV, residual: Optional[np.ndarray] = None) -> Quote:
+        """
+        Answers "how much energy can this EV get, and when would it be done?" without rescheduling.
+
+        The hypothetical `ev` only receives the residual capacity left by the committed
+        schedule (after `calculate`), limited by its `max_power` (or `max_power_curve`).
+        Steps where the residual capacity is below its `min_power` are skipped.
+        Neither the hypothetical EV nor the scheduled EVs are modified.
+
+        Args:
+            ev: The hypothetical EV, with its arrival and departure times, power limits,
+                and requested `energy`.
+            residual: The residual capacity returned by `residual_capacity`. Pass it to
+                      reuse it across several quotes for the same schedule.
+
+        Returns:
+            A `Quote` with the deliverable energy and the earliest completion time.
+        """
+        if residual is None:
+            residual = self.residual_capacity()
+        arrival_index, departure_index = ev.arrival_index(self.now, self.time_grid), ev.departure_index(self.now, self.time_grid)
+
+        window = residual[arrival_index:departure_index]
+        max_power = ev.max_power_array(self.now, self.time_grid)[arrival_index:departure_index]
+        power = np.where(window >= ev.min_power, np.minimum(window, max_power), 0.)
+        delivered = np.cumsum(power) * self.time_grid.power_energy_factor
+
+        if not delivered.size or delivered[-1] < ev.energy:
+            return Quote(deliverable_energy=float(delivered[-1]) if delivered.size else 0., completion_time=None)
+
+        completion_index = arrival_index + int(np.searchsorted(delivered, ev.energy)) + 1
+        return Quote(deliverable_energy=float(ev.energy),
+                     completion_time=self.now + completion_index * self.time_grid.resolution)
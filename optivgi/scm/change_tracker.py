@@ -0,0 +1,216 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides change detection for emitted charging profiles.
+
+Algorithms recalculate a profile for every EV every cycle, but at steady state
+most of them describe the same limits as the profile sent a cycle earlier, just
+with a later `startSchedule`. `ProfileChangeTracker` remembers the last profile
+sent to each (station, connector) and lets a Translation Layer send only the
+profiles that materially changed.
+
+Encoded profiles (see `optivgi.scm.serializer`) are only decoded when they differ
+from the previous profile of the connector in more than their `startSchedule`,
+so at steady state the pre-encoded payloads are not decoded again.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .ev import EV
+from .serializer import loads
+
+
+_START_SCHEDULE = b'"startSchedule":"'
+
+
+@dataclass(slots=True)
+class _SentProfile:
+    """The last profile sent to a connector, with its periods as absolute times."""
+    ev_id: int
+    header: dict
+    starts: list[datetime]
+    limits: list[float]
+    sent_at: datetime
+
+
+@dataclass(slots=True)
+class _DecodedProfile:
+    """The last encoded profile of a connector without its `startSchedule`, with its decoded fields."""
+    encoded: bytes
+    header: dict
+    offsets: list[timedelta]
+    limits: list[float]
+
+
+def _decode_profile(profile: dict) -> tuple[dict, str, list[timedelta], list[float]]:
+    """
+    Splits a profile into its non-schedule fields, its `startSchedule`, and its periods as offsets and limits.
+
+    A request body wrapping the profile (e.g. ``{"connectorId": 1, "csChargingProfiles": {...}}``)
+    is also accepted; its other members are part of the non-schedule fields.
+    """
+    if "chargingSchedule" not in profile:
+        wrapped = next((key for key, value in profile.items() if isinstance(value, dict) and "chargingSchedule" in value), None)
+        if wrapped is not None:
+            header, start_schedule, offsets, limits = _decode_profile(profile[wrapped])
+            header.update((key, value) for key, value in profile.items() if key != wrapped)
+            return header, start_schedule, offsets, limits
+    schedule = profile.get("chargingSchedule", {})
+    periods = schedule.get("chargingSchedulePeriod", [])
+    header = {key: value for key, value in profile.items() if key != "chargingSchedule"}
+    header["chargingRateUnit"] = schedule.get("chargingRateUnit")
+    header["duration"] = schedule.get("duration")
+    offsets = [timedelta(seconds=period["startPeriod"]) for period in periods]
+    limits = [period["limit"] for period in periods]
+    return header, schedule["startSchedule"], offsets, limits
+
+
+def _absolute_starts(start_schedule: str, offsets: list[timedelta]) -> list[datetime]:
+    """Returns the absolute start times of periods starting at `offsets` from `start_schedule`."""
+    start = datetime.fromisoformat(start_schedule).astimezone(timezone.utc)
+    return [start + offset for offset in offsets]
+
+
+def _limit_at(starts: list[datetime], limits: list[float], time: datetime) -> Optional[float]:
+    """Returns the limit in effect at `time` (the last period holds), or None before the first period."""
+    index = bisect_right(starts, time) - 1
+    return limits[index] if index >= 0 else None
+
+
+class ProfileChangeTracker:
+    """
+    Keeps the last charging profile sent to each (station, connector) and detects material changes.
+
+    A new profile is considered changed if:
+        - nothing was sent to the connector yet, or it was sent to a different EV,
+        - any field outside the schedule periods differs (unit, purpose, transaction, ...),
+        - at any time from the new profile's start, its limit differs from the
+          time-shifted previous profile by more than `deadband`, or
+        - the previous profile is older than `refresh_interval`.
+
+    Profiles are only remembered once `mark_sent` is called, so a failed send is retried next cycle.
+
+    Attributes:
+        deadband (float): Largest limit difference (in the profile's unit, W or A) that is ignored.
+        refresh_interval (Optional[timedelta]): Maximum age after which an unchanged profile is sent again.
+                                                None disables periodic refreshes.
+    """
+    def __init__(self, deadband: float = 0., refresh_interval: Optional[timedelta] = timedelta(minutes=15)):
+        """
+        Initializes an empty tracker.
+
+        Args:
+            deadband: Largest limit difference (in the profile's unit, W or A) that is ignored.
+            refresh_interval: Maximum age after which an unchanged profile is sent again.
+        """
+        self.deadband = deadband
+        self.refresh_interval = refresh_interval
+        self._sent: dict[tuple, _SentProfile] = {}
+        self._decoded: dict[tuple, _DecodedProfile] = {}
+
+    @staticmethod
+    def _key(ev: EV) -> tuple:
+        return (ev.station_id, ev.connector_id)
+
+    def _split_profile(self, ev: EV, profile: dict | bytes) -> tuple[dict, list[datetime], list[float]]:
+        """
+        Splits a profile (or its encoded JSON) into its non-schedule fields and its periods as absolute start times and limits.
+
+        An encoded profile equal to the previous one of the connector except for its
+        `startSchedule` reuses the decoded fields of the previous one.
+        """
+        if not isinstance(profile, bytes):
+            header, start_schedule, offsets, limits = _decode_profile(profile)
+            return header, _absolute_starts(start_schedule, offsets), limits
+
+        begin = profile.find(_START_SCHEDULE)
+        if begin < 0:
+            header, start_schedule, offsets, limits = _decode_profile(loads(profile))
+            return header, _absolute_starts(start_schedule, offsets), limits
+        begin += len(_START_SCHEDULE)
+        end = profile.index(b'"', begin)
+
+        encoded = profile[:begin] + profile[end:]
+        decoded = self._decoded.get(self._key(ev))
+        if decoded is None or decoded.encoded != encoded:
+            header, _, offsets, limits = _decode_profile(loads(profile))
+            decoded = self._decoded[self._key(ev)] = _DecodedProfile(encoded, header, offsets, limits)
+        return decoded.header, _absolute_starts(profile[begin:end].decode(), decoded.offsets), decoded.limits
+
+    def is_changed(self, ev: EV, profile: dict | bytes, now: datetime) -> bool:
+        """
+        Checks whether `profile` materially differs from the last profile sent to the EV's connector.
+
+        Args:
+            ev: The EV the profile is for.
+            profile: The new charging profile (see `EV.charging_profile`), its encoded JSON,
+                     or a request body wrapping it.
+            now: The current time, used to check the `refresh_interval`.
+
+        Returns:
+            True if the profile should be sent.
+        """
+        sent = self._sent.get(self._key(ev))
+        if sent is None or sent.ev_id != ev.ev_id:
+            return True
+        if self.refresh_interval is not None and now - sent.sent_at >= self.refresh_interval:
+            return True
+
+        header, starts, limits = self._split_profile(ev, profile)
+        if header != sent.header or not starts:
+            return True
+
+        # Both profiles are piecewise constant, so comparing at every period start is sufficient
+        for time in sorted({*starts, *(start for start in sent.starts if start > starts[0])}):
+            previous = _limit_at(sent.starts, sent.limits, time)
+            if previous is None or abs(_limit_at(starts, limits, time) - previous) > self.deadband:
+                return True
+        return False
+
+    def changed_profiles(self, powers: dict[EV, dict | bytes], now: datetime) -> dict[EV, dict | bytes]:
+        """
+        Filters `powers` down to the profiles that materially changed (see `is_changed`).
+
+        Args:
+            powers: A dictionary mapping EVs to their new charging profiles.
+            now: The current time.
+
+        Returns:
+            The subset of `powers` that should be sent.
+        """
+        return {ev: profile for ev, profile in powers.items() if self.is_changed(ev, profile, now)}
+
+    def mark_sent(self, ev: EV, profile: dict | bytes, now: datetime):
+        """
+        Remembers `profile` as the last profile sent to the EV's connector.
+
+        Args:
+            ev: The EV the profile was sent to.
+            profile: The charging profile that was sent.
+            now: The time the profile was sent.
+        """
+        header, starts, limits = self._split_profile(ev, profile)
+        self._sent[self._key(ev)] = _SentProfile(ev.ev_id, header, starts, limits, now)
+
+    def forget(self, ev: EV):
+        """Forgets the last profile sent to the EV's connector, so the next profile is always sent."""
+        self._sent.pop(self._key(ev), None)
+        self._decoded.pop(self._key(ev), None)
+
+    def clear(self):
+        """Forgets all sent profiles."""
+        self._sent.clear()
+        self._decoded.clear()
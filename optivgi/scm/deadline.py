@@ -0,0 +1,102 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides deadlines for time-bounded work.
+
+The SCM runner propagates a `Deadline` derived from the cycle's time budget
+(see `optivgi.budget`) to each group:
+
+- to the Translation Layer, which can bound its request timeouts with
+  `deadline_timeout` while a deadline is active (`deadline_scope`), and
+- to the algorithm (`Algorithm.deadline`), which can shorten optional work.
+"""
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """
+    A point in time (`time.monotonic`) by which some work should be finished.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: expires_at: The `time.monotonic` value of the deadline.
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> 'Deadline':
+        """Returns the deadline `seconds` from now."""
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        """Returns the seconds left until the deadline (negative once it has passed)."""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline has passed."""
+        return self.remaining() <= 0
+
+    def earliest(self, other: Optional['Deadline']) -> 'Deadline':
+        """Returns the earlier of this deadline and `other`."""
+        return self if other is None or self.expires_at <= other.expires_at else other
+
+
+_local = threading.local()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Returns the deadline active in the current thread (see `deadline_scope`), or None."""
+    return getattr(_local, 'deadline', None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Makes `deadline` the current deadline of the thread within the `with` block.
+
+    Args:
+        deadline: The deadline, or None for no deadline.
+    """
+    previous = current_deadline()
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = previous
+
+
+def deadline_timeout(default: float, minimum: float = 1.) -> float:
+    """
+    Returns a request timeout bounded by the current deadline.
+
+    Translation Layers can use it in place of a fixed timeout, so that their
+    requests do not outlive the time budget of the cycle.
+
+    Args:
+        default: The timeout (seconds) used without a deadline.
+        minimum: The smallest timeout (seconds) returned, so that a request
+                 still has a chance to complete after the deadline.
+
+    Returns:
+        The timeout in seconds.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return max(minimum, min(default, deadline.remaining()))
@@ -15,15 +15,22 @@
 Defines the Electric Vehicle (EV) data structure and related enums.
 
 This module includes the `EV` dataclass, which stores all relevant information
-about a vehicle for scheduling purposes, and the `ChargingRateUnit` enum used
-to specify power units.
+about a vehicle for scheduling purposes, the `ChargingRateUnit` enum used
+to specify power units, and the lazily allocated `HorizonPower` storage for the
+power schedule of an EV.
 """
+import operator
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 from typing import Optional, Self
 
-from .constants import EVConstants, AlgorithmConstants
+import numpy as np
+
+from .constants import EVConstants
+from .profile import ProfileCompression, build_charging_profile, run_length_encode
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
 
 
 
@@ -41,39 +48,208 @@ class ChargingRateUnit(Enum):
         """
         Converts a power or current value from one unit to another.
 
-        Requires voltage for W <-> A conversion. Uses `EVConstants.CHARGING_RATE_VOLTAGE`
-        as a default if voltage is not provided or is zero.
+        Thin scalar wrapper around `convert_array`.
+
+        Note:
+            With a missing or zero voltage, earlier versions returned
+            `EVConstants.CHARGING_RATE_VOLTAGE` itself for A -> W and W -> A conversions
+            (an operator precedence bug), whatever the value. The value is now converted
+            with that default voltage, e.g. 16 A -> 3840 W instead of 240 W.
 
         Args:
             value: The numerical value to convert.
-            from_unit: The unit of the input `value` (ChargingRateUnit.W or ChargingRateUnit.A).
+            unit: The unit of the input `value` (ChargingRateUnit.W or ChargingRateUnit.A).
             voltage: The nominal voltage (in Volts) to use for conversion. If None or zero,
                      `EVConstants.CHARGING_RATE_VOLTAGE` is used.
 
         Returns:
             The converted value in the target unit (`self`).
+        """
+        return float(self.convert_array(value, unit, voltage))
+
+    def convert_array(self, values: np.ndarray | Sequence[float] | float, unit: Self,
+                      voltage: Optional[np.ndarray | Sequence[float] | float] = None) -> np.ndarray:
+        """
+        Converts arrays of power (kW) or current (A) values to the target unit (`self`) in one call.
 
-        Raises:
-            ValueError: If voltage is required for conversion but is not provided or is zero/negative.
+        Values in `ChargingRateUnit.W` are interpreted as kW and returned in W, as in
+        `convert`. The W <-> A conversion uses `voltage`, which may be a scalar or an
+        array broadcastable against `values`. Per-row voltages of shape (N,) are
+        broadcast along the rows of a 2-D `values` matrix of shape (N, T), e.g. a
+        fleet power matrix. Missing or zero voltages fall back to
+        `EVConstants.CHARGING_RATE_VOLTAGE` (see the note in `convert` about the
+        results of earlier versions).
+
+        Args:
+            values: The values to convert (scalar, 1-D array, or 2-D matrix).
+            unit: The unit of the input `values` (ChargingRateUnit.W or ChargingRateUnit.A).
+            voltage: The nominal voltage(s) (in Volts) to use for conversion.
+
+        Returns:
+            The converted values in the target unit (`self`), with the shape of `values`.
         """
-        match unit:
-            case ChargingRateUnit.W:
-                power_w = value * 1000
-            case ChargingRateUnit.A:
-                power_w = value * voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE
+        values = np.asarray(values, dtype=float)
+        if voltage is None:
+            voltage = EVConstants.CHARGING_RATE_VOLTAGE
+        voltage = np.asarray(voltage, dtype=float)
+        if voltage.ndim == 1 and values.ndim == 2:
+            voltage = voltage[:, None]
+        voltage = np.where(voltage > 0, voltage, float(EVConstants.CHARGING_RATE_VOLTAGE))
+
+        power_w = values * voltage if unit == ChargingRateUnit.A else values * 1000
 
         if self == ChargingRateUnit.A:
-            return power_w / voltage if voltage else EVConstants.CHARGING_RATE_VOLTAGE
+            return power_w / voltage
 
         return power_w
 
-@dataclass
+class HorizonPower(Sequence):
+    """
+    Lazily allocated power schedule of an EV over the planning horizon.
+
+    Reads behave like a list of `timesteps` floats, but only the
+    window of steps that were written with non-zero power is stored, together with
+    its `offset` inside the horizon. Nothing is allocated until the first non-zero
+    write, so EVs that are not scheduled yet (e.g. future reservations) only cost
+    a few bytes. `np.asarray` returns the full-horizon array.
+
+    The saving only applies while an EV is idle, i.e. outside of an `EVFleet`.
+    Scheduling a group (every SCM cycle) builds an `EVFleet` with a dense matrix
+    of N × `timesteps` floats and makes each EV's `power` a row of it.
+
+    Attributes:
+        offset (int): Horizon index of the first stored step.
+        values (Optional[np.ndarray]): The stored window, or None if nothing was allocated yet.
+        timesteps (int): The length of the planning horizon.
+    """
+    __slots__ = ('offset', 'values', 'timesteps')
+
+    def __init__(self, values: Optional[Sequence[float] | np.ndarray] = None, offset: int = 0,
+                 timesteps: int = DEFAULT_TIME_GRID.timesteps):
+        """
+        Creates the storage, optionally with an initial window of `values` starting at `offset`.
+
+        Args:
+            values: Optional power values of the window. None allocates nothing.
+            offset: Horizon index of the first value.
+            timesteps: The length of the planning horizon (`TimeGrid.timesteps`).
+        """
+        self.offset = offset
+        self.values: Optional[np.ndarray] = None if values is None else np.array(values, dtype=float)
+        self.timesteps = timesteps
+
+    @property
+    def window(self) -> tuple[int, int]:
+        """The ``(start, stop)`` horizon indices of the stored window."""
+        return (self.offset, self.offset + (0 if self.values is None else len(self.values)))
+
+    def __len__(self) -> int:
+        """Returns the length of the planning horizon, `timesteps`."""
+        return self.timesteps
+
+    def _index(self, key) -> int:
+        index = operator.index(key)
+        if index < 0:
+            index += self.timesteps
+        if not 0 <= index < self.timesteps:
+            raise IndexError('HorizonPower index out of range')
+        return index
+
+    def __getitem__(self, key):
+        """Returns the power at a step (0 outside the window), or a list for a slice."""
+        if isinstance(key, slice):
+            return self.to_array()[key].tolist()
+        index = self._index(key)
+        start, stop = self.window
+        return float(self.values[index - start]) if start <= index < stop else 0.  # type: ignore
+
+    def __setitem__(self, key, value):
+        """Sets the power at a step or slice, growing the window for non-zero values outside it."""
+        if isinstance(key, slice):
+            power = self.to_array()
+            power[key] = value
+            self.assign(power)
+            return
+        index = self._index(key)
+        start, stop = self.window
+        if not start <= index < stop:
+            if not value:
+                return
+            self.reserve(index, index + 1)
+        self.values[index - self.offset] = value  # type: ignore
+
+    def __iter__(self) -> Iterator[float]:
+        """Iterates over the power of every step of the horizon."""
+        return iter(self.to_array().tolist())
+
+    def __array__(self, dtype=None, copy=None):  # pylint: disable=unused-argument
+        """Returns the full-horizon power array (always a new array)."""
+        power = self.to_array()
+        return power if dtype is None else power.astype(dtype, copy=False)
+
+    def __repr__(self) -> str:
+        start, stop = self.window
+        return f'{type(self).__name__}(window=({start}, {stop}))'
+
+    def reserve(self, start: int, stop: int):
+        """
+        Grows the stored window to cover at least the steps ``[start, stop)``.
+
+        The window grows geometrically, so scalar writes walking past its end are amortized O(1).
+
+        Args:
+            start: First horizon index to cover.
+            stop: Horizon index after the last step to cover.
+        """
+        if self.values is None:
+            self.offset, self.values = start, np.zeros(stop - start)
+            return
+        current_start, current_stop = self.window
+        if start >= current_start and stop <= current_stop:
+            return
+        growth = current_stop - current_start
+        new_start = max(0, min(start, current_start - growth)) if start < current_start else current_start
+        new_stop = min(self.timesteps, max(stop, current_stop + growth)) if stop > current_stop else current_stop
+        values = np.zeros(new_stop - new_start)
+        values[current_start - new_start:current_stop - new_start] = self.values
+        self.offset, self.values = new_start, values
+
+    def assign(self, power: Sequence[float] | np.ndarray):
+        """Replaces the schedule with the full-horizon `power`, storing only its non-zero span."""
+        power = np.asarray(power, dtype=float)
+        nonzero = np.flatnonzero(power)
+        if not nonzero.size:
+            self.offset, self.values = 0, None
+        else:
+            self.offset, self.values = int(nonzero[0]), power[nonzero[0]:nonzero[-1] + 1].copy()
+
+    def to_array(self) -> np.ndarray:
+        """Returns a new full-horizon array of the power at each step."""
+        power = np.zeros(self.timesteps)
+        self.write_to(power)
+        return power
+
+    def write_to(self, out: np.ndarray):
+        """
+        Writes the stored window into `out`, a zeroed full-horizon array (e.g. a row of `EVFleet.power`).
+
+        Steps beyond the length of `out` (e.g. a shorter time grid) are dropped.
+        """
+        if self.values is not None:
+            start, stop = self.window
+            stop = min(stop, len(out))
+            if start < stop:
+                out[start:stop] = self.values[:stop - start]
+
+
+@dataclass(slots=True)
 class EV:
     """
     Represents an Electric Vehicle and its charging requirements/constraints.
 
     This dataclass holds both static information (ID, power limits, energy needs)
-    and dynamic state (calculated power schedule).
+    and dynamic state (calculated power schedule). It uses `__slots__` to keep the
+    per-EV memory footprint small for large fleets.
     """
     #: ev_id: Unique identifier for the EV. This is used to track and manage
     #: the EV's charging session and is essential for scheduling and reporting.
@@ -120,13 +296,28 @@ class EV:
     #: conversions if needed. Defaults to `EVConstants.CHARGING_RATE_VOLTAGE`.
     voltage: float = EVConstants.CHARGING_RATE_VOLTAGE
 
-    #: power: A list storing the calculated charging power (in the unit specified by
+    #: priority: Relative weight of the EV when algorithms share the available power
+    #: among EVs (e.g., fleet vehicles or drivers with paid priority). An EV with
+    #: priority 2 receives twice the share of an EV with priority 1. Defaults to 1.
+    priority: float = 1.
+
+    #: max_power_curve: Optional time-varying limit on `max_power` (in `unit`), e.g. a
+    #: battery taper curve. Either a compact piecewise-constant sequence of
+    #: ``(datetime, max_power)`` breakpoints, where each limit applies from its
+    #: datetime until the next breakpoint, or a per-step array aligned with the
+    #: planning horizon. Values are clipped to ``[min_power, max_power]``.
+    #: Defaults to None (constant `max_power`). (repr=False to keep the representation short).
+    max_power_curve: Optional[np.ndarray | Sequence[tuple[datetime, float]]] = field(default=None, repr=False)
+
+    #: power: The calculated charging power (in the unit specified by
     #: `self.unit`) allocated to this EV for each time step defined by
-    #: `AlgorithmConstants.TIMESTEPS`. Initialized to zeros. This list is
+    #: the group's `TimeGrid`. Initialized to zeros. This sequence is
     #: populated by the SCM `Algorithm.calculate()` method. (repr=False to
     #: avoid overly long default string representation).
-    #: The length of this list is equal to `AlgorithmConstants.TIMESTEPS`.
-    power: list[float] = field(default_factory=lambda: [0.] * AlgorithmConstants.TIMESTEPS, repr=False)
+    #: The length of this sequence is equal to `TimeGrid.timesteps`.
+    #: Defaults to a lazily allocated `HorizonPower` that only stores the scheduled window.
+    #: Once the EV is part of an `EVFleet`, this is a row view into the fleet's power matrix.
+    power: list[float] | np.ndarray | HorizonPower = field(default_factory=HorizonPower, repr=False)
 
     def __eq__(self, other):
         """Checks equality based on ev_id."""
@@ -138,53 +329,89 @@ class EV:
         """Computes hash based on ev_id."""
         return hash(self.ev_id)
 
-    def departure_index(self, now: datetime) -> int:
+    def departure_index(self, now: datetime, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> int:
         """
         Calculates the index of the time step corresponding to the EV's departure time.
 
         The index is relative to the planning horizon starting at `now`.
-        The result is clamped between 0 and `AlgorithmConstants.TIMESTEPS - 1`.
+        The result is clamped between 0 and `time_grid.timesteps - 1`.
 
         Args:
             now: The reference start time of the planning horizon.
+            time_grid: The time grid of the planning horizon.
 
         Returns:
             The integer index for the departure time step. Returns 0 if departure is
             before or at `now`.
         """
-        departure_index = int((self.departure_time - now).total_seconds() / AlgorithmConstants.RESOLUTION.total_seconds())
-        return max(0, min(departure_index, AlgorithmConstants.TIMESTEPS - 1))
+        return time_grid.index(self.departure_time, now)
 
-    def arrival_index(self, now: datetime) -> int:
+    def arrival_index(self, now: datetime, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> int:
         """
         Calculates the index of the time step corresponding to the EV's arrival time.
 
         The index is relative to the planning horizon starting at `now`.
-        The result is clamped between 0 and `AlgorithmConstants.TIMESTEPS - 1`.
+        The result is clamped between 0 and `time_grid.timesteps - 1`.
 
         Args:
             now: The reference start time of the planning horizon.
+            time_grid: The time grid of the planning horizon.
 
         Returns:
             The integer index for the arrival time step. Returns 0 if arrival is
             before or at `now`.
         """
-        arrival_index = int((self.arrival_time - now).total_seconds() / AlgorithmConstants.RESOLUTION.total_seconds())
-        return max(0, min(arrival_index, AlgorithmConstants.TIMESTEPS - 1))
+        return time_grid.index(self.arrival_time, now)
 
-    def energy_charged(self) -> float:
+    def max_power_array(self, now: datetime, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> np.ndarray:
+        """
+        Calculates the maximum charging power for each time step of the planning horizon.
+
+        Expands `max_power_curve` into a per-step array starting at `now`. Steps not
+        covered by the curve use `max_power`.
+
+        Args:
+            now: The reference start time of the planning horizon.
+            time_grid: The time grid of the planning horizon. A per-step `max_power_curve`
+                       array must use the same grid.
+
+        Returns:
+            An array of length `time_grid.timesteps` with the maximum power per step.
+        """
+        max_power = np.full(time_grid.timesteps, float(self.max_power))
+        if self.max_power_curve is None:
+            return max_power
+
+        if isinstance(self.max_power_curve, np.ndarray):
+            curve = self.max_power_curve[:time_grid.timesteps]
+            max_power[:len(curve)] = curve
+        elif self.max_power_curve:
+            resolution = time_grid.resolution.total_seconds()
+            starts = np.array([max(0, int((time - now).total_seconds() / resolution)) for time, _ in self.max_power_curve])
+            limits = np.array([limit for _, limit in self.max_power_curve], dtype=float)
+            order = np.argsort(starts, kind='stable')
+            segment = np.searchsorted(starts[order], np.arange(time_grid.timesteps), side='right') - 1
+            max_power = np.where(segment >= 0, limits[order][segment], max_power)
+
+        return np.clip(max_power, self.min_power, self.max_power)
+
+    def energy_charged(self, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> float:
         """
         Calculates the total energy scheduled to be delivered based on the `power` list.
 
         Sums the power allocated in each time step and converts it to energy using
-        `AlgorithmConstants.POWER_ENERGY_FACTOR`.
+        `time_grid.power_energy_factor`.
+
+        Args:
+            time_grid: The time grid of `power`.
 
         Returns:
             The total calculated energy in kWh (if `unit` is W) or Ah (if `unit` is A).
         """
-        return sum(self.power) * AlgorithmConstants.POWER_ENERGY_FACTOR
+        return sum(self.power) * time_grid.power_energy_factor
 
-    def current_charging_profile(self, now: datetime, unit: Optional[ChargingRateUnit] = None) -> dict:
+    def current_charging_profile(self, now: datetime, unit: Optional[ChargingRateUnit] = None,
+                                 compression: Optional[ProfileCompression] = None) -> dict:
         """
         Generates a charging profile dictionary containing only the power for the current time step.
 
@@ -195,6 +422,8 @@ class EV:
             now: The current time, used to set the profile's start schedule time.
             unit: The desired output unit (`ChargingRateUnit.W` or `ChargingRateUnit.A`)
                   for the 'limit' value in the profile. If None, `self.unit` is used.
+            compression: Optional compression options; only the quantization applies
+                         to a single-period profile.
 
         Returns:
             A dictionary representing the charging profile for the current time step.
@@ -202,34 +431,28 @@ class EV:
         """
         if unit is None:
             unit = self.unit
-        return {
-            "chargingProfileId": EVConstants.CHARGING_PROFILE_ID,
-            "stackLevel": EVConstants.CHARGING_PROFILE_STACK_LEVEL,
-            "chargingProfilePurpose": EVConstants.CHARGING_PROFILE_PURPOSE,
-            "chargingProfileKind": EVConstants.CHARGING_PROFILE_KIND,
-            "chargingSchedule": {
-                "startSchedule": now.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                "chargingRateUnit": unit.value,
-                "chargingSchedulePeriod":[{
-                    "startPeriod": 0,
-                    "limit": unit.convert(self.power[0], self.unit, self.voltage),
-                    "numberPhases": 1
-                }]
-            }
-        }
-
-    def charging_profile(self, now: datetime, unit: Optional[ChargingRateUnit] = None) -> dict:
+        limit = unit.convert(self.power[0], self.unit, self.voltage)
+        if compression is not None:
+            limit = compression.quantize(np.float64(limit)).item()
+        return build_charging_profile(now.strftime('%Y-%m-%dT%H:%M:%SZ'), unit.value, [0], [limit])
+
+    def charging_profile(self, now: datetime, unit: Optional[ChargingRateUnit] = None,
+                         compression: Optional[ProfileCompression] = None,
+                         time_grid: TimeGrid = DEFAULT_TIME_GRID) -> dict:
         """
         Generates the full charging profile dictionary over the entire planning horizon.
 
         This compiles the calculated `self.power` list into a structure suitable for
         protocols like OCPP, including compression to reduce the number of periods
-        where the power limit remains constant.
+        where the power limit remains constant. See `optivgi.scm.profile` for the
+        vectorized encoder, and `EVFleet.charging_profiles` to encode a whole fleet at once.
 
         Args:
             now: The current time, used to set the profile's start schedule time.
             unit: The desired output unit (`ChargingRateUnit.W` or `ChargingRateUnit.A`)
                   for the 'limit' values in the profile periods. If None, `self.unit` is used.
+            compression: Optional options to quantize the limits and merge near-equal periods.
+            time_grid: The time grid of `power`.
 
         Returns:
             A dictionary representing the complete charging profile.
@@ -238,28 +461,10 @@ class EV:
         if unit is None:
             unit = self.unit
 
-        charging_schedule_period = [
-            {
-                "startPeriod": i * AlgorithmConstants.RESOLUTION.total_seconds(),
-                "limit": unit.convert(power, self.unit, self.voltage),
-                "numberPhases": 1
-            }
-            for i, power in enumerate(self.power)
-        ]
-
-        charging_schedule_period_compressed = [charging_schedule_period[0]]
-        for period in charging_schedule_period[1:]:
-            if period['limit'] != charging_schedule_period_compressed[-1]['limit']:
-                charging_schedule_period_compressed.append(period)
-
-        return {
-            "chargingProfileId": EVConstants.CHARGING_PROFILE_ID,
-            "stackLevel": EVConstants.CHARGING_PROFILE_STACK_LEVEL,
-            "chargingProfilePurpose": EVConstants.CHARGING_PROFILE_PURPOSE,
-            "chargingProfileKind": EVConstants.CHARGING_PROFILE_KIND,
-            "chargingSchedule": {
-                "startSchedule": now.strftime('%Y-%m-%dT%H:%M:%SZ'),
-                "chargingRateUnit": unit.value,
-                "chargingSchedulePeriod": charging_schedule_period_compressed
-            }
-        }
+        limits = unit.convert_array(self.power, self.unit, self.voltage)[None, :]
+        if compression is None:
+            (starts, values), = run_length_encode(limits, time_grid)
+        else:
+            (starts, values), = run_length_encode(compression.quantize(limits), time_grid)
+            starts, values = compression.merge(starts, values, time_grid)
+        return build_charging_profile(now.strftime('%Y-%m-%dT%H:%M:%SZ'), unit.value, starts, values)
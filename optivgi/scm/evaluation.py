@@ -0,0 +1,207 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides robust evaluation of computed schedules across forecast scenarios.
+
+`get_peak_power_demand` returns a single deterministic forecast. This module scores
+a schedule computed by any `Algorithm` against K alternative scenarios at once
+(peak power demand forecasts and, optionally, EV arrival/departure scenarios).
+Scoring is vectorized over chunks of scenarios, whose size is bounded by the
+memory of the (scenarios, EVs, time steps) presence mask. The chunks can be
+scored by several threads: only the NumPy kernels (the mask and its reduction)
+release the GIL and run in parallel, the Python code around them does not.
+`select_robust_schedule` runs several algorithms and picks the schedule with the
+best worst-case score within a time budget.
+"""
+import os
+import time
+import logging
+import dataclasses
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Type
+
+import numpy as np
+
+from .algorithm import Algorithm
+from .constants import AlgorithmConstants
+from .ev import EV, HorizonPower
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
+
+#: VIOLATION_PENALTY: Weight of energy drawn above the peak power limit relative to
+#: unmet EV energy in `ScenarioScores.robust_score`.
+VIOLATION_PENALTY = 10.
+
+#: MIN_CHUNK_SIZE: Minimum number of scenarios per worker thread.
+MIN_CHUNK_SIZE = 8
+
+#: MAX_CHUNK_ELEMENTS: Maximum number of elements (scenarios × EVs × time steps) of the presence
+#: mask of a chunk. Scoring a chunk peaks at two bytes per element (about 32 MB): the two boolean
+#: comparisons the mask is built from. The mask is never copied as float64, since `einsum`
+#: (without `optimize`) casts it in small buffered blocks while summing.
+MAX_CHUNK_ELEMENTS = 2**24
+
+
+@dataclass
+class ScenarioScores:
+    """
+    Scores of a single schedule across K scenarios. Each attribute has shape (K,).
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: max_violation: Largest amount (kW or A) by which the aggregate power exceeds the scenario's peak power demand.
+    max_violation: np.ndarray
+    #: violation_energy: Energy (kWh or Ah) drawn above the scenario's peak power demand.
+    violation_energy: np.ndarray
+    #: unmet_energy: Total requested energy (kWh or Ah) not delivered in the scenario.
+    unmet_energy: np.ndarray
+    #: min_headroom: Smallest margin (kW or A) between the scenario's peak power demand and the aggregate power.
+    min_headroom: np.ndarray
+
+    def robust_score(self) -> float:
+        """
+        Returns the worst-case cost over all scenarios (lower is better).
+
+        The cost of a scenario is its unmet energy plus `VIOLATION_PENALTY` times
+        the energy drawn above the peak power demand.
+        """
+        return float(np.max(self.unmet_energy + VIOLATION_PENALTY * self.violation_energy))
+
+
+def _score_chunk(power: np.ndarray, energy: np.ndarray, peak: np.ndarray,
+                 arrival: np.ndarray, departure: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Scores a chunk of scenarios. `peak` is (k, T); `arrival` and `departure` are (k, N).
+
+    Allocates the (k, N, T) presence mask of the chunk (see `MAX_CHUNK_ELEMENTS`).
+    Energies (`energy` and the returned violation and unmet energies) are in power × time step units.
+    """
+    steps = np.arange(power.shape[1])
+    present = (steps >= arrival[:, :, None]) & (steps < departure[:, :, None])
+    # Not optimized: the optimized path would cast the whole mask to float64 (8 bytes per element)
+    load = np.einsum('knt,nt->kt', present, power, optimize=False)
+
+    cumulative = np.concatenate([np.zeros((power.shape[0], 1)), np.cumsum(power, axis=1)], axis=1)
+    rows = np.arange(power.shape[0])
+    delivered = cumulative[rows, departure] - cumulative[rows, arrival]
+    unmet = np.maximum(energy - delivered, 0.).sum(axis=1)
+
+    excess = load - peak
+    return (np.maximum(excess.max(axis=1, initial=0.), 0.),
+            np.maximum(excess, 0.).sum(axis=1),
+            unmet,
+            -excess.max(axis=1, initial=-np.inf))
+
+
+def evaluate_schedule(algorithm: Algorithm, peak_power_scenarios: np.ndarray,
+                      arrival_indices: Optional[np.ndarray] = None,
+                      departure_indices: Optional[np.ndarray] = None,
+                      max_workers: Optional[int] = None) -> ScenarioScores:
+    """
+    Scores the schedule computed by `algorithm` against K scenarios.
+
+    In each scenario, an EV only draws its scheduled power while it is present
+    (between its scenario arrival and departure indices).
+
+    Args:
+        algorithm: An algorithm whose `calculate` method has already been run.
+        peak_power_scenarios: Peak power demand scenarios with shape (K, T), or (T,) for a single scenario.
+        arrival_indices: Optional arrival time step of each EV per scenario, shape (K, N).
+                         Defaults to each EV's `arrival_index` in every scenario.
+        departure_indices: Optional departure time step of each EV per scenario, shape (K, N).
+                           Defaults to each EV's `departure_index` in every scenario.
+        max_workers: Maximum number of threads scoring chunks of scenarios concurrently
+                     (the NumPy kernels of the chunks run in parallel). Defaults to the number of CPUs.
+
+    Returns:
+        The `ScenarioScores` of the schedule.
+    """
+    peak = np.atleast_2d(np.asarray(peak_power_scenarios, dtype=float))
+    scenarios = peak.shape[0]
+    evs = algorithm.evs
+    power = algorithm.fleet.power
+    factor = algorithm.time_grid.power_energy_factor
+    energy = algorithm.fleet.energy / factor
+
+    default_arrival, default_departure = algorithm.fleet.window_indices(algorithm.now)
+    if arrival_indices is None:
+        arrival_indices = default_arrival
+    if departure_indices is None:
+        departure_indices = default_departure
+    arrival = np.broadcast_to(np.asarray(arrival_indices, dtype=np.int64), (scenarios, len(evs)))
+    departure = np.broadcast_to(np.asarray(departure_indices, dtype=np.int64), (scenarios, len(evs)))
+
+    def score(chunk: np.ndarray) -> tuple[np.ndarray, ...]:
+        return _score_chunk(power, energy, peak[chunk], arrival[chunk], departure[chunk])
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, scenarios // MIN_CHUNK_SIZE))
+    chunk_size = max(1, MAX_CHUNK_ELEMENTS // max(power.size, 1))
+    chunks = np.array_split(np.arange(scenarios), max(workers, -(-scenarios // chunk_size)))
+    if workers == 1:
+        results = [score(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(score, chunks))
+
+    max_violation, violation_steps, unmet_steps, min_headroom = (np.concatenate(columns) for columns in zip(*results))
+    return ScenarioScores(max_violation, violation_steps * factor, unmet_steps * factor, min_headroom)
+
+
+def select_robust_schedule(algorithm_classes: Sequence[Type[Algorithm]], evs: list[EV], # pylint: disable=too-many-arguments,too-many-positional-arguments
+                           peak_power_demand: list[float], now: datetime,
+                           peak_power_scenarios: np.ndarray,
+                           arrival_indices: Optional[np.ndarray] = None,
+                           departure_indices: Optional[np.ndarray] = None,
+                           budget: timedelta = AlgorithmConstants.RESOLUTION,
+                           time_grid: TimeGrid = DEFAULT_TIME_GRID) -> tuple[Algorithm, ScenarioScores]:
+    """
+    Runs several algorithms and selects the schedule with the best `robust_score`.
+
+    Each algorithm is run on its own copy of the EVs, so the input EVs are not modified.
+    Candidates are run in order until the time `budget` is spent; the first
+    candidate is always run.
+
+    Args:
+        algorithm_classes: The candidate algorithm classes, in order of preference.
+        evs: The EVs to be scheduled.
+        peak_power_demand: The forecast peak power demand used to calculate the schedules.
+        now: The starting datetime for the scheduling horizon.
+        peak_power_scenarios: Peak power demand scenarios used for scoring, shape (K, T).
+        arrival_indices: Optional arrival indices per scenario, see `evaluate_schedule`.
+        departure_indices: Optional departure indices per scenario, see `evaluate_schedule`.
+        budget: The maximum wall time for calculating and scoring candidates.
+        time_grid: The time grid of the schedules.
+
+    Returns:
+        A tuple of the selected (calculated) algorithm and its scores.
+    """
+    deadline = time.monotonic() + budget.total_seconds()
+    best_algorithm: Optional[Algorithm] = None
+    best_scores: Optional[ScenarioScores] = None
+    for algorithm_cls in algorithm_classes:
+        if best_algorithm is not None and time.monotonic() >= deadline:
+            logging.warning('Robust selection budget exhausted, skipping %s', algorithm_cls.__name__)
+            continue
+        candidate_evs = [dataclasses.replace(ev, power=HorizonPower(timesteps=time_grid.timesteps)) for ev in evs]
+        algorithm = algorithm_cls(candidate_evs, peak_power_demand, now, time_grid)
+        algorithm.calculate()
+        scores = evaluate_schedule(algorithm, peak_power_scenarios, arrival_indices, departure_indices)
+        logging.info('Robust score of %s: %s', algorithm_cls.__name__, scores.robust_score())
+        if best_scores is None or scores.robust_score() < best_scores.robust_score():
+            best_algorithm, best_scores = algorithm, scores
+
+    assert best_algorithm is not None and best_scores is not None, 'At least one algorithm class is required'
+    return best_algorithm, best_scores
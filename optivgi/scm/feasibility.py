@@ -0,0 +1,206 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides a fast feasibility pre-check for SCM inputs.
+
+Before any algorithm runs, the inputs of a group (EVs and `peak_power_demand`)
+can be analysed in roughly O(N + T) time using difference arrays. The analysis
+detects time steps where the sum of `min_power` of the connected EVs exceeds the
+peak power limit, and EVs whose energy target cannot be reached within their
+connection window. An optional load-shedding repair relaxes the minimum power
+of selected EVs so that the algorithms receive a feasible problem.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from .ev import EV
+from .fleet import EVFleet
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
+
+#: TOLERANCE: Absolute tolerance (kW or A) used when comparing aggregate power to the peak limit.
+TOLERANCE = 1e-6
+
+
+@dataclass
+class FeasibilityReport:
+    """
+    Structured diagnosis of the feasibility of an SCM problem.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: min_power_load: Aggregate minimum power (kW or A) required at each time step.
+    min_power_load: np.ndarray
+    #: max_power_load: Aggregate maximum power (kW or A) the connected EVs can draw at each time step.
+    max_power_load: np.ndarray
+    #: overloaded_steps: Indices of the time steps where `min_power_load` exceeds the peak power demand.
+    overloaded_steps: np.ndarray
+    #: max_overload: Largest amount (kW or A) by which `min_power_load` exceeds the peak power demand.
+    max_overload: float
+    #: unreachable_evs: Mapping of EV IDs to the energy (kWh or Ah) they cannot receive
+    #: even when charging at `max_power` (or their `max_power_curve`) for their whole connection window.
+    unreachable_evs: dict[int, float]
+    #: energy_shortfall: Energy (kWh or Ah) the group cannot deliver in total because
+    #: of the peak power demand and the EV power limits.
+    energy_shortfall: float
+
+    @property
+    def power_feasible(self) -> bool:
+        """True if the minimum power of all EVs fits within the peak power demand at every step."""
+        return self.overloaded_steps.size == 0
+
+    @property
+    def energy_feasible(self) -> bool:
+        """True if every EV can reach its energy target and the group can deliver the total energy."""
+        return not self.unreachable_evs and self.energy_shortfall <= TOLERANCE
+
+    @property
+    def feasible(self) -> bool:
+        """True if the problem is both power and energy feasible."""
+        return self.power_feasible and self.energy_feasible
+
+
+def _time_grid(evs: list[EV] | EVFleet) -> TimeGrid:
+    """Returns the time grid of a fleet, or `DEFAULT_TIME_GRID` for a list of EVs."""
+    return evs.time_grid if isinstance(evs, EVFleet) else DEFAULT_TIME_GRID
+
+
+def _window_indices(evs: list[EV] | EVFleet, now: datetime) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the arrival and departure indices of all EVs as integer arrays, cached if `evs` is a fleet."""
+    if isinstance(evs, EVFleet):
+        return evs.window_indices(now)
+    arrival = np.fromiter((ev.arrival_index(now) for ev in evs), dtype=np.int64, count=len(evs))
+    departure = np.fromiter((ev.departure_index(now) for ev in evs), dtype=np.int64, count=len(evs))
+    return arrival, departure
+
+
+def _min_power(evs: list[EV] | EVFleet) -> np.ndarray:
+    """Returns the minimum power of all EVs, from the `min_power` column if `evs` is a fleet (a copy otherwise)."""
+    if isinstance(evs, EVFleet):
+        return evs.min_power
+    return np.fromiter((ev.min_power for ev in evs), dtype=float, count=len(evs))
+
+
+def _windowed_load(values: np.ndarray, arrival: np.ndarray, departure: np.ndarray, timesteps: int) -> np.ndarray:
+    """Sums per-EV values over their `[arrival, departure)` windows using a difference array."""
+    diff = np.zeros(timesteps + 1)
+    np.add.at(diff, arrival, values)
+    np.add.at(diff, departure, -values)
+    return np.cumsum(diff[:-1])
+
+
+def check_feasibility(evs: list[EV] | EVFleet, peak_power_demand: list[float], now: datetime) -> FeasibilityReport:
+    """
+    Analyses whether the SCM problem for a group can be solved.
+
+    The aggregate minimum and maximum power per time step are computed with
+    difference arrays, so the check runs in O(N + T) for N EVs and T time steps.
+    Each EV with a `max_power_curve` adds O(T) to expand its curve.
+
+    Args:
+        evs: The EVs to be scheduled, or their `EVFleet` to reuse its cached window indices
+             and its time grid (a list uses `DEFAULT_TIME_GRID`).
+        peak_power_demand: The maximum aggregate power allowed for each time step.
+        now: The starting datetime for the scheduling horizon.
+
+    Returns:
+        A `FeasibilityReport` describing min-power overloads and unreachable energy targets.
+    """
+    time_grid = _time_grid(evs)
+    peak = np.asarray(peak_power_demand, dtype=float)
+    arrival, departure = _window_indices(evs, now)
+    min_power = _min_power(evs)
+    max_power = np.fromiter((ev.max_power for ev in evs), dtype=float, count=len(evs))
+    energy = np.fromiter((ev.energy for ev in evs), dtype=float, count=len(evs))
+
+    min_power_load = _windowed_load(min_power, arrival, departure, time_grid.timesteps)
+    max_power_load = _windowed_load(max_power, arrival, departure, time_grid.timesteps)
+
+    reachable = max_power * (departure - arrival) * time_grid.power_energy_factor
+    for i, ev in enumerate(evs):
+        if ev.max_power_curve is not None:
+            window = slice(arrival[i], departure[i])
+            curve = ev.max_power_array(now, time_grid)[window]
+            max_power_load[window] += curve - max_power[i]
+            reachable[i] = curve.sum() * time_grid.power_energy_factor
+
+    overload = min_power_load - peak
+    overloaded_steps = np.flatnonzero(overload > TOLERANCE)
+
+    missing = energy - reachable
+    unreachable_evs = {evs[i].ev_id: float(missing[i]) for i in np.flatnonzero(missing > TOLERANCE)}
+
+    deliverable = np.minimum(np.maximum(peak, 0.), max_power_load).sum() * time_grid.power_energy_factor
+    energy_shortfall = max(0., float(energy.sum() - deliverable))
+
+    return FeasibilityReport(
+        min_power_load=min_power_load,
+        max_power_load=max_power_load,
+        overloaded_steps=overloaded_steps,
+        max_overload=float(overload.max()) if overloaded_steps.size else 0.,
+        unreachable_evs=unreachable_evs,
+        energy_shortfall=energy_shortfall,
+    )
+
+
+def shed_load(evs: list[EV] | EVFleet, peak_power_demand: list[float], now: datetime,
+              report: Optional[FeasibilityReport] = None) -> list[EV]:
+    """
+    Repairs min-power overloads by shedding the minimum power of selected EVs.
+
+    EVs are considered in shedding order: future (inactive) EVs first, then EVs
+    with the latest departure, since they have the most flexibility to catch up
+    later. The minimum power of every EV connected during a still overloaded step
+    is set to zero until no overload remains.
+
+    Only the `min_power` column of an `EVFleet` is modified; the algorithms read
+    the minimum power from this column. The EV objects (returned by the Translation
+    Layer) are never modified, so for a plain list of EVs the shedding is only computed.
+
+    Args:
+        evs: The EVs to be scheduled, or their `EVFleet`.
+        peak_power_demand: The maximum aggregate power allowed for each time step.
+        now: The starting datetime for the scheduling horizon.
+        report: A report previously returned by `check_feasibility` for the same
+                inputs. Computed if not provided.
+
+    Returns:
+        The list of EVs whose minimum power was shed.
+    """
+    if report is None:
+        report = check_feasibility(evs, peak_power_demand, now)
+    if report.power_feasible:
+        return []
+
+    excess = report.min_power_load - np.asarray(peak_power_demand, dtype=float)
+    arrival, departure = _window_indices(evs, now)
+    min_power = _min_power(evs)
+
+    def shedding_order(i: int) -> tuple[int, int, int]:
+        """Sorts inactive EVs (0) before active EVs (1), then by latest departure, then by EV ID."""
+        return 1 if evs[i].active else 0, -int(departure[i]), evs[i].ev_id
+
+    shed = []
+    for i in sorted(range(len(evs)), key=shedding_order):
+        window = excess[arrival[i]:departure[i]]
+        if min_power[i] <= 0 or not (window > TOLERANCE).any():
+            continue
+        window -= min_power[i]
+        min_power[i] = 0.
+        shed.append(evs[i])
+        if not (excess > TOLERANCE).any():
+            break
+    return shed
@@ -0,0 +1,283 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Defines the array-backed `EVFleet` container.
+
+An `EVFleet` stores the scheduling inputs of a group of EVs as NumPy columns
+(struct-of-arrays) together with a single 2-D power matrix, so that algorithms
+and post-processing can operate on the whole fleet with vectorized operations.
+The `power` attribute of each `EV` in the fleet becomes a row view into the
+power matrix, so per-EV code keeps working unchanged.
+
+The arrival and departure indices of all EVs are computed once per `now` and
+cached (`EVFleet.window_indices`), and rolled forward when `now` advances.
+"""
+from collections.abc import Iterator, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+from .ev import EV, ChargingRateUnit, HorizonPower
+from .payload import ProfileTemplate
+from .profile import ProfileCompression, build_charging_profile, run_length_encode
+from .serializer import ProfileSerializer, dumps
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_microseconds(dt: datetime) -> int:
+    """
+    Converts a naive or timezone-aware datetime to integer microseconds since the epoch.
+
+    Naive datetimes are counted from the naive epoch, so their values can only be
+    compared with those of other naive datetimes (see `EVFleet.window_indices`).
+    """
+    return (dt - (_EPOCH if dt.tzinfo is None else _EPOCH_UTC)) // _MICROSECOND
+
+
+def window_steps(times_us: np.ndarray, now: datetime, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> np.ndarray:
+    """
+    Returns the (unclamped) number of whole time steps from `now` to each of `times_us`.
+
+    Clamping the result to ``[0, time_grid.timesteps - 1]`` gives the same
+    indices as `EV.arrival_index` and `EV.departure_index`.
+
+    Args:
+        times_us: Times in microseconds since the epoch.
+        now: The starting datetime for the scheduling horizon.
+        time_grid: The time grid of the scheduling horizon.
+    """
+    return (times_us - to_microseconds(now)) // (time_grid.resolution // _MICROSECOND)
+
+
+class EVFleet:
+    """
+    Struct-of-arrays container for a group of EVs.
+
+    Each per-EV attribute is stored as a NumPy column indexed by the position of
+    the EV in `evs`. Arrival and departure times are stored as integer
+    microseconds since the epoch.
+
+    Attributes:
+        evs (list[EV]): The EV objects, whose `power` are row views into `power`.
+        ev_ids (np.ndarray): EV identifiers.
+        active (np.ndarray): Whether each EV is currently connected.
+        station_ids (np.ndarray): Station identifiers.
+        connector_ids (np.ndarray): Connector identifiers.
+        min_power (np.ndarray): Minimum charging power (kW or A), set to zero for EVs shed by `shed_load`.
+        max_power (np.ndarray): Maximum charging power (kW or A).
+        energy (np.ndarray): Requested energy (kWh or Ah).
+        voltage (np.ndarray): Nominal voltage (V).
+        priority (np.ndarray): Sharing priority weights.
+        arrival_us (np.ndarray): Arrival times in microseconds since the epoch.
+        departure_us (np.ndarray): Departure times in microseconds since the epoch.
+        power (np.ndarray): Power matrix (kW or A) of shape (N, `time_grid.timesteps`). It is dense,
+            including for EVs whose `HorizonPower` only stored their scheduled window.
+        time_grid (TimeGrid): The time grid of the power matrix and the window indices.
+    """
+    def __init__(self, evs: Sequence[EV], time_grid: TimeGrid = DEFAULT_TIME_GRID):
+        """
+        Builds the fleet columns from EV objects and rebinds their `power` to the power matrix.
+
+        The current content of each `ev.power` is copied into the power matrix
+        (truncated or zero-padded to the length of the time grid).
+
+        Args:
+            evs: The EVs of the group.
+            time_grid: The time grid of the group.
+        """
+        self.evs = list(evs)
+        self.time_grid = time_grid
+        count = len(self.evs)
+
+        def column(values, dtype):
+            return np.fromiter(values, dtype=dtype, count=count)
+
+        self.ev_ids = column((ev.ev_id for ev in self.evs), np.int64)
+        self.active = column((ev.active for ev in self.evs), bool)
+        self.station_ids = np.array([ev.station_id for ev in self.evs])
+        self.connector_ids = column((ev.connector_id for ev in self.evs), np.int64)
+        self.min_power = column((ev.min_power for ev in self.evs), float)
+        self.max_power = column((ev.max_power for ev in self.evs), float)
+        self.energy = column((ev.energy for ev in self.evs), float)
+        self.voltage = column((ev.voltage for ev in self.evs), float)
+        self.priority = column((ev.priority for ev in self.evs), float)
+        self.arrival_us = column((to_microseconds(ev.arrival_time) for ev in self.evs), np.int64)
+        self.departure_us = column((to_microseconds(ev.departure_time) for ev in self.evs), np.int64)
+        self._aware = {time.tzinfo is not None for ev in self.evs for time in (ev.arrival_time, ev.departure_time)}
+
+        self.power = np.zeros((count, time_grid.timesteps))
+        for i, ev in enumerate(self.evs):
+            if isinstance(ev.power, HorizonPower):
+                ev.power.write_to(self.power[i])
+            else:
+                power = np.asarray(ev.power, dtype=float)[:time_grid.timesteps]
+                self.power[i, :len(power)] = power
+            ev.power = self.power[i]
+
+        self._window_now_us: Optional[int] = None
+        self._window_steps = np.empty((2, count), dtype=np.int64)
+        self._window_indices = np.empty((2, count), dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Returns the number of EVs in the fleet."""
+        return len(self.evs)
+
+    def __iter__(self) -> Iterator[EV]:
+        """Iterates over the EV objects of the fleet."""
+        return iter(self.evs)
+
+    def __getitem__(self, index: int) -> EV:
+        """Returns the EV object at `index`."""
+        return self.evs[index]
+
+    def window_indices(self, now: datetime) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the arrival and departure indices of all EVs for `now`.
+
+        The indices equal `EV.arrival_index` and `EV.departure_index` of each EV.
+        They are cached per `now`: repeated calls are free, and when `now` advances
+        by whole time steps the cached indices are shifted instead of recomputed.
+        The returned arrays are shared and must not be modified.
+
+        Args:
+            now: The starting datetime for the scheduling horizon.
+
+        Returns:
+            A tuple of the arrival and departure index arrays, ordered like `evs`.
+
+        Raises:
+            TypeError: If `now` and the arrival or departure times mix naive and
+                       timezone-aware datetimes, like `EV.arrival_index`.
+        """
+        if self._aware - {now.tzinfo is not None}:
+            raise TypeError("can't subtract offset-naive and offset-aware datetimes")
+        now_us = to_microseconds(now)
+        if now_us != self._window_now_us:
+            resolution_us = self.time_grid.resolution // _MICROSECOND
+            if self._window_now_us is not None and (now_us - self._window_now_us) % resolution_us == 0:
+                self._window_steps -= (now_us - self._window_now_us) // resolution_us
+            else:
+                self._window_steps[0] = window_steps(self.arrival_us, now, self.time_grid)
+                self._window_steps[1] = window_steps(self.departure_us, now, self.time_grid)
+            np.clip(self._window_steps, 0, self.time_grid.timesteps - 1, out=self._window_indices)
+            self._window_now_us = now_us
+        return self._window_indices[0], self._window_indices[1]
+
+    def aggregate_power(self) -> np.ndarray:
+        """Returns the total scheduled power (kW or A) of the fleet for each time step."""
+        return self.power.sum(axis=0)
+
+    def energy_charged(self) -> np.ndarray:
+        """Returns the total scheduled energy (kWh or Ah) of each EV."""
+        return self.power.sum(axis=1) * self.time_grid.power_energy_factor
+
+    def convert_power(self, unit: Optional[ChargingRateUnit] = None, steps: Optional[int] = None) -> np.ndarray:
+        """
+        Converts the power matrix to W or A with one `ChargingRateUnit.convert_array` call
+        per distinct (EV unit, output unit) pair, using the per-EV voltages.
+
+        Args:
+            unit: The desired output unit. If None, each EV's `unit` is used.
+            steps: Optional number of leading time steps to convert. Defaults to the whole horizon.
+
+        Returns:
+            The converted matrix, with the shape of `power` (or (N, `steps`)).
+        """
+        power = self.power[:, :steps]
+        sources = [ev.unit for ev in self.evs]
+        targets = sources if unit is None else [unit] * len(sources)
+        pairs = list(zip(sources, targets))
+        if len(set(pairs)) == 1:
+            source, target = pairs[0]
+            return target.convert_array(power, source, self.voltage)
+
+        limits = np.empty_like(power)
+        for source, target in set(pairs):
+            rows = np.fromiter((pair == (source, target) for pair in pairs), dtype=bool, count=len(pairs))
+            limits[rows] = target.convert_array(power[rows], source, self.voltage[rows])
+        return limits
+
+    def _encode(self, unit: Optional[ChargingRateUnit], compression: Optional[ProfileCompression],
+                steps: Optional[int] = None) -> list[tuple[list[float], list[float]]]:
+        """Converts, quantizes, run-length encodes and merges the periods of every EV."""
+        limits = self.convert_power(unit, steps)
+        encoded = run_length_encode(limits if compression is None else compression.quantize(limits), self.time_grid)
+        if compression is not None:
+            encoded = [compression.merge(starts, values, self.time_grid) for starts, values in encoded]
+        return encoded
+
+    def charging_profiles(self, now: datetime, unit: Optional[ChargingRateUnit] = None,
+                          compression: Optional[ProfileCompression] = None) -> dict[EV, dict]:
+        """
+        Generates the full charging profiles of all EVs in one vectorized pass.
+
+        Produces the same dictionaries as calling `EV.charging_profile` for every EV,
+        but converts units for the whole power matrix at once and only builds the
+        compressed periods.
+
+        Args:
+            now: The current time, used to set the profiles' start schedule time.
+            unit: The desired output unit for the limits. If None, each EV's `unit` is used.
+            compression: Optional quantization and period merging options.
+
+        Returns:
+            A dictionary mapping each EV to its charging profile.
+        """
+        encoded = self._encode(unit, compression)
+        start_schedule = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+        return {
+            ev: build_charging_profile(start_schedule, (unit or ev.unit).value, starts, values)
+            for ev, (starts, values) in zip(self.evs, encoded)
+        }
+
+    def payloads(self, now: datetime, template: ProfileTemplate) -> dict[EV, dict | bytes]:
+        """
+        Generates the final request payloads of all EVs in one pass, as described by `template`.
+
+        Only the steps needed by the template are converted, and each EV's profile
+        is built once with integer `startPeriod` offsets and passed to the template's
+        `envelope`, so no intermediate profiles are built and transformed again.
+        With `template.serialize`, profiles are encoded by a `ProfileSerializer` shared
+        by all EVs and the payloads are JSON bytes.
+
+        Args:
+            now: The current time, used to set the profiles' start schedule time.
+            template: The unit, compression, purpose and envelope of the payloads.
+
+        Returns:
+            A dictionary mapping each EV to its request payload. EVs for which the
+            envelope returned None are left out.
+        """
+        encoded = self._encode(template.unit, template.compression, 1 if template.current_only else None)
+        start_schedule = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+        serializers: dict[str, ProfileSerializer] = {}
+        payloads: dict[EV, dict | bytes] = {}
+        for ev, (starts, values) in zip(self.evs, encoded):
+            unit = (template.unit or ev.unit).value
+            starts = [int(start) for start in starts]
+            if template.serialize:
+                if unit not in serializers:
+                    serializers[unit] = ProfileSerializer(start_schedule, unit, template.purpose)
+                profile = serializers[unit].encode(starts, values)
+            else:
+                profile = build_charging_profile(start_schedule, unit, starts, values, template.purpose)
+            payload = profile if template.envelope is None else template.envelope(ev, profile)
+            if payload is not None:
+                payloads[ev] = dumps(payload) if template.serialize else payload
+        return payloads
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-# pylint: disable=missing-function-docstring
+# pylint: disable=missing-function-docstring,too-many-statements
 """
 Provides a custom heuristic-based SCM algorithm ("GoAlgorithm").
 
@@ -23,8 +23,11 @@ on external optimization solvers like PuLP.
 """
 import math
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 
+import numpy as np
+
 from .algorithm import Algorithm
 from .constants import AlgorithmConstants
 from .ev import EV
@@ -49,6 +52,41 @@ SHIFT_FRONT = True
 ALLOC_REMAINING_EXTRA = True
 
 
+def water_fill(demands: list[float], weights: list[float], available: float) -> list[float]:
+    """
+    Shares `available` power among EVs by weighted water-filling.
+
+    Each EV receives ``min(demand, weight * level)``, where the common water level
+    is chosen so that the allocations add up to `available` (or every demand is met).
+    Runs in O(N log N) by visiting EVs in order of their demand-to-weight ratio.
+
+    Args:
+        demands: The maximum power each EV can accept.
+        weights: The non-negative sharing weight of each EV.
+        available: The power to be shared.
+
+    Returns:
+        The power allocated to each EV, in the order of `demands`.
+    """
+    allocation = [0.] * len(demands)
+    total_weight = sum(weights)
+    order = sorted(range(len(demands)),
+                   key=lambda i: demands[i] / weights[i] if weights[i] > 0 else float('inf'))
+    for position, i in enumerate(order):
+        if available <= 0 or total_weight <= 0:
+            break
+        if demands[i] * total_weight <= weights[i] * available:
+            allocation[i] = demands[i]
+            available -= demands[i]
+            total_weight -= weights[i]
+            continue
+        level = available / total_weight
+        for j in order[position:]:
+            allocation[j] = weights[j] * level
+        break
+    return allocation
+
+
 class GoAlgorithm(Algorithm):
     """
     A heuristic Smart Charging Management (SCM) algorithm.
@@ -63,7 +101,9 @@ class GoAlgorithm(Algorithm):
        peak power capacity (`peak_power_demand` minus already allocated power)
        proportionally among EVs still needing energy. The proportionality can be
        adjusted using `FAIRNESS_FACTOR`. Allocation stops when an EV reaches its
-       `max_power` or its `energy` requirement for the timestep.
+       `max_power` (or `max_power_curve` limit) or its `energy` requirement for the timestep. If any EV has a
+       `priority` other than 1, the power is instead shared in a single weighted
+       water-filling pass (`water_fill`) with weights ``priority * need**FAIRNESS_FACTOR``.
 
     3. **Shift Power Forward (Optional)**: If `SHIFT_FRONT` is True, iterates backward
        and attempts to move allocated power (above `min_power`) from later time slots
@@ -77,31 +117,49 @@ class GoAlgorithm(Algorithm):
 
     Uses an inner helper class `EVPower` to track the remaining energy needed for each EV
     during the calculation process.
+
+    Only the steps up to the latest departure (`effective_timesteps`) are calculated;
+    the later steps of the schedule are set to zero.
     """
 
-    @dataclass
+    @dataclass(slots=True)
     class EVPower:
         """
         Helper class to track EV power allocation state during calculation.
 
         Manages the remaining energy needed and provides methods to calculate
         available power headroom and accept/shift power allocations safely.
+        The fields read in the inner loops are cached on the (slotted) instance
+        to avoid attribute chains through the EV object. The per-step limits are
+        shared between EVs with the same limits, and the allocation is a view of
+        the EV's row of the fleet power matrix, so an instance holds no
+        horizon-length data of its own.
 
         *Note: Attributes documented automatically by autodoc from class definition.*
         """
         #: The underlying EV object.
         ev: EV
+        #: The maximum power (kW or A) the EV can accept at each calculated time step (see `GoAlgorithm.max_power_limits`).
+        max_power: Sequence[float]
+        #: The minimum power (kW or A) of the EV, from `EVFleet.min_power` (zero if its load was shed).
+        min_power: float
         #: The remaining energy (kWh or Ah) this EV still needs. Initialized from `ev.energy` and decremented as power is allocated.
         energy_left: float = field(init=False)
+        #: The power (kW or A) allocated at each calculated time step, as a `memoryview` of `ev.power` for fast scalar updates.
+        allocation: memoryview = field(init=False, repr=False)
+        #: The `TimeGrid.power_energy_factor` of the schedule.
+        energy_factor: float = field(default=AlgorithmConstants.POWER_ENERGY_FACTOR, repr=False)
 
         def __post_init__(self):
             self.energy_left = self.ev.energy
+            self.allocation = memoryview(np.asarray(self.ev.power, dtype=float)[:len(self.max_power)])
 
-        def power(self, time: int, max_available=float('inf'), ignore_energy=False):
+        def power(self, time: int, max_available=math.inf, ignore_energy=False):
+            allocated = self.allocation[time]
             return max(
-                self.ev.min_power - self.ev.power[time],
-                min(self.ev.max_power - self.ev.power[time],
-                    self.energy_left / AlgorithmConstants.POWER_ENERGY_FACTOR if not ignore_energy else float('inf'),
+                self.min_power - allocated,
+                min(self.max_power[time] - allocated,
+                    math.inf if ignore_energy else self.energy_left / self.energy_factor,
                     max_available))
 
         def accept_power(self, time: int, power: float, ignore_energy=False):
@@ -113,18 +171,18 @@ class GoAlgorithm(Algorithm):
                 logging.error('Time: %s', time)
                 logging.error('Power: %s', power)
                 logging.error('Energy Left: %s', self.energy_left)
-                logging.error('Power at Time: %s', self.ev.power[time])
+                logging.error('Power at Time: %s', self.allocation[time])
             if DEBUG:
                 logging.info('%s accepted %s at %s', self.ev.ev_id, power, time)
-            self.energy_left -= power * AlgorithmConstants.POWER_ENERGY_FACTOR
-            self.ev.power[time] += power
+            self.energy_left -= power * self.energy_factor
+            self.allocation[time] += power
 
         def shift_power(self, time_from: int, time_to: int, power: float):
             if time_from == time_to:
                 return
             try:
-                assert power <= self.ev.power[time_from]
-                assert power <= self.ev.max_power - self.ev.power[time_to]
+                assert power <= self.allocation[time_from]
+                assert power <= self.max_power[time_to] - self.allocation[time_to]
             except AssertionError as e:
                 logging.error('Assertion Error: %s', e.args[0] if e.args else repr(e))
                 logging.error('EV: %s', self.ev)
@@ -132,12 +190,43 @@ class GoAlgorithm(Algorithm):
                 logging.error('Time To: %s', time_to)
                 logging.error('Power: %s', power)
                 logging.error('Energy Left: %s', self.energy_left)
-                logging.error('Power at Time From: %s', self.ev.power[time_from])
-                logging.error('Power at Time To: %s', self.ev.power[time_to])
+                logging.error('Power at Time From: %s', self.allocation[time_from])
+                logging.error('Power at Time To: %s', self.allocation[time_to])
             if DEBUG:
                 logging.info('%s shifted {p} from %s to %s', self.ev.ev_id, time_from, time_to)
-            self.ev.power[time_from] -= power
-            self.ev.power[time_to] += power
+            self.allocation[time_from] -= power
+            self.allocation[time_to] += power
+
+    def max_power_limits(self, ev: EV, timesteps: int, limits: dict[float, tuple[float, ...]]) -> tuple[float, ...]:
+        """
+        Returns the maximum power (kW or A) `ev` can accept at each of the first `timesteps` steps.
+
+        EVs without a `max_power_curve` share one tuple per distinct `max_power`,
+        kept in `limits`; EVs with a curve get their own, expanded from `EV.max_power_array`.
+        """
+        if ev.max_power_curve is not None:
+            return tuple(ev.max_power_array(self.now, self.time_grid)[:timesteps].tolist())
+        max_power = float(ev.max_power)
+        if max_power not in limits:
+            limits[max_power] = (max_power,) * timesteps
+        return limits[max_power]
+
+    def _allocate_weighted(self, evs: dict[int, EVPower], evs_present: set[int], time: int,
+                           available: float, ignore_energy=False) -> float:
+        """Shares `available` power at `time` by priority-weighted water-filling and returns the power allocated."""
+        if available <= 0:
+            return 0.
+        evs_to_allocate = [(evs[ev_id], power) for ev_id in evs_present
+                           if (power := evs[ev_id].power(time, available, ignore_energy)) > 0]
+        allocation = water_fill([power for _, power in evs_to_allocate],
+                                [ev.ev.priority * power**FAIRNESS_FACTOR for ev, power in evs_to_allocate],
+                                available)
+        allocated = 0.
+        for (ev, _), allocated_power in zip(evs_to_allocate, allocation):
+            power = ev.power(time, allocated_power, ignore_energy)
+            ev.accept_power(time, power, ignore_energy)
+            allocated += power
+        return allocated
 
     def calculate(self) -> None:
         """
@@ -146,25 +235,34 @@ class GoAlgorithm(Algorithm):
         Populates the `ev.power` list for each EV in `self.evs` according
         to the heuristic stages described in the class documentation.
         """
-        evs = {ev.ev_id: self.EVPower(ev=ev) for ev in self.evs}
-
-        evs_present: list[set[int]] = [set() for _ in range(AlgorithmConstants.TIMESTEPS)]
-        for ev_id, ev in evs.items():
-            for time_index in range(ev.ev.arrival_index(self.now), ev.ev.departure_index(self.now)):
+        timesteps = self.effective_timesteps()
+        limits: dict[float, tuple[float, ...]] = {}
+        evs = {ev.ev_id: self.EVPower(ev=ev, max_power=self.max_power_limits(ev, timesteps, limits), min_power=min_power,
+                                      energy_factor=self.time_grid.power_energy_factor)
+               for ev, min_power in zip(self.evs, self.fleet.min_power.tolist())}
+        weighted = any(ev.priority != 1. for ev in self.evs)
+
+        evs_present: list[set[int]] = [set() for _ in range(timesteps)]
+        ev_ids = (ev.ev_id for ev in self.evs)
+        for ev_id, arrival_index, departure_index in zip(ev_ids, *self.fleet.window_indices(self.now)):
+            for time_index in range(arrival_index, departure_index):
                 evs_present[time_index].add(ev_id)
 
-        available_peak_power = self.peak_power_demand.copy()
-        for time in range(AlgorithmConstants.TIMESTEPS - 1, -1, -1):
+        available_peak_power = list(self.peak_power_demand[:timesteps])
+        for time in range(timesteps - 1, -1, -1):
             # Allocate Minimum Power first
             for ev_id in evs_present[time]:
                 ev = evs[ev_id]
-                ev.accept_power(time, ev.ev.min_power)
-                available_peak_power[time] -= ev.ev.min_power
+                ev.accept_power(time, ev.min_power)
+                available_peak_power[time] -= ev.min_power
+
+            if weighted:
+                available_peak_power[time] -= self._allocate_weighted(evs, evs_present[time], time, available_peak_power[time])
 
-            while available_peak_power[time] > 0:
-                evs_to_allocate = [(ev_id, evs[ev_id].power(time))
+            while not weighted and available_peak_power[time] > 0:
+                evs_to_allocate = [(ev_id, power)
                                    for ev_id in evs_present[time]
-                                   if evs[ev_id].power(time) != 0]
+                                   if (power := evs[ev_id].power(time)) != 0]
                 if not evs_to_allocate:
                     break
 
@@ -182,24 +280,33 @@ class GoAlgorithm(Algorithm):
                     ev.accept_power(time, power)
                     available_peak_power[time] -= power
 
-        if SHIFT_FRONT:
-            for time_from in range(AlgorithmConstants.TIMESTEPS - 1, -1, -1):
+        # The optional stages only improve the schedule, so they are skipped once the deadline passed
+        optional_stages = self.deadline is None or not self.deadline.expired
+        if not optional_stages:
+            logging.warning('Deadline passed, skipping the optional allocation stages')
+
+        if SHIFT_FRONT and optional_stages:
+            for time_from in range(timesteps - 1, -1, -1):
                 for ev_id, ev in evs.items():
                     time_to = time_from - 1
-                    while time_to >= 0 and ev.ev.power[time_from] > ev.ev.min_power and ev_id in evs_present[time_to] and available_peak_power[time_to] > 0:
-                        power = min(available_peak_power[time_to], ev.ev.power[time_from] - ev.ev.min_power, ev.ev.max_power - ev.ev.power[time_to])
+                    while time_to >= 0 and ev.allocation[time_from] > ev.min_power and ev_id in evs_present[time_to] and available_peak_power[time_to] > 0:
+                        power = min(available_peak_power[time_to], ev.allocation[time_from] - ev.min_power, ev.max_power[time_to] - ev.allocation[time_to])
                         ev.shift_power(time_from, time_to, power)
                         available_peak_power[time_to] -= power
                         available_peak_power[time_from] += power
                         time_to -= 1
 
-        if ALLOC_REMAINING_EXTRA:
-            for time in range(AlgorithmConstants.TIMESTEPS):
+        if ALLOC_REMAINING_EXTRA and optional_stages:
+            for time in range(timesteps):
                 available_extra_power = available_peak_power[time]
 
-                evs_to_allocate = [(ev_id, evs[ev_id].power(time, available_extra_power, True))
+                if weighted:
+                    available_peak_power[time] -= self._allocate_weighted(evs, evs_present[time], time, available_extra_power, True)
+                    continue
+
+                evs_to_allocate = [(ev_id, power)
                                    for ev_id in evs_present[time]
-                                   if evs[ev_id].power(time, available_extra_power, True) != 0]
+                                   if (power := evs[ev_id].power(time, available_extra_power, True)) != 0]
 
                 total_power_required = sum(p**FAIRNESS_FACTOR for _, p in evs_to_allocate)
                 power_allocation = [(ev_id, power**FAIRNESS_FACTOR / total_power_required * available_extra_power)
@@ -213,13 +320,15 @@ class GoAlgorithm(Algorithm):
                     ev.accept_power(time, power, True)
                     available_peak_power[time] -= power
 
+        self.fleet.power[:, timesteps:] = 0.
+
         try:
             for ev in evs.values():
-                assert all(y == 0. or y <= ev.ev.max_power or math.isclose(y, ev.ev.max_power) for y in ev.ev.power), 'EV Max Power'
-                assert all(y == 0. or y >= ev.ev.min_power for y in ev.ev.power), 'EV Min Power'
-            for i in range(AlgorithmConstants.TIMESTEPS):
+                assert all(y == 0. or y <= y_max or math.isclose(y, y_max) for y, y_max in zip(ev.allocation, ev.max_power)), 'EV Max Power'
+                assert all(y == 0. or y >= ev.min_power for y in ev.allocation), 'EV Min Power'
+            for i in range(timesteps):
                 assert available_peak_power[i] >= -1, f'{available_peak_power[i]} not greater than or equal to zero'
-                y_pm_i = sum(ev.ev.power[i] for ev in evs.values())
+                y_pm_i = sum(ev.allocation[i] for ev in evs.values())
                 assert self.peak_power_demand[i] >= y_pm_i or math.isclose(self.peak_power_demand[i], y_pm_i), 'Total Power'
         except AssertionError as e:
             logging.error('Assertion Error: %s', e.args[0] if e.args else repr(e))
@@ -0,0 +1,55 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Defines the `ProfileTemplate` used to generate final request payloads.
+
+A Translation Layer describes the profiles its external system expects (unit,
+rounding, period cap, purpose, current period only) and how each profile is
+wrapped into a request body. `EVFleet.payloads` then goes from the computed power
+matrix straight to these request bodies in one pass, without building per-EV
+profile dictionaries that the Translation Layer would transform again.
+"""
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from .constants import EVConstants
+from .ev import EV, ChargingRateUnit
+from .profile import ProfileCompression
+from .serializer import RawJSON
+
+
+@dataclass(frozen=True)
+class ProfileTemplate:
+    """
+    Describes how the charging profiles of a Translation Layer are generated.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: unit: The unit of the limits (W or A). If None, each EV's `unit` is used.
+    unit: Optional[ChargingRateUnit] = None
+    #: compression: Rounding (`quantum`), period cap (`max_periods`) and merge tolerance of the limits.
+    compression: Optional[ProfileCompression] = None
+    #: purpose: The `chargingProfilePurpose` of the profiles.
+    purpose: str = EVConstants.CHARGING_PROFILE_PURPOSE
+    #: current_only: Only encode the current time step (a single period), for systems
+    #: that receive a new profile every cycle anyway.
+    current_only: bool = False
+    #: envelope: Optional function wrapping an EV's charging profile into the final
+    #: request body. Returning None skips the EV. If None, the profile itself is the payload.
+    #: With `serialize`, the profile is passed as `RawJSON` (see `RawJSON.with_fields`).
+    envelope: Optional[Callable[[EV, dict | RawJSON], Optional[dict | RawJSON]]] = None
+    #: serialize: Generate the payloads as pre-encoded JSON bytes (see `optivgi.scm.serializer`)
+    #: instead of dictionaries.
+    serialize: bool = False
@@ -0,0 +1,164 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides a vectorized encoder for OCPP-style charging profiles.
+
+Instead of building one period dictionary per time step and compressing them in
+Python, the power matrix of a whole fleet is converted in bulk
+(`ChargingRateUnit.convert_array`), the change points of each row are found with
+a vectorized diff, and only the dictionaries of the compressed
+`chargingSchedulePeriod` entries are created.
+
+A `ProfileCompression` can additionally quantize the limits and merge near-equal
+periods within an energy error bound, to keep OCPP payloads small.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .constants import EVConstants
+from .time_grid import DEFAULT_TIME_GRID, TimeGrid
+
+
+#: QUANTIZED_DECIMALS: Decimals kept after quantization, to remove floating point noise
+#: such as ``5.800000000000001`` from quantized limits.
+QUANTIZED_DECIMALS = 9
+
+
+@dataclass(frozen=True)
+class ProfileCompression:
+    """
+    Options to shrink charging profiles beyond merging exactly equal periods.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: quantum: Step (in the output unit, W or A) the limits are rounded to, e.g. 1 A.
+    #: A whole quantum gives integer limits (``16`` rather than ``16.0``). None disables quantization.
+    quantum: Optional[float] = None
+    #: max_periods: Maximum number of periods per profile (e.g. the charger's
+    #: ChargingScheduleMaxPeriods). Enforced even if it exceeds `energy_tolerance`. None means unlimited.
+    max_periods: Optional[int] = None
+    #: energy_tolerance: Maximum energy error (Wh or Ah, in the output unit) introduced by
+    #: merging near-equal adjacent periods. Merged periods take the lower limit, so
+    #: merging never raises a limit above the calculated schedule.
+    energy_tolerance: float = 0.
+
+    def quantize(self, limits: np.ndarray) -> np.ndarray:
+        """Rounds `limits` to the nearest multiple of `quantum` (if set), as integers if `quantum` is whole."""
+        if not self.quantum:
+            return limits
+        if float(self.quantum).is_integer():
+            return np.round(limits / self.quantum).astype(np.int64) * int(self.quantum)
+        return np.round(np.round(limits / self.quantum) * self.quantum, QUANTIZED_DECIMALS)
+
+    def merge(self, starts: list[float], limits: list[float],
+              time_grid: TimeGrid = DEFAULT_TIME_GRID) -> tuple[list[float], list[float]]:
+        """
+        Greedily merges the adjacent periods with the smallest energy error.
+
+        Merging stops once the next merge would exceed `energy_tolerance`, unless
+        the profile still has more than `max_periods` periods.
+
+        Args:
+            starts: The start offset (seconds) of each period.
+            limits: The limit of each period.
+            time_grid: The time grid of the profile; the last period lasts until the end of its `runtime`.
+
+        Returns:
+            The start offsets and limits of the merged periods.
+        """
+        max_periods = self.max_periods or len(starts)
+        if len(starts) <= max_periods and self.energy_tolerance <= 0:
+            return starts, limits
+
+        bounds = np.append(np.asarray(starts, dtype=float), time_grid.runtime.total_seconds())
+        # Keeps integer limits (from a whole `quantum`) as integers
+        values = np.asarray(limits)
+        hours = np.diff(bounds) / 3600
+        error = 0.
+        while len(values) > 1:
+            costs = np.abs(np.diff(values)) * np.where(values[:-1] > values[1:], hours[:-1], hours[1:])
+            i = int(np.argmin(costs))
+            if len(values) <= max_periods and error + costs[i] > self.energy_tolerance:
+                break
+            error += costs[i]
+            values[i] = min(values[i], values[i + 1])
+            values = np.delete(values, i + 1)
+            hours[i] += hours[i + 1]
+            hours = np.delete(hours, i + 1)
+            bounds = np.delete(bounds, i + 1)
+
+        if error > self.energy_tolerance:
+            logging.debug('Profile compressed to %s periods with energy error %s above tolerance %s',
+                          len(values), error, self.energy_tolerance)
+        return bounds[:-1].tolist(), values.tolist()
+
+
+def run_length_encode(limits: np.ndarray, time_grid: TimeGrid = DEFAULT_TIME_GRID) -> list[tuple[list[float], list[float]]]:
+    """
+    Compresses each row of `limits` into the periods where the limit changes.
+
+    Args:
+        limits: Limit matrix of shape (N, T).
+        time_grid: The time grid of the columns of `limits`.
+
+    Returns:
+        For each row, a tuple of the period start offsets (seconds from the start
+        of the schedule) and the limits of the periods. The first step always starts a period.
+    """
+    keep = np.ones(limits.shape, dtype=bool)
+    keep[:, 1:] = limits[:, 1:] != limits[:, :-1]
+    rows, cols = np.nonzero(keep)
+    bounds = np.searchsorted(rows, np.arange(limits.shape[0] + 1)).tolist()
+
+    starts = (cols * time_grid.resolution.total_seconds()).tolist()
+    values = limits[rows, cols].tolist()
+    return [(starts[begin:end], values[begin:end]) for begin, end in zip(bounds[:-1], bounds[1:])]
+
+
+def build_charging_profile(start_schedule: str, unit: str, starts: list, limits: list[float],
+                           purpose: str = EVConstants.CHARGING_PROFILE_PURPOSE) -> dict:
+    """
+    Builds a charging profile dictionary from already encoded periods.
+
+    Args:
+        start_schedule: The formatted start time of the schedule.
+        unit: The value of the `ChargingRateUnit` of the limits.
+        starts: The start offset (seconds) of each period.
+        limits: The limit of each period.
+        purpose: The `chargingProfilePurpose` of the profile.
+
+    Returns:
+        A dictionary similar to OCPP's `csChargingProfiles`.
+    """
+    return {
+        "chargingProfileId": EVConstants.CHARGING_PROFILE_ID,
+        "stackLevel": EVConstants.CHARGING_PROFILE_STACK_LEVEL,
+        "chargingProfilePurpose": purpose,
+        "chargingProfileKind": EVConstants.CHARGING_PROFILE_KIND,
+        "chargingSchedule": {
+            "startSchedule": start_schedule,
+            "chargingRateUnit": unit,
+            "chargingSchedulePeriod": [
+                {
+                    "startPeriod": start,
+                    "limit": limit,
+                    "numberPhases": 1
+                }
+                for start, limit in zip(starts, limits)
+            ]
+        }
+    }
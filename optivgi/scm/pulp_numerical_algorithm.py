@@ -20,10 +20,10 @@ an optimal solution based on the defined objective and constraints.
 """
 import logging
 
+import numpy as np
 from pulp import LpVariable, LpProblem, LpMaximize, PULP_CBC_CMD
 
 from .algorithm import Algorithm
-from .constants import AlgorithmConstants
 
 class PulpNumericalAlgorithm(Algorithm):
     """
@@ -33,6 +33,9 @@ class PulpNumericalAlgorithm(Algorithm):
     across all EVs, while respecting individual EV power limits, arrival/departure
     times, and aggregate peak power constraints for the group. It also includes
     terms to encourage utilizing available peak power and minimizing power fluctuations.
+
+    The problem only covers the steps up to the latest departure (`effective_timesteps`),
+    plus one step for the ramp down to zero; the later steps of the schedule are set to zero.
     """
 
     def calculate(self) -> None:
@@ -46,12 +49,17 @@ class PulpNumericalAlgorithm(Algorithm):
         3. Define the objective function: Maximize ``percentage``, scaled, plus a term for
            peak power utilization, minus a penalty for power fluctuations.
         4. Define constraints (power difference, energy targets, power limits, aggregate demand).
-        5. Solve the linear programming problem using the configured solver (default CBC).
-        6. Extract the results (optimal power values) and store them in each EV's power list.
+        5. Solve the linear programming problem using the configured solver (default CBC),
+           limited to the time left before `deadline` if it is set.
+        6. Extract the results (optimal power values) and store them in each EV's power list,
+           padded with zeros after the calculated steps.
         7. Log summary information.
         """
         logging.info('Number of Connected EVs: %s', len(self.evs))
 
+        # One step after the latest departure, so the ramp down to zero is penalized as before trimming
+        timesteps = self.effective_timesteps(margin=1)
+
         # Create a linear programming problem
         model = LpProblem(name='charging_schedule', sense=LpMaximize)
 
@@ -59,68 +67,70 @@ class PulpNumericalAlgorithm(Algorithm):
         ev_vars = {
             (ev.ev_id, time): LpVariable(name=f'X_{ev.ev_id}_{time}', lowBound=0)
             for ev in self.evs
-            for time in range(AlgorithmConstants.TIMESTEPS)
+            for time in range(timesteps)
         }
         ev_vars_diff = {
             (ev.ev_id, time): LpVariable(name=f'X_diff_{ev.ev_id}_{time}', lowBound=0)
             for ev in self.evs
-            for time in range(AlgorithmConstants.TIMESTEPS - 1)
+            for time in range(timesteps - 1)
         }
         percentage = LpVariable(name='percentage_charge', lowBound=0)
 
-        ev_max_demand = sum(ev.max_power for ev in self.evs) if self.evs else float('inf')
-        max_power_demand = [min(ev_max_demand, self.peak_power_demand[time]) for time in range(AlgorithmConstants.TIMESTEPS)]
+        ev_max_power = {ev.ev_id: ev.max_power_array(self.now, self.time_grid)[:timesteps] for ev in self.evs}
+        ev_max_demand = sum(ev_max_power.values()) if self.evs else np.full(timesteps, float('inf'))
+        max_power_demand = np.minimum(ev_max_demand, self.peak_power_demand[:timesteps]).tolist()
 
         # Objective function - maximize the percentage of energy charged and peak power utilization and minimize the change in power
-        model += percentage * 100 * AlgorithmConstants.TIMESTEPS * len(self.evs) + sum(
+        model += percentage * 100 * self.time_grid.timesteps * len(self.evs) + sum(
             sum(ev_vars[ev.ev_id, time] for ev in self.evs) / max_power_demand[time] # type: ignore
-            for time in range(AlgorithmConstants.TIMESTEPS)
-        ) - sum(sum(ev_vars_diff[ev.ev_id, time] for time in range(AlgorithmConstants.TIMESTEPS - 1)) for ev in self.evs) # type: ignore
+            for time in range(timesteps)
+        ) - sum(sum(ev_vars_diff[ev.ev_id, time] for time in range(timesteps - 1)) for ev in self.evs) # type: ignore
 
         # Constraints
-        for ev in self.evs:
+        for ev, min_power, arrival_index, departure_index in zip(self.evs, self.fleet.min_power.tolist(),
+                                                                 *self.fleet.window_indices(self.now)):
             # Power Difference Constraints - absolute value
-            for time in range(AlgorithmConstants.TIMESTEPS - 1):
+            for time in range(timesteps - 1):
                 model += ev_vars_diff[ev.ev_id, time] >= ev_vars[ev.ev_id, time + 1] - ev_vars[ev.ev_id, time]
                 model += ev_vars_diff[ev.ev_id, time] >= -ev_vars[ev.ev_id, time + 1] + ev_vars[ev.ev_id, time]
 
             # Percentage of energy charged >= maximised percentage
             model += (
-                (sum(ev_vars[ev.ev_id, time] for time in range(AlgorithmConstants.TIMESTEPS)) * AlgorithmConstants.POWER_ENERGY_FACTOR) / ev.energy
+                (sum(ev_vars[ev.ev_id, time] for time in range(timesteps)) * self.time_grid.power_energy_factor) / ev.energy
             ) >= percentage
 
-            # Calculate the index of the arrival and departure times
-            arrival_index = ev.arrival_index(self.now)
-            departure_index = ev.departure_index(self.now)
-
             # Power constraints after arrival before departure
+            max_power = ev_max_power[ev.ev_id].tolist()
             for time in range(arrival_index, departure_index):
-                model += ev_vars[ev.ev_id, time] >= ev.min_power
+                model += ev_vars[ev.ev_id, time] >= min_power
 
-                model += ev_vars[ev.ev_id, time] <= ev.max_power
+                model += ev_vars[ev.ev_id, time] <= max_power[time]
 
             # No charging before arrival
             for time in range(arrival_index):
                 model += ev_vars[ev.ev_id, time] == 0
 
             # No charging after departure
-            for time in range(departure_index, AlgorithmConstants.TIMESTEPS):
+            for time in range(departure_index, timesteps):
                 model += ev_vars[ev.ev_id, time] == 0
 
         # Peak power demand constraint
-        for time in range(AlgorithmConstants.TIMESTEPS):
+        for time in range(timesteps):
             model += sum(ev_vars[ev.ev_id, time] for ev in self.evs) <= self.peak_power_demand[time]
 
 
-        # Solve the problem
-        model.solve(PULP_CBC_CMD(msg=False))
+        # Solve the problem, within the time left before the deadline if there is one
+        time_limit = None if self.deadline is None else max(self.deadline.remaining(), 1.)
+        model.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit))
 
         # Total percentage of requested energy charged
         total_percentage = model.objective.value()
         logging.info('Maximized Percentage of Charging: %s', total_percentage)
 
+        self.fleet.power[:, timesteps:] = 0.
         for ev in self.evs:
-            for time in range(AlgorithmConstants.TIMESTEPS):
-                ev.power[time] = ev_vars[ev.ev_id, time].varValue # type: ignore
+            for time in range(timesteps):
+                # No value if the solver stopped at its time limit without a solution
+                ev.power[time] = ev_vars[ev.ev_id, time].varValue or 0.
 
-            logging.info('EV %s: Max Power: %s / %s, Energy Charged: %s / %s', ev.ev_id, max(ev.power), ev.max_power, ev.energy_charged(), ev.energy)
+            logging.info('EV %s: Max Power: %s / %s, Energy Charged: %s / %s', ev.ev_id, max(ev.power), ev.max_power, ev.energy_charged(self.time_grid), ev.energy)
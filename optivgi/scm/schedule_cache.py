@@ -0,0 +1,303 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides a cache of computed schedules keyed by a fingerprint of the inputs.
+
+Timer ticks and external events trigger a new cycle even when nothing relevant
+changed for a group. `ScheduleFingerprint` captures the inputs of a group
+cheaply, and `ScheduleCache` returns the previous schedule, shifted by the
+elapsed time steps, when the new inputs match what was expected from it:
+
+- the same EVs with the same limits, connection state and times (departures
+  after the end of the horizon are all equivalent),
+- the same algorithm and time grid,
+- each EV's remaining energy within a tolerance of its previous energy minus the
+  energy scheduled during the elapsed steps, and
+- the overlapping part of the peak power demand forecast within a tolerance.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, Type
+
+import numpy as np
+
+from .algorithm import Algorithm
+from .fleet import EVFleet, to_microseconds, window_steps
+from .time_grid import TimeGrid
+
+
+def _curve_key(curve) -> Optional[tuple | bytes]:
+    """Returns a hashable representation of a `max_power_curve`."""
+    if curve is None:
+        return None
+    if isinstance(curve, np.ndarray):
+        return curve.tobytes()
+    return tuple(map(tuple, curve))
+
+
+@dataclass
+class ScheduleFingerprint:
+    """
+    Inputs of a group's calculation, in the form compared by `ScheduleCache`.
+
+    The per-EV arrays are sorted by EV ID, so the order in which the Translation
+    Layer returns the EVs does not matter.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: key: Hash of the inputs that must match exactly (EVs, limits, times, algorithm, time grid).
+    key: int
+    #: now: The start of the planning horizon.
+    now: datetime
+    #: time_grid: The time grid of the group.
+    time_grid: TimeGrid
+    #: order: Position in the fleet of each EV, sorted by EV ID.
+    order: np.ndarray = field(repr=False)
+    #: ev_ids: The EV IDs, sorted.
+    ev_ids: np.ndarray = field(repr=False)
+    #: energy: Requested energy (kWh or Ah) of each EV, sorted by EV ID.
+    energy: np.ndarray = field(repr=False)
+    #: departure_steps: Departure step of each EV from `now`, sorted by EV ID, clamped to the end of the horizon.
+    departure_steps: np.ndarray = field(repr=False)
+    #: peak_power_demand: The peak power demand forecast.
+    peak_power_demand: np.ndarray = field(repr=False)
+
+    @classmethod
+    def of(cls, fleet: EVFleet, peak_power_demand: list[float], now: datetime,
+           algorithm_cls: Type[Algorithm]) -> 'ScheduleFingerprint':
+        """
+        Computes the fingerprint of a group's inputs.
+
+        Args:
+            fleet: The EVs of the group.
+            peak_power_demand: The maximum aggregate power allowed for each time step.
+            now: The start of the planning horizon.
+            algorithm_cls: The class type of the SCM algorithm.
+
+        Returns:
+            The `ScheduleFingerprint` of the inputs.
+
+        Raises:
+            TypeError: If naive and timezone-aware datetimes are mixed (see `EVFleet.window_indices`).
+        """
+        # Rejects mixed naive and aware datetimes, and caches the window indices for the solve
+        fleet.window_indices(now)
+        order = np.argsort(fleet.ev_ids, kind='stable')
+        # Arrival times in the past all mean "connected", whatever the value the Translation Layer reports
+        arrival_us = np.where(fleet.arrival_us > to_microseconds(now), fleet.arrival_us, 0)
+        # Likewise for departures after the end of the horizon (e.g. estimated as "now + 8 hours")
+        departure_steps = window_steps(fleet.departure_us, now, fleet.time_grid)
+        after_horizon = departure_steps >= fleet.time_grid.timesteps
+        departure_us = np.where(after_horizon, np.iinfo(np.int64).max, fleet.departure_us)
+        columns = (fleet.ev_ids, fleet.active, fleet.connector_ids, fleet.min_power, fleet.max_power,
+                   fleet.voltage, fleet.priority, arrival_us, departure_us)
+        evs = [fleet.evs[i] for i in order]
+        key = hash((
+            algorithm_cls.__module__, algorithm_cls.__qualname__, fleet.time_grid,
+            *(column[order].tobytes() for column in columns),
+            tuple(ev.station_id for ev in evs),
+            tuple(ev.unit for ev in evs),
+            tuple(_curve_key(ev.max_power_curve) for ev in evs),
+        ))
+        return cls(key=key, now=now, time_grid=fleet.time_grid, order=order,
+                   ev_ids=fleet.ev_ids[order], energy=fleet.energy[order],
+                   departure_steps=np.minimum(departure_steps, fleet.time_grid.timesteps)[order],
+                   peak_power_demand=np.asarray(peak_power_demand, dtype=float))
+
+
+@dataclass
+class _CacheEntry:
+    """A computed schedule with the fingerprint of its inputs. `power` rows are sorted by EV ID."""
+    fingerprint: ScheduleFingerprint
+    power: np.ndarray
+
+
+class ScheduleCache:
+    """
+    Reuses the previous schedule of a group when its inputs did not change.
+
+    A cached schedule computed at time `t0` is reused at time `now` if `now - t0`
+    is a whole number of steps shorter than `max_age`, the fingerprint `key` is
+    equal, the remaining energies and the overlapping peak power demand match
+    within the tolerances (see the module documentation), and no EV departs
+    during the steps beyond the cached horizon (EVs departing after the current
+    horizon are allowed). The reused schedule is the cached one shifted by the
+    elapsed steps and padded with zeros.
+
+    Thread-safe, so groups can be processed concurrently.
+
+    Attributes:
+        energy_tolerance (float): Largest difference (kWh or Ah) between the reported and the
+                                  expected remaining energy of an EV that is ignored.
+        power_tolerance (float): Largest difference (kW or A) in the peak power demand that is ignored.
+        max_age (Optional[timedelta]): Maximum time a schedule is reused before it is recalculated.
+                                       None reuses schedules until the inputs change.
+        hits (int): Number of lookups that returned a cached schedule.
+        misses (int): Number of lookups that required a new calculation.
+    """
+    def __init__(self, energy_tolerance: float = 0.1, power_tolerance: float = 0.01,
+                 max_age: Optional[timedelta] = timedelta(minutes=15)):
+        """
+        Initializes an empty cache.
+
+        Args:
+            energy_tolerance: Largest ignored difference (kWh or Ah) in the remaining energy of an EV.
+            power_tolerance: Largest ignored difference (kW or A) in the peak power demand.
+            max_age: Maximum time a schedule is reused before it is recalculated.
+        """
+        self.energy_tolerance = energy_tolerance
+        self.power_tolerance = power_tolerance
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['ScheduleCache']:
+        """
+        Creates a cache if the `SCM_SCHEDULE_CACHE` environment variable is set to 1.
+
+        The tolerances and maximum age are read from `SCM_CACHE_ENERGY_TOLERANCE`,
+        `SCM_CACHE_POWER_TOLERANCE` and `SCM_CACHE_MAX_AGE_MINUTES`.
+
+        Returns:
+            A new `ScheduleCache`, or None if caching is disabled.
+        """
+        if os.getenv('SCM_SCHEDULE_CACHE', '0') != '1':
+            return None
+        return cls(energy_tolerance=float(os.getenv('SCM_CACHE_ENERGY_TOLERANCE', '0.1')),
+                   power_tolerance=float(os.getenv('SCM_CACHE_POWER_TOLERANCE', '0.01')),
+                   max_age=timedelta(minutes=float(os.getenv('SCM_CACHE_MAX_AGE_MINUTES', '15'))))
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that returned a cached schedule (0 before the first lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+
+    def _shifted_power(self, entry: _CacheEntry, fingerprint: ScheduleFingerprint) -> Optional[np.ndarray]:
+        """Returns the cached schedule shifted to `fingerprint.now` (rows sorted by EV ID), or None if it cannot be reused."""
+        cached = entry.fingerprint
+        if cached.key != fingerprint.key:
+            return None
+        elapsed = fingerprint.now - cached.now
+        if elapsed < timedelta(0) or elapsed % cached.time_grid.resolution or \
+                (self.max_age is not None and elapsed >= self.max_age):
+            return None
+        shift = elapsed // cached.time_grid.resolution
+        kept = cached.time_grid.timesteps - shift
+        # EVs departing after the horizon are connected in the padded steps too; they are
+        # scheduled there at the next calculation, after `max_age` at the latest
+        departure_steps = fingerprint.departure_steps
+        if kept <= 0 or ((departure_steps > kept) & (departure_steps < cached.time_grid.timesteps)).any():
+            return None
+
+        if not np.allclose(fingerprint.peak_power_demand[:kept], cached.peak_power_demand[shift:],
+                           rtol=0., atol=self.power_tolerance):
+            return None
+        expected = cached.energy - entry.power[:, :shift].sum(axis=1) * cached.time_grid.power_energy_factor
+        if not np.allclose(fingerprint.energy, expected, rtol=0., atol=self.energy_tolerance):
+            return None
+
+        power = np.zeros_like(entry.power)
+        power[:, :kept] = entry.power[:, shift:]
+        return power
+
+    def lookup(self, group: str, fingerprint: ScheduleFingerprint) -> Optional[np.ndarray]:
+        """
+        Returns the cached schedule of a group if it can be reused for `fingerprint`.
+
+        Args:
+            group: The identifier of the station group.
+            fingerprint: The fingerprint of the group's current inputs.
+
+        Returns:
+            The power matrix shifted to `fingerprint.now`, with rows in the order of
+            the fleet the fingerprint was computed from, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(group)
+        power = None if entry is None else self._shifted_power(entry, fingerprint)
+        with self._lock:
+            if power is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if power is None:
+            return None
+        fleet_power = np.empty_like(power)
+        fleet_power[fingerprint.order] = power
+        return fleet_power
+
+    def last_schedule(self, group: str, fingerprint: ScheduleFingerprint) -> Optional[np.ndarray]:
+        """
+        Returns the last schedule of a group shifted to `fingerprint.now`, even if the inputs changed.
+
+        Used when there is no time left to calculate a new schedule (see
+        `optivgi.budget.OverrunPolicy.REUSE`). EVs that are not in the cached
+        schedule get zero power. The counters are not updated.
+
+        Args:
+            group: The identifier of the station group.
+            fingerprint: The fingerprint of the group's current inputs.
+
+        Returns:
+            The power matrix shifted to `fingerprint.now`, with rows in the order of the
+            fleet the fingerprint was computed from, or None if nothing is cached for
+            the group with the same time grid at a whole number of steps before `now`.
+        """
+        with self._lock:
+            entry = self._entries.get(group)
+        if entry is None or entry.fingerprint.time_grid != fingerprint.time_grid:
+            return None
+        elapsed = fingerprint.now - entry.fingerprint.now
+        if elapsed < timedelta(0) or elapsed % fingerprint.time_grid.resolution:
+            return None
+        shift = min(elapsed // fingerprint.time_grid.resolution, fingerprint.time_grid.timesteps)
+
+        cached_ids = entry.fingerprint.ev_ids
+        rows = np.minimum(np.searchsorted(cached_ids, fingerprint.ev_ids), max(len(cached_ids) - 1, 0))
+        found = cached_ids[rows] == fingerprint.ev_ids if len(cached_ids) else np.zeros(len(fingerprint.ev_ids), dtype=bool)
+        power = np.zeros((len(fingerprint.ev_ids), fingerprint.time_grid.timesteps))
+        power[found, :power.shape[1] - shift] = entry.power[rows[found], shift:]
+
+        fleet_power = np.empty_like(power)
+        fleet_power[fingerprint.order] = power
+        return fleet_power
+
+    def store(self, group: str, fingerprint: ScheduleFingerprint, power: np.ndarray):
+        """
+        Caches the schedule calculated for `fingerprint`.
+
+        Args:
+            group: The identifier of the station group.
+            fingerprint: The fingerprint of the inputs the schedule was calculated from.
+            power: The calculated power matrix, with rows in the order of the fleet.
+        """
+        entry = _CacheEntry(fingerprint, power[fingerprint.order])
+        with self._lock:
+            self._entries[group] = entry
+
+    def forget(self, group: str):
+        """Forgets the cached schedule of a group, so its next cycle is always calculated."""
+        with self._lock:
+            self._entries.pop(group, None)
+
+    def clear(self):
+        """Forgets all cached schedules (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
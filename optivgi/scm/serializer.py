@@ -0,0 +1,133 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides fast JSON serialization of charging profiles and request bodies.
+
+`ProfileSerializer` encodes the fixed part of a profile (including the formatted
+`startSchedule`) once per cycle, and only encodes the periods of each EV.
+Profiles are returned as `RawJSON` bytes, which `dumps` embeds verbatim when
+encoding a request body, so they are never encoded twice.
+
+`orjson` is used if it is installed, otherwise the standard `json` module.
+"""
+import json
+from collections.abc import Sequence
+from typing import Any
+
+from .constants import EVConstants
+from .profile import build_charging_profile
+
+try:
+    import orjson
+except ImportError:  # optional, faster encoder
+    orjson = None  # pylint: disable=invalid-name
+
+#: PERIOD_FORMAT: Encoding of a single `chargingSchedulePeriod` entry, matching `build_charging_profile`.
+PERIOD_FORMAT = b'{"startPeriod":%d,"limit":%b,"numberPhases":1}'
+
+_PERIODS_KEY = b'"chargingSchedulePeriod":['
+
+
+class RawJSON(bytes):
+    """
+    An already encoded JSON value, embedded verbatim by `dumps`.
+    """
+    __slots__ = ()
+
+    def with_fields(self, **fields: Any) -> 'RawJSON':
+        """Returns a copy of this encoded JSON object with `fields` added in front of its members."""
+        if not fields:
+            return self
+        return RawJSON(b'{' + _dumps(fields)[1:-1] + (b',' + self[1:] if self != b'{}' else b'}'))
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)  # pylint: disable=no-member
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encodes `obj` as compact JSON bytes, embedding `RawJSON` values verbatim.
+
+    Args:
+        obj: A JSON-compatible object (dicts, lists, strings, numbers, ...),
+             possibly containing `RawJSON` values.
+
+    Returns:
+        The encoded JSON.
+    """
+    if isinstance(obj, RawJSON):
+        return bytes(obj)
+    raw: list[RawJSON] = []
+
+    def replace(value):
+        if isinstance(value, RawJSON):
+            raw.append(value)
+            return f'\x00raw{len(raw) - 1}\x00'
+        if isinstance(value, dict):
+            return {key: replace(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [replace(item) for item in value]
+        return value
+
+    encoded = _dumps(replace(obj))
+    for i, value in enumerate(raw):
+        encoded = encoded.replace(_dumps(f'\x00raw{i}\x00'), value, 1)
+    return encoded
+
+
+def loads(data: bytes | str) -> Any:
+    """Decodes JSON `data`."""
+    if orjson is not None:
+        return orjson.loads(data)  # pylint: disable=no-member
+    return json.loads(data)
+
+
+class ProfileSerializer:
+    """
+    Encodes charging profiles with a shared, pre-encoded header.
+
+    One serializer is created per cycle and profile kind, so the formatted
+    `startSchedule` and all fixed fields are encoded once for all EVs.
+    The output decodes to the same dictionary as `build_charging_profile`.
+    """
+    def __init__(self, start_schedule: str, unit: str, purpose: str = EVConstants.CHARGING_PROFILE_PURPOSE):
+        """
+        Pre-encodes the fixed part of the profiles.
+
+        Args:
+            start_schedule: The formatted start time of the schedules.
+            unit: The value of the `ChargingRateUnit` of the limits.
+            purpose: The `chargingProfilePurpose` of the profiles.
+        """
+        template = _dumps(build_charging_profile(start_schedule, unit, [], [], purpose))
+        split = template.index(_PERIODS_KEY) + len(_PERIODS_KEY)
+        self._head, self._tail = template[:split], template[split:].removeprefix(b']')
+
+    def encode(self, starts: Sequence[int], limits: Sequence[float]) -> RawJSON:
+        """
+        Encodes the profile with the given periods.
+
+        Args:
+            starts: The start offset (seconds) of each period.
+            limits: The limit of each period.
+
+        Returns:
+            The encoded profile.
+        """
+        encoded_limits = _dumps(list(limits))[1:-1].split(b',') if limits else []
+        periods = b','.join([PERIOD_FORMAT % (start, limit) for start, limit in zip(starts, encoded_limits)])
+        return RawJSON(self._head + periods + b']' + self._tail)
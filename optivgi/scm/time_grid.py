@@ -0,0 +1,86 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Defines the `TimeGrid` of a station group.
+
+`AlgorithmConstants` fixes one resolution and horizon for the whole process. A
+`TimeGrid` carries them at runtime instead, so that each station group can use
+its own, e.g. 5-minute steps over 24 hours for a bus depot and 1-minute steps
+over 2 hours for a retail lot. `DEFAULT_TIME_GRID` matches `AlgorithmConstants`.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from .constants import AlgorithmConstants
+
+
+@dataclass(frozen=True)
+class TimeGrid:
+    """
+    Time resolution and planning horizon used to schedule a station group.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: resolution: The time duration of a single step.
+    resolution: timedelta = AlgorithmConstants.RESOLUTION
+    #: runtime: The total time horizon planned for.
+    runtime: timedelta = AlgorithmConstants.RUNTIME
+    #: timesteps: The number of steps within `runtime` (derived).
+    timesteps: int = field(init=False)
+    #: power_energy_factor: Conversion factor from power (kW or A) applied over one
+    #: `resolution` step to energy (kWh or Ah) (derived).
+    power_energy_factor: float = field(init=False)
+
+    def __post_init__(self):
+        """Derives `timesteps` and `power_energy_factor`."""
+        assert self.resolution > timedelta(0), 'Time grid resolution must be positive'
+        object.__setattr__(self, 'timesteps', int(self.runtime.total_seconds() / self.resolution.total_seconds()))
+        object.__setattr__(self, 'power_energy_factor', self.resolution.total_seconds() / timedelta(hours=1).total_seconds())
+        assert self.timesteps > 0, 'Time grid runtime must contain at least one resolution step'
+
+    def index(self, time: datetime, now: datetime) -> int:
+        """
+        Calculates the index of the step containing `time` in the horizon starting at `now`.
+
+        The result is clamped between 0 and `timesteps - 1`.
+
+        Args:
+            time: The datetime to locate.
+            now: The reference start time of the planning horizon.
+
+        Returns:
+            The integer step index.
+        """
+        index = int((time - now).total_seconds() / self.resolution.total_seconds())
+        return max(0, min(index, self.timesteps - 1))
+
+    def start(self, now: datetime) -> datetime:
+        """
+        Rounds `now` down to the start of its resolution step (aligned to the epoch).
+
+        For resolutions that divide an hour, this is equivalent to
+        `optivgi.utils.round_down_datetime`.
+
+        Args:
+            now: The datetime to round down.
+
+        Returns:
+            The start of the step containing `now`.
+        """
+        epoch = datetime(1970, 1, 1, tzinfo=now.tzinfo)
+        return now - (now - epoch) % self.resolution
+
+
+#: DEFAULT_TIME_GRID: The time grid defined by `AlgorithmConstants`, used when a group does not define its own.
+DEFAULT_TIME_GRID = TimeGrid()
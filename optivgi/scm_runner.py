@@ -16,30 +16,525 @@ Core Smart Charging Management (SCM) runner logic.
 
 This module orchestrates the process of fetching data via the Translation layer,
 running the selected SCM algorithm, and sending the results back through the Translation layer.
+
+Groups are processed one after the other by default. With a `GroupExecutor`, the
+groups are processed concurrently: translation I/O runs in a thread pool and the
+CPU-bound solves optionally run in a process pool (see also the staged
+`optivgi.pipeline.GroupPipeline`). In all modes, a failing group is logged and
+reported in its `GroupResult` without affecting the other groups. With a
+`ScheduleCache`, groups whose inputs did not change reuse their previous schedule
+instead of running the algorithm. With a `CycleBudget`, each group gets a deadline
+from its share of the cycle's time budget, the duration of each phase and the
+phases that ended after the deadline are reported, and groups whose deadline
+passed before their calculation are handled by the budget's `OverrunPolicy`.
 """
 import os
+import time
 import logging
-from typing import Type
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Optional, Type
 from datetime import datetime, UTC
 
-from .translation import Translation
+from . import metrics
+from .budget import CycleBudget, OverrunPolicy
+from .translation import Translation, group_scope
 from .scm.algorithm import Algorithm
-from .scm.constants import AlgorithmConstants
-from .utils import round_down_datetime
+from .scm.deadline import Deadline, deadline_scope
+from .scm.ev import EV
+from .scm.feasibility import FeasibilityReport, check_feasibility, shed_load
+from .scm.fleet import EVFleet
+from .scm.schedule_cache import ScheduleCache, ScheduleFingerprint
+from .scm.time_grid import TimeGrid
+
+
+@dataclass
+class GroupInputs:
+    """
+    Inputs of the SCM calculation of one station group, fetched from the Translation Layer.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: group: The identifier of the station group.
+    group: str
+    #: now: The start of the planning horizon, aligned to the group's time grid.
+    now: datetime
+    #: time_grid: The time grid of the group.
+    time_grid: TimeGrid
+    #: evs: The EVs of the group.
+    evs: list[EV] = field(repr=False)
+    #: peak_power_demand: The maximum aggregate power allowed for each time step.
+    peak_power_demand: list[float] = field(repr=False)
+    #: deadline: The deadline of the group, passed to the algorithm (see `Algorithm.deadline`).
+    deadline: Optional[Deadline] = None
+
+
+@dataclass
+class GroupResult:
+    """
+    Outcome of one SCM cycle for a station group.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: group: The identifier of the station group.
+    group: str
+    #: ev_count: The number of EVs fetched for the group.
+    ev_count: int = 0
+    #: sent_count: The number of charging profiles (or payloads) sent to the external system.
+    sent_count: int = 0
+    #: reused: Whether the previous schedule was reused from the `ScheduleCache` instead of calculated.
+    reused: bool = False
+    #: algorithm: The name of the algorithm class that calculated the schedule, or None if it was not calculated.
+    algorithm: Optional[str] = None
+    #: calculate_duration: Wall time (seconds) of `Algorithm.calculate`, or None if it was not run.
+    calculate_duration: Optional[float] = None
+    #: duration: Wall time (seconds) spent on the group.
+    duration: float = 0.
+    #: phase_durations: Wall time (seconds) of each phase of the group (fetch, solve, profiles and send).
+    phase_durations: dict[str, float] = field(default_factory=dict)
+    #: overruns: The phases that ended after the deadline of the group.
+    overruns: list[str] = field(default_factory=list)
+    #: action: The `OverrunPolicy` applied because the deadline passed before the solve, or None.
+    action: Optional[OverrunPolicy] = None
+    #: error: The exception that aborted the group, or None if it succeeded.
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the group was processed without error."""
+        return self.error is None
+
+    @contextmanager
+    def phase(self, name: str, deadline: Optional[Deadline]) -> Iterator[None]:
+        """
+        Times a phase of the group, with the group (see `group_scope`) and `deadline`
+        (see `deadline_scope`) active for the Translation Layer.
+
+        Args:
+            name: The name of the phase (fetch, solve, profiles or send).
+            deadline: The deadline of the group, or None to leave the deadline of the thread untouched.
+        """
+        start = time.perf_counter()
+        try:
+            with group_scope(self.group), nullcontext() if deadline is None else deadline_scope(deadline):
+                yield
+        finally:
+            self.phase_durations[name] = time.perf_counter() - start
+            if deadline is not None and deadline.expired:
+                self.overruns.append(name)
+
+
+@dataclass
+class SCMCycle:
+    """
+    Context of one SCM cycle, shared by all of its groups.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: translation: The Translation Layer.
+    translation: Translation
+    #: algorithm_cls: The class type of the SCM algorithm to use.
+    algorithm_cls: Type[Algorithm]
+    #: current_time: The time the cycle started.
+    current_time: datetime
+    #: executor: Optional executor processing the groups concurrently.
+    executor: Optional['GroupExecutor'] = None
+    #: cache: Optional cache of the previous schedules.
+    cache: Optional[ScheduleCache] = None
+    #: budget: Optional time budget of the cycle.
+    budget: Optional[CycleBudget] = None
+    #: deadline: The end of the cycle's budget, or None without a budget.
+    deadline: Optional[Deadline] = None
+    #: group_share: The share of the budget (seconds) of each group, or None without a budget.
+    group_share: Optional[float] = None
+
+    def group_deadline(self) -> Optional[Deadline]:
+        """Returns the deadline of a group starting now: the end of its share, at most the end of the cycle."""
+        if self.group_share is None:
+            return self.deadline
+        return Deadline.after(self.group_share).earliest(self.deadline)
+
+
+def fetch_group_inputs(translation: Translation, group: str, current_time: datetime,
+                       deadline: Optional[Deadline] = None) -> GroupInputs:
+    """
+    Retrieves the time grid, the EVs and the peak power demand of a group from the Translation Layer.
+
+    Args:
+        translation: The Translation Layer.
+        group: The identifier of the station group.
+        current_time: The current time, rounded down to the group's time grid resolution.
+        deadline: Optional deadline of the group, stored in the inputs.
+
+    Returns:
+        The `GroupInputs` of the group.
+    """
+    time_grid = translation.get_time_grid(group)
+    now = time_grid.start(current_time)
+    logging.info('Running SCM for group: %s at time: %s', group, now)
+    evs, voltage = translation.get_evs(group)
+    peak_power_demand = translation.get_peak_power_demand(group, now, voltage)
+    return GroupInputs(group, now, time_grid, evs, peak_power_demand, deadline)
+
+
+def solve_group(algorithm_cls: Type[Algorithm], inputs: GroupInputs,
+                fleet: Optional[EVFleet] = None) -> tuple[Algorithm, FeasibilityReport, list[int], float]:
+    """
+    Checks the feasibility of a group, sheds load if needed, and calculates its schedule.
+
+    This is the CPU-bound part of a cycle. It does not use the Translation Layer,
+    so it can run in a separate process (the arguments and the result are picklable).
+
+    Args:
+        algorithm_cls: The class type of the SCM algorithm to use.
+        inputs: The inputs of the group.
+        fleet: The `EVFleet` of `inputs.evs` if already built, e.g. for the schedule cache.
+
+    Returns:
+        A tuple of the calculated algorithm, the feasibility report, the IDs of the
+        EVs whose minimum power was shed, and the duration (seconds) of `calculate`.
+    """
+    if fleet is None:
+        fleet = EVFleet(inputs.evs, inputs.time_grid)
+    report = check_feasibility(fleet, inputs.peak_power_demand, inputs.now)
+    shed = shed_load(fleet, inputs.peak_power_demand, inputs.now, report) if not report.power_feasible else []
+
+    algorithm = algorithm_cls(fleet, inputs.peak_power_demand, inputs.now)
+    algorithm.deadline = inputs.deadline
+    start = time.perf_counter()
+    algorithm.calculate()
+    return algorithm, report, [ev.ev_id for ev in shed], time.perf_counter() - start
+
+
+def log_feasibility(group: str, report: FeasibilityReport, shed: list[int]):
+    """Logs the load shedding and the unreachable energy targets of a group returned by `solve_group`."""
+    if not report.power_feasible:
+        logging.warning('Minimum power exceeds peak power demand by up to %s in group %s, shed EVs: %s',
+                        report.max_overload, group, shed)
+    if report.unreachable_evs:
+        logging.info('Unreachable energy targets in group %s: %s', group, report.unreachable_evs)
+
+
+def _reuse_last_schedule(cycle: SCMCycle, inputs: GroupInputs, fleet: Optional[EVFleet],
+                         fingerprint: Optional[ScheduleFingerprint], result: GroupResult) -> Optional[Algorithm]:
+    """
+    Returns the algorithm holding the last schedule of a group for the REUSE policy, or None to skip the group.
+
+    Without a previous schedule, `result.action` falls back to SKIP.
+    """
+    if result.action is OverrunPolicy.REUSE:
+        power = None
+        if cycle.cache is not None and fleet is not None and fingerprint is not None:
+            power = cycle.cache.last_schedule(inputs.group, fingerprint)
+        if power is not None and fleet is not None:
+            algorithm = cycle.algorithm_cls(fleet, inputs.peak_power_demand, inputs.now)
+            fleet.power[:] = power
+            result.reused = True
+            return algorithm
+        logging.warning('No previous schedule of group %s to reuse, skipping it', inputs.group)
+        result.action = OverrunPolicy.SKIP
+    return None
+
+
+def solve_or_reuse(cycle: SCMCycle, inputs: GroupInputs, result: GroupResult) -> Optional[Algorithm]:
+    """
+    Solves a group (`solve_group`), or reuses its previous schedule if its inputs did not change.
+
+    On a cache hit, the algorithm is instantiated with the shifted previous schedule
+    and `calculate` is not run. On a miss, the fleet built for the fingerprint is
+    solved, and the new schedule is stored in the cache.
+    If the deadline of the group passed before the solve, the overrun policy of the
+    cycle's budget is applied instead: nothing is sent (SKIP), the schedule is
+    calculated by the fallback algorithm (DEGRADE), or the last schedule of the
+    group is reused whatever its inputs (REUSE).
+
+    Args:
+        cycle: The context of the cycle.
+        inputs: The inputs of the group.
+        result: The result of the group, updated with `reused`, `action`, `algorithm` and `calculate_duration`.
+
+    Returns:
+        The algorithm holding the schedule, or None if the group is skipped.
+    """
+    fleet = fingerprint = None
+    if cycle.cache is not None:
+        fleet = EVFleet(inputs.evs, inputs.time_grid)
+        fingerprint = ScheduleFingerprint.of(fleet, inputs.peak_power_demand, inputs.now, cycle.algorithm_cls)
+        power = cycle.cache.lookup(inputs.group, fingerprint)
+        if power is not None:
+            logging.info('Inputs of group %s unchanged, reusing the previous schedule', inputs.group)
+            algorithm = cycle.algorithm_cls(fleet, inputs.peak_power_demand, inputs.now)
+            fleet.power[:] = power
+            result.reused = True
+            return algorithm
+
+    algorithm_cls = cycle.algorithm_cls
+    if cycle.budget is not None and cycle.budget.policy is not OverrunPolicy.NONE and \
+            inputs.deadline is not None and inputs.deadline.expired:
+        result.action = cycle.budget.policy
+        logging.warning('Deadline of group %s passed before its calculation, applying overrun policy %s',
+                        inputs.group, result.action.value)
+        if result.action is not OverrunPolicy.DEGRADE:
+            return _reuse_last_schedule(cycle, inputs, fleet, fingerprint, result)
+        algorithm_cls = cycle.budget.fallback_algorithm
+
+    if cycle.executor is not None:
+        algorithm, report, shed, result.calculate_duration = cycle.executor.solve(algorithm_cls, inputs, fleet)
+    else:
+        algorithm, report, shed, result.calculate_duration = solve_group(algorithm_cls, inputs, fleet)
+    result.algorithm = algorithm_cls.__name__
+    log_feasibility(inputs.group, report, shed)
+    # A degraded schedule is not cached, so the next cycle calculates the full one
+    if cycle.cache is not None and fingerprint is not None and algorithm_cls is cycle.algorithm_cls:
+        cycle.cache.store(inputs.group, fingerprint, algorithm.fleet.power)
+    return algorithm
+
+
+def build_group_profiles(translation: Translation, algorithm: Algorithm) -> dict[EV, dict | bytes]:
+    """
+    Builds the charging profiles of a group from its calculated schedule.
+
+    Args:
+        translation: The Translation Layer.
+        algorithm: An algorithm whose `calculate` method has already been run.
+
+    Returns:
+        The payloads from `get_payloads` if the translation defines a `profile_template`,
+        otherwise the profiles from `get_charging_profiles`.
+    """
+    if translation.profile_template is not None:
+        return algorithm.get_payloads(translation.profile_template)
+    return algorithm.get_charging_profiles()
+
+
+def send_group_profiles(translation: Translation, profiles: dict[EV, dict | bytes]) -> int:
+    """
+    Sends the profiles built by `build_group_profiles` through the Translation Layer.
+
+    Uses `send_payloads` if the translation defines a `profile_template`, otherwise `send_power_to_evs`.
+
+    Returns:
+        The number of profiles (or payloads) sent.
+    """
+    if translation.profile_template is not None:
+        translation.send_payloads(profiles)
+    else:
+        translation.send_power_to_evs(profiles)
+    return len(profiles)
+
+
+def send_group_results(translation: Translation, algorithm: Algorithm) -> int:
+    """
+    Sends the calculated schedule of a group through the Translation Layer.
 
-def scm_runner(translation: Translation, algorithm_cls: Type[Algorithm]):
+    Uses `get_payloads` and `send_payloads` if the translation defines a `profile_template`,
+    otherwise `get_charging_profiles` and `send_power_to_evs`.
+
+    Args:
+        translation: The Translation Layer.
+        algorithm: An algorithm whose `calculate` method has already been run.
+
+    Returns:
+        The number of profiles (or payloads) sent.
+    """
+    return send_group_profiles(translation, build_group_profiles(translation, algorithm))
+
+
+def record_metrics(results: list[GroupResult], duration: float):
+    """
+    Records the results of a cycle in the metrics of `optivgi.metrics`.
+
+    Args:
+        results: The `GroupResult` of each group of the cycle.
+        duration: The duration (seconds) of the cycle.
+    """
+    metrics.CYCLE_DURATION.observe(duration)
+    for result in results:
+        for phase, phase_duration in result.phase_durations.items():
+            metrics.PHASE_DURATION.observe(phase_duration, result.group, phase)
+        for phase in result.overruns:
+            metrics.OVERRUNS.inc(result.group, phase)
+        if result.action is not None:
+            metrics.OVERRUN_ACTIONS.inc(result.group, result.action.value)
+        if result.algorithm is not None and result.calculate_duration is not None:
+            metrics.CALCULATE_DURATION.observe(result.calculate_duration, result.algorithm, result.group)
+            metrics.CALCULATIONS.inc(result.algorithm, result.group)
+        if not result.ok:
+            metrics.GROUP_ERRORS.inc(result.group)
+            continue
+        metrics.GROUP_EVS.set(result.ev_count, result.group)
+        metrics.PROFILES_SENT.inc(result.group, amount=result.sent_count)
+        if result.reused:
+            metrics.SCHEDULES_REUSED.inc(result.group)
+
+
+class GroupExecutor(AbstractContextManager):
+    """
+    Thread and process pools used by `scm_runner` to process groups concurrently.
+
+    Each group is processed in a thread of the I/O pool (fetch, solve, send), so up
+    to `io_workers` groups wait on the external system at the same time. If
+    `solve_workers` is positive, the solves are submitted to a process pool of that
+    size, so CPU-bound calculations are not limited by the GIL; otherwise they run in
+    the I/O threads. The Translation Layer must be safe to call from several threads.
+
+    Attributes:
+        io_workers (int): Maximum number of groups processed concurrently.
+        solve_workers (int): Size of the process pool for solves (0 to solve in the I/O threads).
+    """
+    def __init__(self, io_workers: int = 8, solve_workers: int = 0):
+        """
+        Creates the pools.
+
+        Args:
+            io_workers: Maximum number of groups processed concurrently.
+            solve_workers: Size of the process pool for solves (0 to solve in the I/O threads).
+        """
+        assert io_workers > 0, 'At least one I/O worker is required'
+        self.io_workers = io_workers
+        self.solve_workers = solve_workers
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='scm-group')
+        self.solve_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        if solve_workers > 0:
+            self.solve_pool = ProcessPoolExecutor(max_workers=solve_workers)
+
+    @classmethod
+    def from_env(cls) -> Optional['GroupExecutor']:
+        """
+        Creates an executor from the `SCM_IO_WORKERS` and `SCM_SOLVE_WORKERS` environment variables.
+
+        Returns:
+            A new `GroupExecutor`, or None (sequential processing) if neither variable is set to a positive value.
+        """
+        io_workers = int(os.getenv('SCM_IO_WORKERS', '0'))
+        solve_workers = int(os.getenv('SCM_SOLVE_WORKERS', '0'))
+        if io_workers <= 0 and solve_workers <= 0:
+            return None
+        return cls(io_workers if io_workers > 0 else os.cpu_count() or 1, max(solve_workers, 0))
+
+    @property
+    def concurrency(self) -> int:
+        """The number of groups progressing at the same time: `io_workers`, or fewer if the process pool is smaller."""
+        return min(self.io_workers, self.solve_workers) if self.solve_workers > 0 else self.io_workers
+
+    def solve(self, algorithm_cls: Type[Algorithm], inputs: GroupInputs,
+              fleet: Optional[EVFleet] = None) -> tuple[Algorithm, FeasibilityReport, list[int], float]:
+        """
+        Runs `solve_group` in the process pool (or in the calling thread without one).
+
+        A prebuilt `fleet` is only used in the calling thread; worker processes build
+        their own from the pickled `inputs`. If a worker process dies, the process pool
+        is replaced so that the other groups can still be solved, and the error is
+        raised for this group.
+        """
+        if self.solve_pool is None:
+            return solve_group(algorithm_cls, inputs, fleet)
+        pool = self.solve_pool
+        try:
+            return pool.submit(solve_group, algorithm_cls, inputs).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self.solve_pool is pool:
+                    logging.error('Solve process pool broken, restarting it')
+                    self.solve_pool = ProcessPoolExecutor(max_workers=self.solve_workers)
+                    pool.shutdown(wait=False)
+            raise
+
+    def run_groups(self, cycle: SCMCycle, groups: list[str]) -> list[GroupResult]:
+        """
+        Runs one SCM cycle for each group (`run_group`) in the I/O thread pool.
+
+        Args:
+            cycle: The context of the cycle.
+            groups: The identifiers of the station groups.
+
+        Returns:
+            The `GroupResult` of each group, in the order of `groups`.
+        """
+        futures = [self.io_pool.submit(run_group, cycle, group) for group in groups]
+        return [future.result() for future in futures]
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Shuts down the pools."""
+        self.io_pool.shutdown(wait=True)
+        if self.solve_pool is not None:
+            self.solve_pool.shutdown(wait=True)
+
+
+def run_group(cycle: SCMCycle, group: str) -> GroupResult:
+    """
+    Runs one SCM cycle for a group, catching and logging any error.
+
+    The deadline of the group (`SCMCycle.group_deadline`) starts when the group does.
+
+    Args:
+        cycle: The context of the cycle.
+        group: The identifier of the station group.
+
+    Returns:
+        The `GroupResult` of the group.
+    """
+    result = GroupResult(group)
+    start = time.perf_counter()
+    deadline = cycle.group_deadline()
+    try:
+        with result.phase('fetch', deadline):
+            inputs = fetch_group_inputs(cycle.translation, group, cycle.current_time, deadline)
+        result.ev_count = len(inputs.evs)
+
+        with result.phase('solve', deadline):
+            algorithm = solve_or_reuse(cycle, inputs, result)
+        if algorithm is not None:
+            with result.phase('profiles', deadline):
+                profiles = build_group_profiles(cycle.translation, algorithm)
+            with result.phase('send', deadline):
+                result.sent_count = send_group_profiles(cycle.translation, profiles)
+    except Exception as e: # pylint: disable=broad-except
+        logging.exception('Error running SCM for group %s: %s', group, repr(e))
+        result.error = e
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def station_groups() -> list[str]:
+    """Returns the station groups configured in the comma-separated `STATION_GROUPS` environment variable."""
+    return list(filter(bool, map(str.strip, os.getenv('STATION_GROUPS', '').split(','))))
+
+
+def scm_runner(translation: Translation, algorithm_cls: Type[Algorithm], executor: Optional[GroupExecutor] = None, # pylint: disable=too-many-arguments,too-many-positional-arguments
+               cache: Optional[ScheduleCache] = None, budget: Optional[CycleBudget] = None,
+               groups: Optional[list[str]] = None) -> list[GroupResult]:
     """
     Executes one cycle of the Smart Charging Management logic for configured groups.
 
     This function performs the following steps for each station group defined
-    in the `STATION_GROUPS` environment variable:
-    1. Retrieves the list of EVs (`get_evs`) and peak power demand (`get_peak_power_demand`) from the provided `translation` object.
-    2. Instantiates the specified `Algorithm` with the fetched data and current time.
-    3. Runs the algorithm's `calculate` method to determine charging schedules.
-    4. Retrieves the calculated charging profiles using `get_charging_profiles`.
-    5. Sends the profiles back to the external system via `translation.send_power_to_evs`.
+    in the `STATION_GROUPS` environment variable (or the subset of them in `groups`):
+    1. Retrieves the time grid (`get_time_grid`), the list of EVs (`get_evs`) and peak power demand (`get_peak_power_demand`) from the provided `translation` object.
+    2. Checks the feasibility of the inputs (`check_feasibility`) and sheds the minimum
+       power of selected EVs (`shed_load`) if their minimum power exceeds the peak power demand.
+    3. Instantiates the specified `Algorithm` with an `EVFleet` of the fetched EVs, so the
+       window indices computed for the feasibility check are reused, and the current time.
+    4. Runs the algorithm's `calculate` method to determine charging schedules.
+    5. Retrieves the calculated charging profiles using `get_charging_profiles`, or the final
+       request payloads using `get_payloads` if the translation defines a `profile_template`.
+    6. Sends the profiles back to the external system via `translation.send_power_to_evs`
+       (or the payloads via `translation.send_payloads`).
+
+    The current time is rounded down to the nearest resolution interval of each group's time grid.
+    Steps 2 to 4 are performed by `solve_group`, and skipped if `cache` holds a reusable
+    schedule for the unchanged inputs of the group (see `ScheduleCache`). An error in one group is logged and
+    reported in its `GroupResult`; the other groups are still processed.
 
-    The current time is rounded down to the nearest algorithm resolution interval.
+    With a `budget`, each group gets a deadline at the end of its share of the budget
+    (`CycleBudget.group_share`, with the `GroupExecutor.concurrency` of the executor).
+    The deadline bounds the Translation Layer's requests (see `optivgi.scm.deadline.deadline_timeout`)
+    and the algorithm, the phases ending after it are reported in the `GroupResult`, and the
+    budget's `OverrunPolicy` is applied to the groups whose deadline passed before step 2.
 
     Args:
         translation: An instantiated object of a class inheriting from
@@ -47,20 +542,54 @@ def scm_runner(translation: Translation, algorithm_cls: Type[Algorithm]):
                      external system.
         algorithm_cls: The class type of the SCM algorithm to use (must inherit
                        from `optivgi.scm.algorithm.Algorithm`).
+        executor: Optional `GroupExecutor` (or `optivgi.pipeline.GroupPipeline`) to process
+                  the groups concurrently. If None, the groups are processed one after the other.
+        cache: Optional `ScheduleCache` to reuse the previous schedules of unchanged groups.
+        budget: Optional `CycleBudget` bounding the duration of the cycle.
+        groups: Optional subset of `STATION_GROUPS` to run, e.g. the groups affected by an event.
+                Groups that are not configured are ignored. If None, all groups run.
+
+    Returns:
+        The `GroupResult` of each group, in the order of `STATION_GROUPS` (or of `groups`).
     """
-    groups = filter(bool, map(str.strip, os.getenv('STATION_GROUPS', '').split(',')))
+    configured = station_groups()
+    if groups is not None:
+        unknown = [group for group in groups if group not in configured]
+        if unknown:
+            logging.warning('Ignoring groups not in STATION_GROUPS: %s', unknown)
+        groups = [group for group in groups if group in configured]
+    else:
+        groups = configured
 
-    now = round_down_datetime(datetime.now(UTC), int(AlgorithmConstants.RESOLUTION.total_seconds() / 60))
+    current_time = datetime.now(UTC)
 
-    logging.info('Running SCM for groups: %s at time: %s', os.getenv('STATION_GROUPS'), now)
+    logging.info('Running SCM for groups: %s at time: %s', ','.join(groups), current_time)
 
-    for group in groups:
-        logging.info('Running SCM for group: %s', group)
-        evs, voltage = translation.get_evs(group)
-        peak_power_demand = translation.get_peak_power_demand(group, now, voltage)
+    cycle = SCMCycle(translation, algorithm_cls, current_time, executor, cache, budget)
+    if budget is not None:
+        cycle.deadline = Deadline.after(budget.budget.total_seconds())
+        cycle.group_share = budget.group_share(len(groups), 1 if executor is None else executor.concurrency)
 
-        algorithm = algorithm_cls(evs, peak_power_demand, now)
-        algorithm.calculate()
+    start = time.perf_counter()
+    if executor is None:
+        results = [run_group(cycle, group) for group in groups]
+    else:
+        results = executor.run_groups(cycle, groups)
+    duration = time.perf_counter() - start
+    record_metrics(results, duration)
 
-        powers = algorithm.get_charging_profiles()
-        translation.send_power_to_evs(powers)
+    failed = [result.group for result in results if not result.ok]
+    logging.info('SCM cycle finished for %s groups in %.2fs (%s failed%s)', len(results), duration, len(failed),
+                 f': {failed}' if failed else '')
+    if budget is not None:
+        overruns = {result.group: result.overruns for result in results if result.overruns}
+        if overruns:
+            logging.warning('Groups exceeding their deadline (phases): %s', overruns)
+        actions = {result.group: result.action.value for result in results if result.action is not None}
+        if actions:
+            logging.warning('Overrun policy applied to groups: %s', actions)
+        if duration > budget.budget.total_seconds():
+            logging.warning('SCM cycle took %.2fs, exceeding its budget of %.2fs', duration, budget.budget.total_seconds())
+    if cache is not None:
+        logging.info('Schedule cache: %s hits, %s misses (hit rate %.0f%%)', cache.hits, cache.misses, 100 * cache.hit_rate)
+    return results
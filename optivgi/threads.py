@@ -18,14 +18,22 @@ These functions are designed to be run in separate threads, allowing the main
 application to remain responsive while handling periodic scheduling tasks or
 reacting to external events.
 """
+import os
 import time
 import logging
 import traceback
-from queue import Queue
+from contextlib import nullcontext
+from queue import Empty, Queue
 from datetime import datetime
-from typing import Type
+from typing import Any, Type
 
-from .scm_runner import scm_runner
+from . import metrics
+from .budget import CycleBudget
+from .pipeline import GroupPipeline
+from .replay import RecordingTranslation
+from .scm.schedule_cache import ScheduleCache
+from .scm_runner import GroupExecutor, scm_runner, station_groups
+from .triggers import Trigger, TriggerType, plan_cycles
 from .translation import Translation
 from .scm.algorithm import Algorithm
 
@@ -35,7 +43,8 @@ def timer_thread_worker(event_queue: Queue):
     Worker function for a timer thread.
 
     This function sleeps until the start of the next minute and then puts a
-    "Timer Event" message onto the provided event queue. It runs in an infinite loop.
+    "Timer Event" `Trigger` of type `TriggerType.TIMER` onto the provided event queue.
+    It runs in an infinite loop.
 
     Args:
         event_queue: The queue to which timer events will be added.
@@ -44,7 +53,44 @@ def timer_thread_worker(event_queue: Queue):
         current_time = time.time()
         delay = 60 - (current_time % 60)
         time.sleep(delay) # Sleep until the top of the next minute
-        event_queue.put("Timer Event")
+        event_queue.put(Trigger(TriggerType.TIMER, reason="Timer Event"))
+
+
+def collect_events(event_queue: Queue, debounce: float = 0.) -> tuple[list[Any], bool]:
+    """
+    Waits for an event, then collects the events arriving within the `debounce` window after it.
+
+    The events already waiting in the queue are always collected, so a burst of
+    events (e.g. status notifications after a CSMS restart) results in a single SCM
+    cycle. The window is not extended by later events, so an event waits at most
+    `debounce` seconds before its cycle starts. An urgent trigger (an arrival or
+    departure, see `TriggerType.urgent`) closes the window at once.
+
+    Args:
+        event_queue: The queue from which events are retrieved.
+        debounce: The time (seconds) to wait for more events after the first one.
+
+    Returns:
+        A tuple of the collected events, in the order they were queued, and whether
+        the stop signal (`None`) was received. The caller must call `task_done` once
+        for each collected event.
+    """
+    event = event_queue.get()
+    if event is None:
+        return [], True
+    events = [event]
+    window_end = time.monotonic() + (0. if Trigger.of(event).type.urgent else debounce)
+    while True:
+        remaining = window_end - time.monotonic()
+        try:
+            event = event_queue.get(timeout=remaining) if remaining > 0 else event_queue.get_nowait()
+        except Empty:
+            return events, False
+        if event is None:
+            return events, True
+        events.append(event)
+        if Trigger.of(event).type.urgent:
+            window_end = 0.
 
 
 # SCM worker thread function
@@ -58,6 +104,29 @@ def scm_worker(event_queue: Queue, translation_cls: Type[Translation], algorithm
     the process and ensures the event queue task is marked as done.
 
     It operates within the context manager provided by the `Translation`.
+    If `SCM_FETCH_WORKERS` or `SCM_SEND_WORKERS` is set, the groups are processed
+    by a staged `GroupPipeline`; otherwise, if `SCM_IO_WORKERS` or `SCM_SOLVE_WORKERS`
+    is set, concurrently by a `GroupExecutor`. The executor is kept for the lifetime
+    of the worker. If `SCM_SCHEDULE_CACHE` is set to 1, a `ScheduleCache` reuses the
+    previous schedules of groups whose inputs did not change. If `SCM_CYCLE_BUDGET_SECONDS`
+    is set, each cycle is bounded by a `CycleBudget` (with `SCM_OVERRUN_POLICY`). A
+    warning is logged when events queued up while a cycle was running.
+
+    The cycles are recorded in `optivgi.metrics`. If `SCM_METRICS_PORT` is set, a
+    `MetricsServer` serves them for the lifetime of the worker; if `SCM_METRICS_FILE`
+    is set, they are written to that file after each event. If `SCM_RECORD_FILE` is
+    set, the I/O of the translation is recorded to that file by a `RecordingTranslation`,
+    to be replayed with ``python -m optivgi.replay``.
+
+    Events are coalesced (see `collect_events`): all events that are pending, or that
+    arrive within `SCM_EVENT_DEBOUNCE_SECONDS` (default 0) of the first one, are
+    merged into a single SCM cycle, and counted in `optivgi.metrics.EVENTS_COALESCED`.
+
+    Events may be `optivgi.triggers.Trigger` objects with a type and a group scope
+    (other events trigger all groups). The collected events run in the cycles planned
+    by `optivgi.triggers.plan_cycles`: the groups affected by arrivals and departures
+    first, then the groups of the other events. Use a `optivgi.triggers.TriggerQueue`
+    as `event_queue` so that urgent events are also taken before routine ones.
 
     Args:
         event_queue: The queue from which events are retrieved. Processing stops
@@ -67,15 +136,43 @@ def scm_worker(event_queue: Queue, translation_cls: Type[Translation], algorithm
         algorithm_cls: The class type of the SCM Algorithm implementation to use.
                        Must inherit from `optivgi.scm.algorithm.Algorithm`.
     """
-    with translation_cls() as translation:
-        while True:
-            event = event_queue.get()
-            if event is None:
+    cache = ScheduleCache.from_env()
+    budget = CycleBudget.from_env()
+    metrics_file = os.getenv('SCM_METRICS_FILE')
+    debounce = float(os.getenv('SCM_EVENT_DEBOUNCE_SECONDS', '0'))
+    translation = translation_cls()
+    if record_file := os.getenv('SCM_RECORD_FILE'):
+        translation = RecordingTranslation(translation, record_file)
+    with (translation,
+          (GroupPipeline.from_env() or GroupExecutor.from_env() or nullcontext()) as executor,
+          (metrics.MetricsServer.from_env() or nullcontext()) as _):
+        stop = False
+        while not stop:
+            events, stop = collect_events(event_queue, debounce)
+            if not events:
                 break  # Allows the thread to be stopped.
-            logging.info("Processing event %s at %s", event, datetime.now())
-            try:
-                scm_runner(translation, algorithm_cls)
-            except Exception as e: # pylint: disable=broad-except
-                logging.error("Error processing event %s: %s", event, repr(e))
-                logging.error(traceback.format_exc())
-            event_queue.task_done()
+            metrics.EVENTS.inc(amount=len(events))
+            metrics.EVENTS_COALESCED.inc(amount=len(events) - 1)
+            for groups, triggers in plan_cycles([Trigger.of(event) for event in events], station_groups()):
+                event = triggers[0]
+                if len(triggers) > 1:
+                    logging.info("Processing event %s at %s (merged with %s other events)", event, datetime.now(), len(triggers) - 1)
+                else:
+                    logging.info("Processing event %s at %s", event, datetime.now())
+                try:
+                    scm_runner(translation, algorithm_cls, executor, cache, budget, groups)
+                except Exception as e: # pylint: disable=broad-except
+                    metrics.EVENT_ERRORS.inc()
+                    logging.error("Error processing event %s: %s", event, repr(e))
+                    logging.error(traceback.format_exc())
+            pending = event_queue.qsize()
+            metrics.QUEUE_DEPTH.set(pending)
+            if pending > 0:
+                logging.warning("%s events queued up while processing %s events", pending, len(events))
+            if metrics_file:
+                try:
+                    metrics.REGISTRY.write_file(metrics_file)
+                except OSError as e:
+                    logging.warning("Could not write metrics to %s: %s", metrics_file, repr(e))
+            for _ in events:
+                event_queue.task_done()
@@ -19,12 +19,43 @@ and an external Charge Station Management System (CSMS) or data source.
 Implementations of this class handle the specifics of communication (e.g., API calls,
 database queries) to fetch EV data, power constraints, and send back charging schedules.
 """
+import threading
 from abc import abstractmethod
-from contextlib import AbstractContextManager
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional
 
 from .scm.ev import EV, ChargingRateUnit
+from .scm.payload import ProfileTemplate
+from .scm.time_grid import DEFAULT_TIME_GRID, TimeGrid
+
+
+_local = threading.local()
+
+
+def current_group() -> Optional[str]:
+    """Returns the group processed by the SCM runner in the current thread (see `group_scope`), or None."""
+    return getattr(_local, 'group', None)
+
+
+@contextmanager
+def group_scope(group: Optional[str]) -> Iterator[Optional[str]]:
+    """
+    Makes `group` the current group of the thread within the `with` block.
+
+    The SCM runner calls the Translation Layer of each group within its scope,
+    so the send methods, which only receive the EVs, can find their group with `current_group`.
+
+    Args:
+        group: The identifier of the station group, or None for no group.
+    """
+    previous = current_group()
+    _local.group = group
+    try:
+        yield group
+    finally:
+        _local.group = previous
+
 
 class Translation(AbstractContextManager):
     """
@@ -33,8 +64,22 @@ class Translation(AbstractContextManager):
     The translation layer is used to interact with the external EV Management System (CSMS).
     The abstract methods defined in this class must be implemented by the concrete translation layer.
     Implementations must support the context manager protocol for setup and teardown (e.g., opening/closing connections)
+
+    Implementations may set `profile_template` and implement `send_payloads` to receive
+    final request payloads generated directly from the calculated schedule, instead of
+    transforming the profiles passed to `send_power_to_evs`.
+
+    Implementations may override `get_time_grid` to schedule groups with their own
+    resolution and planning horizon.
+
+    The SCM runner calls the methods of a group within its `group_scope`, so
+    `current_group` identifies the group of the EVs passed to the send methods.
     """
 
+    #: profile_template: Optional `ProfileTemplate` describing the payloads expected by
+    #: `send_payloads`. If None, `send_power_to_evs` receives the full charging profiles.
+    profile_template: Optional[ProfileTemplate] = None
+
     # Provide basic context manager implementations
     def __enter__(self):
         """Enters the runtime context for the translation layer.
@@ -64,8 +109,8 @@ class Translation(AbstractContextManager):
         Args:
             group_name: The identifier for the group of charging stations.
             now: The current timestamp, used as the reference start time for the
-                 power demand forecast. The forecast should cover the duration
-                 defined by `AlgorithmConstants.TIMESTEPS`.
+                 power demand forecast. The forecast should cover the
+                 `timesteps` of the group's time grid (see `get_time_grid`).
             voltage: An optional nominal voltage for the group. This may be needed
                      if the source provides demand in Amperes (A) and the algorithm
                      requires Kilowatts (kW), or vice-versa.
@@ -73,12 +118,27 @@ class Translation(AbstractContextManager):
         Returns:
             A list of floats representing the maximum allowed aggregate power
             consumption (in kW, unless the EV objects consistently use Amps)
-            for the group for each time step defined by `AlgorithmConstants.TIMESTEPS`,
+            for the group for each time step of the group's time grid,
             starting from the interval containing `now`. The length of the list
-            must equal `AlgorithmConstants.TIMESTEPS`.
+            must equal `get_time_grid(group_name).timesteps`.
         """
         raise NotImplementedError
 
+    def get_time_grid(self, group_name: str) -> TimeGrid:  # pylint: disable=unused-argument
+        """
+        Returns the time resolution and planning horizon used to schedule a station group.
+
+        Defaults to `DEFAULT_TIME_GRID` (`AlgorithmConstants.RESOLUTION` over
+        `AlgorithmConstants.RUNTIME`) for every group.
+
+        Args:
+            group_name: The identifier for the group of charging stations.
+
+        Returns:
+            The `TimeGrid` of the group.
+        """
+        return DEFAULT_TIME_GRID
+
     @abstractmethod
     def get_evs(self, group_name: str) -> tuple[list[EV], Optional[float]]:
         """
@@ -121,3 +181,17 @@ class Translation(AbstractContextManager):
                   from the units used in the `powers` dictionary values.
         """
         raise NotImplementedError
+
+    def send_payloads(self, payloads: dict[EV, dict | bytes]):
+        """
+        Sends final request payloads, generated with `profile_template`, to the external system.
+
+        Called by the SCM runner instead of `send_power_to_evs` when `profile_template`
+        is set. Implementations only need to transmit the payloads.
+
+        Args:
+            payloads: A dictionary where keys are `EV` objects and values are the request
+                      bodies produced by `Algorithm.get_payloads` for `profile_template`
+                      (pre-encoded JSON bytes if `profile_template.serialize` is set).
+        """
+        raise NotImplementedError
@@ -0,0 +1,177 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Provides typed, optionally group-scoped triggers of SCM cycles and a priority queue for them.
+
+Listener threads put a `Trigger` on the event queue of `optivgi.threads.scm_worker`
+instead of a plain message, so that the worker can tell an EV arrival from a
+periodic tick. With a `TriggerQueue`, urgent triggers are taken before routine
+ones, and `plan_cycles` runs the groups affected by urgent triggers in a cycle of
+their own before the routine cycle. A newly plugged-in EV then waits for its own
+group only, instead of all groups of `STATION_GROUPS`.
+"""
+import itertools
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import IntEnum
+from heapq import heappop, heappush
+from queue import Queue
+from typing import Any, Optional
+
+
+class TriggerType(IntEnum):
+    """
+    Kind of event triggering an SCM cycle. Lower values are processed first.
+    """
+    #: An EV plugged in or started a transaction.
+    ARRIVAL = 0
+    #: An EV left or stopped its transaction.
+    DEPARTURE = 1
+    #: A reservation (future arrival) was created, changed or cancelled.
+    RESERVATION = 2
+    #: A station or connector reported a status change.
+    STATUS = 3
+    #: Any other event, including plain messages put on the queue.
+    OTHER = 4
+    #: The periodic timer tick.
+    TIMER = 5
+
+    @property
+    def urgent(self) -> bool:
+        """True for arrivals and departures, which get a cycle of their own before routine work."""
+        return self <= TriggerType.DEPARTURE
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """
+    An event triggering an SCM cycle.
+
+    *Note: Attributes documented automatically by autodoc from class definition.*
+    """
+    #: type: The kind of event.
+    type: TriggerType = TriggerType.OTHER
+    #: groups: The station groups affected by the event, or None for all groups.
+    groups: Optional[frozenset[str]] = None
+    #: reason: A description of the event, for logging.
+    reason: str = ''
+
+    def __post_init__(self):
+        """Converts `groups` (e.g. a list) to a frozenset."""
+        if self.groups is not None and not isinstance(self.groups, frozenset):
+            object.__setattr__(self, 'groups', frozenset([self.groups] if isinstance(self.groups, str) else self.groups))
+
+    @classmethod
+    def of(cls, event: Any) -> 'Trigger':
+        """Returns `event` if it is a `Trigger`, otherwise an OTHER trigger of all groups described by it."""
+        return event if isinstance(event, Trigger) else cls(TriggerType.OTHER, reason=str(event))
+
+    def __str__(self) -> str:
+        scope = 'all groups' if self.groups is None else ', '.join(sorted(self.groups))
+        return f'{self.reason or self.type.name} ({scope})'
+
+
+def station_group_map() -> dict[str, str]:
+    """
+    Returns the station group of each station configured in the `STATION_GROUP_MAP` environment variable.
+
+    The variable holds comma-separated ``station=group`` pairs, e.g. ``CP-01=Group 1,CP-02=Group 2``.
+    Station identifiers are kept as strings.
+    """
+    pairs = (pair.split('=', 1) for pair in os.getenv('STATION_GROUP_MAP', '').split(',') if '=' in pair)
+    return {station.strip(): group.strip() for station, group in pairs if station.strip() and group.strip()}
+
+
+def station_trigger(trigger_type: TriggerType, station_id: Any, stations: dict[str, str], reason: str = '') -> Trigger:
+    """
+    Returns a trigger scoped to the station group of `station_id`.
+
+    Args:
+        trigger_type: The kind of event.
+        station_id: The station of the event (compared as a string), or None if unknown.
+        stations: The station group of each station, e.g. from `station_group_map`.
+        reason: A description of the event, for logging.
+
+    Returns:
+        A trigger of the group of the station, or of all groups if the station is unknown.
+    """
+    group = None if station_id is None else stations.get(str(station_id))
+    return Trigger(trigger_type, groups=None if group is None else frozenset({group}), reason=reason)
+
+
+def _priority(item: Any) -> int:
+    """Returns the priority of a queued item: its `TriggerType`, OTHER for plain items, and last for None."""
+    if item is None:
+        return len(TriggerType)
+    return Trigger.of(item).type
+
+
+class TriggerQueue(Queue):
+    """
+    Queue returning the items by the priority of their `TriggerType`, first in first out within a priority.
+
+    Items that are not a `Trigger` are treated as `TriggerType.OTHER`, and the stop
+    signal (`None`) comes after all pending items. It can be used in place of the
+    `Queue` of `optivgi.threads.scm_worker` and `optivgi.threads.timer_thread_worker`.
+    """
+    def _init(self, maxsize: int):
+        self.queue: list[tuple[int, int, Any]] = [] # type: ignore[assignment]
+        self._counter = itertools.count() # pylint: disable=attribute-defined-outside-init
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _put(self, item: Any):
+        heappush(self.queue, (_priority(item), next(self._counter), item))
+
+    def _get(self) -> Any:
+        return heappop(self.queue)[2]
+
+
+def _scope(triggers: Iterable[Trigger], groups: list[str]) -> list[str]:
+    """Returns the groups (in the order of `groups`) affected by any of the triggers."""
+    affected: set[str] = set()
+    for trigger in triggers:
+        if trigger.groups is None:
+            return list(groups)
+        affected |= trigger.groups
+    return [group for group in groups if group in affected]
+
+
+def plan_cycles(triggers: list[Trigger], groups: list[str]) -> list[tuple[list[str], list[Trigger]]]:
+    """
+    Plans the SCM cycles running a batch of triggers.
+
+    The groups affected by urgent triggers run first, in a cycle of their own. The
+    other triggers run in a second cycle, without the groups that just ran.
+    Triggers scoped to groups that are not in `groups` are ignored.
+
+    Args:
+        triggers: The triggers collected from the queue.
+        groups: All configured station groups.
+
+    Returns:
+        The groups of each cycle to run, in order, with the triggers it handles.
+    """
+    urgent = [trigger for trigger in triggers if trigger.type.urgent]
+    routine = [trigger for trigger in triggers if not trigger.type.urgent]
+    plan = []
+    urgent_groups = _scope(urgent, groups)
+    if urgent_groups:
+        plan.append((urgent_groups, urgent))
+    routine_groups = [group for group in _scope(routine, groups) if group not in urgent_groups]
+    if routine_groups:
+        plan.append((routine_groups, routine))
+    return plan
@@ -0,0 +1,90 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.scm.change_tracker`.
+"""
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from optivgi.scm.change_tracker import ProfileChangeTracker
+from optivgi.scm.ev import EV
+from optivgi.scm.fleet import EVFleet
+from optivgi.scm.payload import ProfileTemplate
+
+START = datetime(2025, 1, 1, 8, tzinfo=UTC)
+DEPARTURE = START + timedelta(hours=2)
+
+
+def make_payloads(now: datetime, power: float, serialize: bool) -> dict[EV, dict | bytes]:
+    """Returns the payloads of two EVs charging at `power` from `now` until `DEPARTURE`."""
+    fleet = EVFleet([EV(ev_id=i, active=True, station_id=f'CP-{i}', connector_id=1, min_power=0., max_power=7.2,
+                        arrival_time=START, departure_time=DEPARTURE, energy=10.) for i in range(2)])
+    _, departure = fleet.window_indices(now)
+    for row, index in zip(fleet.power, departure):
+        row[:index] = power
+    return fleet.payloads(now, ProfileTemplate(serialize=serialize))
+
+
+def send(tracker: ProfileChangeTracker, payloads: dict[EV, dict | bytes], now: datetime) -> list[EV]:
+    """Marks the changed payloads as sent and returns their EVs."""
+    changed = tracker.changed_profiles(payloads, now)
+    for ev, payload in changed.items():
+        tracker.mark_sent(ev, payload, now)
+    return list(changed)
+
+
+@pytest.mark.parametrize('serialize', [False, True])
+def test_suppresses_identical_shifted_profile(serialize):
+    tracker = ProfileChangeTracker()
+    assert len(send(tracker, make_payloads(START, 5., serialize), START)) == 2
+
+    now = START + timedelta(minutes=3)
+    assert not send(tracker, make_payloads(now, 5., serialize), now)
+
+
+@pytest.mark.parametrize('serialize', [False, True])
+def test_sends_changed_limits(serialize):
+    # The limits are in W, the power in kW
+    tracker = ProfileChangeTracker(deadband=500.)
+    send(tracker, make_payloads(START, 5., serialize), START)
+
+    now = START + timedelta(minutes=3)
+    assert not send(tracker, make_payloads(now, 5.2, serialize), now)
+    assert len(send(tracker, make_payloads(now, 6., serialize), now)) == 2
+
+
+@pytest.mark.parametrize('serialize', [False, True])
+def test_resends_after_refresh_interval(serialize):
+    tracker = ProfileChangeTracker(refresh_interval=timedelta(minutes=10))
+    send(tracker, make_payloads(START, 5., serialize), START)
+
+    now = START + timedelta(minutes=9)
+    assert not send(tracker, make_payloads(now, 5., serialize), now)
+    now = START + timedelta(minutes=10)
+    assert len(send(tracker, make_payloads(now, 5., serialize), now)) == 2
+    # The refresh restarts the interval
+    now = START + timedelta(minutes=11)
+    assert not send(tracker, make_payloads(now, 5., serialize), now)
+
+
+def test_sends_to_a_new_ev_on_the_same_connector():
+    tracker = ProfileChangeTracker()
+    payloads = make_payloads(START, 5., False)
+    send(tracker, payloads, START)
+
+    ev, payload = next(iter(payloads.items()))
+    other = EV(ev_id=99, active=True, station_id=ev.station_id, connector_id=ev.connector_id, min_power=0.,
+               max_power=7.2, arrival_time=START, departure_time=DEPARTURE, energy=10.)
+    assert tracker.is_changed(other, payload, START)
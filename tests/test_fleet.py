@@ -0,0 +1,56 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.scm.fleet`.
+"""
+from datetime import datetime, timedelta, UTC
+
+import numpy as np
+import pytest
+
+from optivgi.scm.ev import EV
+from optivgi.scm.fleet import EVFleet
+
+START = datetime(2025, 1, 1, 8, tzinfo=UTC)
+
+
+def make_ev(ev_id: int, arrival_time: datetime, departure_time: datetime) -> EV:
+    """Returns an EV with the given connection window."""
+    return EV(ev_id=ev_id, active=True, station_id=ev_id, connector_id=1, min_power=0., max_power=7.2,
+              arrival_time=arrival_time, departure_time=departure_time, energy=10.)
+
+
+@pytest.mark.parametrize('tzinfo', [UTC, None])
+def test_window_indices_match_ev_indices(tzinfo):
+    now = START.replace(tzinfo=tzinfo)
+    evs = [make_ev(i, now + timedelta(minutes=7 * i - 20), now + timedelta(hours=i, minutes=30)) for i in range(5)]
+    fleet = EVFleet(evs)
+
+    for later in (now, now + timedelta(minutes=3), now + timedelta(seconds=90)):
+        arrival, departure = fleet.window_indices(later)
+        np.testing.assert_array_equal(arrival, [ev.arrival_index(later) for ev in evs])
+        np.testing.assert_array_equal(departure, [ev.departure_index(later) for ev in evs])
+
+
+def test_mixed_naive_and_aware_datetimes_are_rejected():
+    naive = START.replace(tzinfo=None)
+    aware_fleet = EVFleet([make_ev(1, START, START + timedelta(hours=2))])
+    mixed_fleet = EVFleet([make_ev(1, START, naive + timedelta(hours=2))])
+
+    with pytest.raises(TypeError):
+        aware_fleet.window_indices(naive)
+    with pytest.raises(TypeError):
+        mixed_fleet.window_indices(START)
+    with pytest.raises(TypeError):
+        mixed_fleet.window_indices(naive)
@@ -0,0 +1,74 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.pipeline`.
+"""
+import threading
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+
+import pytest
+
+from optivgi.pipeline import GroupPipeline
+from optivgi.scm.ev import EV, ChargingRateUnit
+from optivgi.scm.go_algorithm import GoAlgorithm
+from optivgi.scm.time_grid import DEFAULT_TIME_GRID
+from optivgi.scm_runner import scm_runner
+from optivgi.translation import Translation
+
+GROUPS = ['ok-1', 'fetch-error', 'solve-error', 'send-error', 'ok-2']
+
+
+class FailingTranslation(Translation):
+    """Serves two EVs per group, and fails in the stage named by the group."""
+    def __init__(self):
+        self.sent: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_evs(self, group_name: str) -> tuple[list[EV], Optional[float]]:
+        if group_name == 'fetch-error':
+            raise ConnectionError('CSMS unavailable')
+        now = datetime.now(UTC)
+        return [EV(ev_id=i, active=True, station_id=f'{group_name}/{i}', connector_id=1, min_power=0., max_power=7.2,
+                   arrival_time=now - timedelta(hours=1), departure_time=now + timedelta(hours=2), energy=10.)
+                for i in range(2)], None
+
+    def get_peak_power_demand(self, group_name: str, now: datetime, voltage: Optional[float] = None) -> list[float]:
+        # A forecast of the wrong length fails the algorithm
+        return [10.] * (DEFAULT_TIME_GRID.timesteps - (group_name == 'solve-error'))
+
+    def send_power_to_evs(self, powers: dict[EV, dict], unit: Optional[ChargingRateUnit] = None):
+        group = next(iter(powers)).station_id.split('/')[0]
+        if group == 'send-error':
+            raise TimeoutError('CSMS timed out')
+        with self._lock:
+            self.sent[group] = len(powers)
+
+
+@pytest.mark.parametrize('solve_workers', [0, 1])
+def test_error_in_one_group_is_isolated(monkeypatch, solve_workers):
+    monkeypatch.setenv('STATION_GROUPS', ','.join(GROUPS))
+    translation = FailingTranslation()
+    with GroupPipeline(fetch_workers=2, send_workers=2, solve_workers=solve_workers, queue_size=1) as pipeline:
+        results = scm_runner(translation, GoAlgorithm, pipeline)
+
+    assert [result.group for result in results] == GROUPS
+    errors = {result.group: result.error for result in results if not result.ok}
+    assert errors.keys() == {'fetch-error', 'solve-error', 'send-error'}
+    assert isinstance(errors['fetch-error'], ConnectionError)
+    assert isinstance(errors['send-error'], TimeoutError)
+    assert translation.sent == {'ok-1': 2, 'ok-2': 2}
+    for result in results:
+        if result.ok:
+            assert result.sent_count == 2 and result.algorithm == 'GoAlgorithm'
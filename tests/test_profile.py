@@ -0,0 +1,69 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.scm.profile`.
+"""
+from datetime import datetime, timedelta, UTC
+
+import numpy as np
+import pytest
+
+from optivgi.scm.ev import EV, ChargingRateUnit
+from optivgi.scm.fleet import EVFleet
+from optivgi.scm.payload import ProfileTemplate
+from optivgi.scm.profile import ProfileCompression
+from optivgi.scm.serializer import loads
+
+START = datetime(2025, 1, 1, 8, tzinfo=UTC)
+
+
+def make_fleet() -> EVFleet:
+    """Returns a fleet of one EV charging at 16.3 A for an hour, then 15.6 A for half an hour."""
+    fleet = EVFleet([EV(ev_id=1, active=True, station_id='CP-01', connector_id=1, min_power=0., max_power=32.,
+                        arrival_time=START, departure_time=START + timedelta(hours=2), energy=40.,
+                        unit=ChargingRateUnit.A)])
+    fleet.power[0, :60] = 16.3
+    fleet.power[0, 60:90] = 15.6
+    return fleet
+
+
+def limits(profile: dict) -> list:
+    """Returns the limits of the periods of a charging profile."""
+    return [period['limit'] for period in profile['chargingSchedule']['chargingSchedulePeriod']]
+
+
+def test_whole_quantum_gives_integer_limits():
+    compression = ProfileCompression(quantum=1.)
+    np.testing.assert_array_equal(compression.quantize(np.array([16.3, 15.6, 0.])), [16, 16, 0])
+    assert compression.quantize(np.array([16.3])).dtype == np.int64
+
+
+@pytest.mark.parametrize('compression', [ProfileCompression(quantum=1.),
+                                         ProfileCompression(quantum=1, energy_tolerance=1.)])
+def test_whole_quantum_profiles_have_integer_limits(compression):
+    fleet = make_fleet()
+    ev = fleet.evs[0]
+
+    payload = fleet.payloads(START, ProfileTemplate(compression=compression, serialize=True))[ev]
+    assert b'"limit":16,' in payload
+    for profile in (loads(payload), ev.charging_profile(START, compression=compression),
+                    ev.current_charging_profile(START, compression=compression)):
+        assert all(isinstance(limit, int) for limit in limits(profile))
+
+
+def test_fractional_quantum_keeps_float_limits():
+    fleet = make_fleet()
+    profile = fleet.charging_profiles(START, compression=ProfileCompression(quantum=.5))[fleet.evs[0]]
+
+    assert limits(profile) == [16.5, 15.5, 0.]
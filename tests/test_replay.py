@@ -0,0 +1,134 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.replay`.
+"""
+import logging
+from dataclasses import fields
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+
+import numpy as np
+
+from optivgi.replay import MAGIC, RecordingTranslation, ReplayTranslation, decode_evs, encode_evs, load_cycles, read_frames
+from optivgi.scm.ev import EV, ChargingRateUnit
+from optivgi.scm.go_algorithm import GoAlgorithm
+from optivgi.scm.time_grid import DEFAULT_TIME_GRID
+from optivgi.scm_runner import SCMCycle, run_group, scm_runner
+from optivgi.translation import Translation
+
+GROUPS = ['north', 'south']
+NOW = datetime.now(UTC)
+
+
+def make_evs(group: str) -> list[EV]:
+    """Returns EVs with string station IDs and both kinds of power curves."""
+    return [
+        EV(ev_id=1, active=True, station_id=f'{group}-CP-01', connector_id=1, min_power=1.4, max_power=7.2,
+           arrival_time=NOW - timedelta(hours=1), departure_time=NOW + timedelta(hours=3), energy=20.,
+           max_power_curve=[(NOW, 7.2), (NOW + timedelta(hours=1), 3.6)]),
+        EV(ev_id=2, active=True, station_id=f'{group}-CP-02', connector_id=2, min_power=0., max_power=11.,
+           arrival_time=NOW - timedelta(minutes=5), departure_time=NOW + timedelta(hours=2), energy=15.,
+           unit=ChargingRateUnit.A, priority=2., max_power_curve=np.linspace(11., 6., 120)),
+        EV(ev_id=3, active=False, station_id=f'{group}-CP-03', connector_id=1, min_power=0., max_power=22.,
+           arrival_time=NOW + timedelta(hours=1), departure_time=NOW + timedelta(hours=5), energy=30.),
+    ]
+
+
+class FakeTranslation(Translation):
+    """Serves the same EVs to every group and counts the sent profiles."""
+    def __init__(self):
+        self.sent = 0
+
+    def get_evs(self, group_name: str) -> tuple[list[EV], Optional[float]]:
+        return make_evs(group_name), 230.
+
+    def get_peak_power_demand(self, group_name: str, now: datetime, voltage: Optional[float] = None) -> list[float]:
+        return [20. + i % 7 for i in range(DEFAULT_TIME_GRID.timesteps)]
+
+    def send_power_to_evs(self, powers: dict[EV, dict], unit: Optional[ChargingRateUnit] = None):
+        self.sent += len(powers)
+
+
+def record(path: str, monkeypatch) -> FakeTranslation:
+    """Records one SCM cycle of `GROUPS` to `path`."""
+    monkeypatch.setenv('STATION_GROUPS', ','.join(GROUPS))
+    translation = FakeTranslation()
+    with RecordingTranslation(translation, path) as recording:
+        scm_runner(recording, GoAlgorithm)
+    return translation
+
+
+def assert_same_evs(evs: list[EV], expected: list[EV]):
+    """Checks that the recorded EVs have the attributes of the original ones."""
+    assert len(evs) == len(expected)
+    for ev, original in zip(evs, expected):
+        for name in (f.name for f in fields(EV) if f.name not in ('power', 'max_power_curve')):
+            assert getattr(ev, name) == getattr(original, name), name
+        if isinstance(original.max_power_curve, np.ndarray):
+            np.testing.assert_array_equal(ev.max_power_curve, original.max_power_curve)
+        else:
+            assert ev.max_power_curve == original.max_power_curve
+
+
+def test_record_and_load_cycles(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cycles.ovgr')
+    translation = record(path, monkeypatch)
+
+    cycles = load_cycles(path)
+    assert [cycle.group for cycle in cycles] == GROUPS
+    for cycle in cycles:
+        assert cycle.voltage == 230.
+        assert cycle.peak_power_demand == FakeTranslation().get_peak_power_demand(cycle.group, cycle.now)
+        assert cycle.sent_count == 3
+        assert_same_evs(cycle.evs(), make_evs(cycle.group))
+    assert translation.sent == 6
+    assert [cycle.group for cycle in load_cycles(path, groups=['south'])] == ['south']
+
+
+def test_naive_datetimes_round_trip():
+    naive = [EV(ev_id=1, active=True, station_id=7, connector_id=1, min_power=0., max_power=7.2,
+                arrival_time=datetime(2025, 1, 1, 8), departure_time=datetime(2025, 1, 1, 12), energy=10.,
+                max_power_curve=[(datetime(2025, 1, 1, 9), 3.6)])]
+
+    assert_same_evs(decode_evs(encode_evs(naive)), naive)
+
+
+def test_replay_recorded_cycle(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cycles.ovgr')
+    record(path, monkeypatch)
+
+    replay = ReplayTranslation()
+    cycle = load_cycles(path)[0]
+    replay.select(cycle)
+    result = run_group(SCMCycle(replay, GoAlgorithm, cycle.now), cycle.group)
+
+    assert result.ok and result.sent_count == replay.sent_count == cycle.sent_count
+
+
+def test_truncated_last_frame_is_ignored(tmp_path, monkeypatch, caplog):
+    path = str(tmp_path / 'cycles.ovgr')
+    record(path, monkeypatch)
+    frame_count = sum(1 for _ in read_frames(path))
+
+    # A frame cut off while it was written, e.g. by a crash
+    with open(path, 'rb') as file:
+        first_frame = file.read()[len(MAGIC):][:40]
+    with open(path, 'ab') as file:
+        file.write(first_frame)
+
+    with caplog.at_level(logging.WARNING):
+        assert sum(1 for _ in read_frames(path)) == frame_count
+    assert 'truncated frame' in caplog.text
+    assert [cycle.group for cycle in load_cycles(path)] == GROUPS
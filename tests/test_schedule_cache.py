@@ -0,0 +1,105 @@
+# Copyright 2025 UChicago Argonne, LLC All right reserved
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://github.com/argonne-vci/Opti-VGI/blob/main/LICENSE
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests of `optivgi.scm.schedule_cache`.
+"""
+from datetime import datetime, timedelta, UTC
+
+import numpy as np
+
+from optivgi.scm.ev import EV
+from optivgi.scm.fleet import EVFleet
+from optivgi.scm.go_algorithm import GoAlgorithm
+from optivgi.scm.schedule_cache import ScheduleCache, ScheduleFingerprint
+from optivgi.scm.time_grid import DEFAULT_TIME_GRID
+
+START = datetime(2025, 1, 1, 8, tzinfo=UTC)
+PEAK_POWER_DEMAND = [15.] * DEFAULT_TIME_GRID.timesteps
+
+
+def make_fleet(energy: list[float]) -> EVFleet:
+    """Returns a fleet of connected EVs, departing within the first hours of the horizon."""
+    return EVFleet([EV(ev_id=i, active=True, station_id=i, connector_id=1, min_power=1.4, max_power=7.2,
+                       arrival_time=START - timedelta(hours=1), departure_time=START + timedelta(hours=2 + i),
+                       energy=value) for i, value in enumerate(energy)], DEFAULT_TIME_GRID)
+
+
+def calculate_and_store(cache: ScheduleCache) -> EVFleet:
+    """Calculates the schedule at `START` and stores it in `cache`."""
+    fleet = make_fleet([20., 25., 30.])
+    fingerprint = ScheduleFingerprint.of(fleet, PEAK_POWER_DEMAND, START, GoAlgorithm)
+    assert cache.lookup('group', fingerprint) is None
+    GoAlgorithm(fleet, PEAK_POWER_DEMAND, START).calculate()
+    cache.store('group', fingerprint, fleet.power)
+    return fleet
+
+
+def test_hit_after_whole_step_shift():
+    cache = ScheduleCache()
+    fleet = calculate_and_store(cache)
+
+    steps = 3
+    now = START + steps * DEFAULT_TIME_GRID.resolution
+    charged = fleet.power[:, :steps].sum(axis=1) * DEFAULT_TIME_GRID.power_energy_factor
+    shifted = make_fleet((fleet.energy - charged).tolist())
+    power = cache.lookup('group', ScheduleFingerprint.of(shifted, PEAK_POWER_DEMAND, now, GoAlgorithm))
+
+    assert power is not None
+    np.testing.assert_array_equal(power[:, :-steps], fleet.power[:, steps:])
+    np.testing.assert_array_equal(power[:, -steps:], 0.)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_hit_with_evs_in_another_order():
+    cache = ScheduleCache()
+    fleet = calculate_and_store(cache)
+
+    reordered = EVFleet(list(reversed(make_fleet(fleet.energy.tolist()).evs)), DEFAULT_TIME_GRID)
+    power = cache.lookup('group', ScheduleFingerprint.of(reordered, PEAK_POWER_DEMAND, START, GoAlgorithm))
+
+    assert power is not None
+    np.testing.assert_array_equal(power, fleet.power[::-1])
+
+
+def test_miss_after_partial_step():
+    cache = ScheduleCache()
+    fleet = calculate_and_store(cache)
+
+    now = START + DEFAULT_TIME_GRID.resolution / 2
+    fingerprint = ScheduleFingerprint.of(make_fleet(fleet.energy.tolist()), PEAK_POWER_DEMAND, now, GoAlgorithm)
+
+    assert cache.lookup('group', fingerprint) is None
+
+
+def test_miss_on_energy_mismatch():
+    cache = ScheduleCache()
+    fleet = calculate_and_store(cache)
+
+    # The energy reported after the shift is what was requested before: nothing was charged
+    now = START + 3 * DEFAULT_TIME_GRID.resolution
+    fingerprint = ScheduleFingerprint.of(make_fleet(fleet.energy.tolist()), PEAK_POWER_DEMAND, now, GoAlgorithm)
+
+    assert cache.lookup('group', fingerprint) is None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_miss_on_changed_limits():
+    cache = ScheduleCache()
+    fleet = calculate_and_store(cache)
+
+    changed = make_fleet(fleet.energy.tolist())
+    changed.max_power[0] = 11.
+    fingerprint = ScheduleFingerprint.of(changed, PEAK_POWER_DEMAND, START, GoAlgorithm)
+
+    assert cache.lookup('group', fingerprint) is None